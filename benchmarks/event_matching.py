@@ -0,0 +1,139 @@
+"""
+Compare event title matchers on OCR-like strings.
+
+Run from the repository root:
+  python benchmarks/event_matching.py [--seed 7] [--threshold 0.8]
+
+The event database is every character, support card and scenario event under assets/.
+Queries are:
+  * recorded OCR titles from the event log (no ground truth, matches are listed)
+  * every event name with synthetic OCR noise ("!" read as "l", dropped apostrophes,
+    I/l swaps, dropped characters, clipped endings), scored for top-1 accuracy
+  * strings that are not event titles, to count false positives above --threshold
+"""
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.event_index import FUZZY_MATCH_THRESHOLD, build_event_index
+from core.event_log import event_log
+from core.state import calculate_text_similarity, calculate_translated_similarity
+
+NON_EVENTS = [
+  "test event text", "Support Card Event", "Trainee Event", "Main Scenario Event",
+  "Career", "Skip", "Log", "Training Items", "Turns Left", "Race Day", "Goal Achieved",
+  "Senior Year Early Jun", "Result Pts", "Fan Count 1200"
+]
+
+def load_events():
+  """Character, support card and scenario events, shaped like reload_config's data"""
+  character_events = []
+  for path in sorted(glob.glob("assets/character/nested/*.json")):
+    with open(path, "r", encoding="utf-8") as f:
+      character_events.extend(json.load(f).get("data", {}).get("english", {}).get("events", []))
+
+  cards = []
+  for path in sorted(glob.glob("assets/support/nested/*.json")):
+    with open(path, "r", encoding="utf-8") as f:
+      events = json.load(f).get("data", {}).get("english", {}).get("events", [])
+    flat = []
+    for event in events:
+      flat.extend(event.get("events", []) if "events" in event else [event])
+    cards.append({"events": flat})
+
+  scenario = None
+  path = "assets/scenario/ura-finals.json"
+  if os.path.exists(path):
+    with open(path, "r", encoding="utf-8") as f:
+      data = json.load(f)
+    if isinstance(data.get("events"), dict):
+      scenario = {"events": data["events"]}
+
+  return build_event_index({"events": character_events}, cards, scenario, calculate_translated_similarity)
+
+def ocr_noise(name, rng):
+  text = name
+  # Chain markers and symbols are not part of the on-screen title
+  if text.startswith("("):
+    head, _, rest = text.partition(") ")
+    if "❯" in head:
+      text = rest
+  text = text.replace("☆", rng.choice(["*", "", "x"]))
+  text = text.replace("!", "l") if rng.random() < 0.6 else text
+  text = text.replace("'", "") if rng.random() < 0.5 else text
+  chars = list(text)
+  for i, ch in enumerate(chars):
+    roll = rng.random()
+    if ch in "Il" and roll < 0.3:
+      chars[i] = "l" if ch == "I" else "I"
+    elif ch.isalpha() and roll < 0.03:
+      chars[i] = ""
+  text = "".join(chars)
+  words = text.split()
+  if len(words) > 4 and rng.random() < 0.3:
+    text = " ".join(words[:-1])
+  return text.strip()
+
+def jaccard_best(index, text):
+  """The pre-index matcher: calculate_text_similarity against every event, first best wins"""
+  best, best_score = None, 0
+  with contextlib.redirect_stdout(io.StringIO()):
+    for entry in index.entries:
+      score = calculate_text_similarity(text, entry.name)
+      if score > best_score:
+        best, best_score = entry, score
+  return best, best_score
+
+def fuzzy_best(index, text):
+  matches = index.fuzzy(text, limit=1)
+  return matches[0] if matches else (None, 0)
+
+MATCHERS = {
+  "jaccard (brute force)": jaccard_best,
+  "token index": lambda index, text: index.best(text),
+  "rapidfuzz": fuzzy_best,
+  "lookup (both)": lambda index, text: index.lookup(text)
+}
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument("--seed", type=int, default=7)
+  parser.add_argument("--threshold", type=float, default=FUZZY_MATCH_THRESHOLD)
+  args = parser.parse_args()
+
+  index = load_events()
+  rng = random.Random(args.seed)
+  noisy = [(ocr_noise(entry.name, rng), entry) for entry in index.entries]
+
+  recorded = sorted({e.get("event_text", "") for e in event_log.events() if e.get("event_text")})
+
+  print(f"{len(index)} events, {len(noisy)} noisy queries, {len(recorded)} recorded OCR titles, {len(NON_EVENTS)} non-events\n")
+  print(f"{'matcher':<24} {'top-1':>7} {'ms/query':>9} {'false pos':>10}")
+  for label, matcher in MATCHERS.items():
+    start = time.perf_counter()
+    found = [matcher(index, text)[0] for text, _ in noisy]
+    elapsed = (time.perf_counter() - start) / len(noisy) * 1000
+    # Names repeat across cards, so a hit is any event with the same name
+    correct = sum(1 for match, (_, entry) in zip(found, noisy) if match is not None and match.name == entry.name)
+    false_positives = sum(1 for text in NON_EVENTS if matcher(index, text)[1] >= args.threshold)
+    print(f"{label:<24} {correct / len(noisy):>7.1%} {elapsed:>9.3f} {false_positives:>10}")
+
+  if recorded:
+    print("\nRecorded OCR titles:")
+    for text in recorded:
+      row = []
+      for label, matcher in MATCHERS.items():
+        entry, score = matcher(index, text)
+        row.append(f"{(entry.name if entry else '-')[:24]:<24} {score:.2f}")
+      print(f"  {text[:30]:<30} | " + " | ".join(row))
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,85 @@
+"""
+Compare match_template with match_template_pyramid on recorded screenshots.
+
+Run from the repository root:
+  python benchmarks/template_matching.py [frames...] [--scale 0.5] [--threshold 0.85] [--runs 3]
+
+Frames default to temp_screenshot.png. For every frame/template pair both matchers are timed,
+and each baseline box is paired with the closest pyramid box (IoU).
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+
+from core.recognizer import match_template, match_template_pyramid
+from core.templates import TEMPLATE_DIRS, preload_templates
+from utils.screenshot import Frame
+
+def iou(a, b):
+  ax, ay, aw, ah = a
+  bx, by, bw, bh = b
+  ix = max(0, min(ax + aw, bx + bw) - max(ax, bx))
+  iy = max(0, min(ay + ah, by + bh) - max(ay, by))
+  inter = ix * iy
+  union = aw * ah + bw * bh - inter
+  return inter / union if union else 0.0
+
+def timed(fn, runs, *args, **kwargs):
+  best = float("inf")
+  result = None
+  for _ in range(runs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    best = min(best, time.perf_counter() - start)
+  return result, best * 1000
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument("frames", nargs="*", default=["temp_screenshot.png"])
+  parser.add_argument("--scale", type=float, default=0.5)
+  parser.add_argument("--threshold", type=float, default=0.85)
+  parser.add_argument("--runs", type=int, default=3)
+  args = parser.parse_args()
+
+  preload_templates()
+  templates = sorted(p for d in TEMPLATE_DIRS for p in glob.glob(os.path.join(d, "*.png")))
+
+  totals = {"baseline": 0.0, "pyramid": 0.0}
+  found = {"baseline": 0, "pyramid": 0, "both": 0}
+  ious = []
+
+  print(f"{'frame':<28} {'template':<40} {'base ms':>8} {'pyr ms':>8} {'IoU':>6}")
+  for frame_path in args.frames:
+    frame = Frame.from_image(Image.open(frame_path))
+    for template in templates:
+      base, base_ms = timed(match_template, args.runs, template, threshold=args.threshold, frame=frame)
+      pyr, pyr_ms = timed(match_template_pyramid, args.runs, template, threshold=args.threshold, frame=frame, scale=args.scale)
+      totals["baseline"] += base_ms
+      totals["pyramid"] += pyr_ms
+
+      overlap = ""
+      if base:
+        found["baseline"] += 1
+      if pyr:
+        found["pyramid"] += 1
+      if base and pyr:
+        found["both"] += 1
+        ious.append(sum(max(iou(b, p) for p in pyr) for b in base) / len(base))
+        overlap = f"{ious[-1]:.2f}"
+      print(f"{os.path.basename(frame_path):<28} {template:<40} {base_ms:>8.1f} {pyr_ms:>8.1f} {overlap:>6}")
+
+  print()
+  print(f"Total latency: baseline {totals['baseline']:.1f} ms, pyramid {totals['pyramid']:.1f} ms "
+        f"({totals['baseline'] / max(totals['pyramid'], 1e-9):.1f}x)")
+  print(f"Templates found: baseline {found['baseline']}, pyramid {found['pyramid']}, both {found['both']}")
+  if ious:
+    print(f"Mean IoU against baseline boxes: {sum(ious) / len(ious):.3f} (min {min(ious):.3f})")
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,152 @@
+import json
+import os
+import threading
+
+ASSET_INDEX_FILE = "assets/asset_index.json"
+ASSET_INDEX_VERSION = 1
+
+# Where each kind of nested event file lives, and the URL catalogs the scraper resolves ids with
+NESTED_DIRS = {
+  "character": "assets/character/nested",
+  "support": "assets/support/nested"
+}
+URL_CATALOGS = {
+  "character": ["assets/character/character_urls.json"],
+  "support": ["assets/support/support_urls.json", "support_card_urls.txt"]
+}
+
+def name_slug(name):
+  """Card/character name as it appears in file names ("King Halo" -> "king-halo")"""
+  return str(name).lower().replace(" ", "-")
+
+def _split_slug(slug):
+  """("20020", "king-halo") for "20020-king-halo", (slug, "") when there is no name part"""
+  head, _, tail = slug.partition("-")
+  return (head, tail) if head.isdigit() else ("", slug)
+
+def _stamp(path):
+  try:
+    return os.stat(path).st_mtime_ns
+  except OSError:
+    return None
+
+class AssetIndex:
+  """
+  id / slug / name -> file index over the nested event files, plus id -> URL entries
+  from the scraper's URL catalogs. Saved to ASSET_INDEX_FILE and reused across runs;
+  a kind is rebuilt only when its directory or catalogs change (files scraped by hand or
+  by another process), and the scraper adds the files it writes with add_file().
+  """
+  def __init__(self, path=ASSET_INDEX_FILE):
+    self.path = path
+    self._lock = threading.Lock()
+    self._kinds = None
+
+  def _sources(self, kind):
+    return [NESTED_DIRS[kind]] + URL_CATALOGS[kind]
+
+  def _scan(self, kind):
+    entry = {"stamps": {path: _stamp(path) for path in self._sources(kind)}, "by_id": {}, "by_name": {}, "urls": {}}
+    directory = NESTED_DIRS[kind]
+    if os.path.isdir(directory):
+      for filename in sorted(os.listdir(directory)):
+        if filename.endswith(".json"):
+          self._add(entry, os.path.join(directory, filename).replace(os.sep, "/"))
+
+    for catalog in URL_CATALOGS[kind]:
+      try:
+        if catalog.endswith(".json"):
+          with open(catalog, "r", encoding="utf-8") as f:
+            items = [(item.get("slug", ""), item.get("url"), item.get("name")) for item in json.load(f)]
+        else:
+          with open(catalog, "r", encoding="utf-8") as f:
+            items = [(line.strip().rstrip("/").split("/")[-1], line.strip(), None) for line in f if line.strip()]
+      except (OSError, ValueError):
+        continue
+      for slug, url, name in items:
+        card_id, _ = _split_slug(slug)
+        # First catalog wins, as in the scraper's lookup order
+        if card_id and card_id not in entry["urls"]:
+          entry["urls"][card_id] = {"slug": slug, "url": url, "name": name}
+    return entry
+
+  def _add(self, entry, path):
+    card_id, name = _split_slug(os.path.splitext(os.path.basename(path))[0])
+    # `{id}.json` wins over `{id}-slug.json`, like the glob order it replaces
+    if card_id and (not name or card_id not in entry["by_id"]):
+      entry["by_id"][card_id] = path
+    if name:
+      entry["by_name"].setdefault(name, path)
+
+  def _load(self):
+    try:
+      with open(self.path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+      if data.get("version") == ASSET_INDEX_VERSION:
+        return data.get("kinds", {})
+    except (OSError, ValueError):
+      pass
+    return {}
+
+  def _save(self):
+    tmp_path = self.path + ".tmp"
+    try:
+      with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": ASSET_INDEX_VERSION, "kinds": self._kinds}, f, ensure_ascii=False)
+      os.replace(tmp_path, self.path)
+    except OSError as e:
+      print(f"[ASSETS] Could not save asset index: {e}")
+
+  def _kind(self, kind):
+    """Index entry for `kind`, rescanned if its directory or catalogs changed since it was built"""
+    with self._lock:
+      if self._kinds is None:
+        self._kinds = self._load()
+      entry = self._kinds.get(kind)
+      if entry is None or any(_stamp(path) != stamp for path, stamp in entry["stamps"].items()):
+        entry = self._kinds[kind] = self._scan(kind)
+        self._save()
+      return entry
+
+  def find_files(self, kind, card_id=None, name=None):
+    """
+    Nested event files for an id and/or name, best first: the `{id}.json` / `{id}-*.json`
+    file, then the file named after the name slug, then files whose name contains it
+    """
+    entry = self._kind(kind)
+    found = []
+    if card_id is not None and str(card_id) in entry["by_id"]:
+      found.append(entry["by_id"][str(card_id)])
+    if name:
+      slug = name_slug(name)
+      if slug in entry["by_name"]:
+        found.append(entry["by_name"][slug])
+      else:
+        found.extend(path for key, path in entry["by_name"].items() if slug in key)
+    return list(dict.fromkeys(found))
+
+  def find_file(self, kind, card_id=None, name=None):
+    found = self.find_files(kind, card_id, name)
+    return found[0] if found else None
+
+  def lookup_url(self, kind, card_id):
+    """{"slug", "url", "name"} from the URL catalogs, or None"""
+    return self._kind(kind)["urls"].get(str(card_id))
+
+  def refresh(self, kind):
+    """Rescan `kind` now (after something else wrote files there)"""
+    with self._lock:
+      if self._kinds is None:
+        self._kinds = self._load()
+      self._kinds[kind] = self._scan(kind)
+      self._save()
+
+  def add_file(self, kind, path):
+    """Record a file the scraper just wrote"""
+    entry = self._kind(kind)
+    with self._lock:
+      self._add(entry, os.path.relpath(path).replace(os.sep, "/"))
+      entry["stamps"][NESTED_DIRS[kind]] = _stamp(NESTED_DIRS[kind])
+      self._save()
+
+asset_index = AssetIndex()
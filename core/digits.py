@@ -0,0 +1,192 @@
+import os
+import threading
+
+import cv2
+import numpy as np
+
+# One folder per numeric field, each with one PNG per digit ("0.png" ... "9.png") learned from
+# confident EasyOCR reads. Machine-specific, so kept out of assets/ and ignored by git
+DIGIT_TEMPLATE_DIR = "learned_digits"
+
+# Every glyph is normalized to this size (width, height) before comparing
+GLYPH_SIZE = (16, 24)
+
+# Per-glyph correlation needed to trust a read, and the lead it needs over the runner-up digit
+MIN_SCORE = 0.8
+MIN_MARGIN = 0.05
+
+# Glyph columns narrower than this (in pixels) are treated as noise
+MIN_GLYPH_WIDTH = 2
+
+# A digit becomes a template only once this many samples of it agree with each other,
+# so one misread label cannot poison it. Samples are compared by correlation
+LEARN_SAMPLES = 3
+AGREE_SCORE = 0.9
+# Unconfirmed samples kept per digit
+MAX_CANDIDATES = 8
+
+def _binarize(gray):
+  """Otsu threshold with the text as foreground (the minority class, dark or light)"""
+  _, mask = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+  if np.count_nonzero(mask) > mask.size / 2:
+    mask = 255 - mask
+  return mask
+
+def segment(gray):
+  """
+  Split a single-line numeric crop into glyph masks, left to right.
+  Glyphs are separated by empty columns in the column projection.
+  """
+  mask = _binarize(gray)
+  columns = np.count_nonzero(mask, axis=0) > 0
+
+  # Start/end columns of each run of non-empty columns
+  edges = np.flatnonzero(np.diff(np.concatenate([[0], columns.astype(np.int8), [0]])))
+  glyphs = []
+  for start, end in zip(edges[::2], edges[1::2]):
+    if end - start < MIN_GLYPH_WIDTH:
+      continue
+    glyph = mask[:, start:end]
+    rows = np.flatnonzero(np.count_nonzero(glyph, axis=1))
+    glyphs.append(glyph[rows[0]:rows[-1] + 1])
+  return glyphs
+
+def _normalize(glyph):
+  """Fixed-size, zero-mean, unit-length vector for correlation"""
+  vector = cv2.resize(glyph, GLYPH_SIZE, interpolation=cv2.INTER_AREA).astype(np.float32).ravel()
+  vector -= vector.mean()
+  norm = np.linalg.norm(vector)
+  return vector / norm if norm else vector
+
+class DigitClassifier:
+  """
+  Reads numbers in the game's fixed font without EasyOCR.
+  Glyphs are correlated against one template per digit; templates are learned
+  from EasyOCR reads the caller trusts and saved to `template_dir`.
+  """
+  def __init__(self, template_dir):
+    self.template_dir = template_dir
+    self._lock = threading.Lock()
+    # (digits, matrix) swapped as one tuple so readers never see them out of sync
+    self._templates = ((), np.empty((0, GLYPH_SIZE[0] * GLYPH_SIZE[1]), dtype=np.float32))
+    # digit -> [(glyph, vector)] samples waiting for agreement
+    self._candidates = {}
+    self.hits = 0
+    self.misses = 0
+    self._load()
+
+  def _load(self):
+    if not os.path.isdir(self.template_dir):
+      return
+    for digit in "0123456789":
+      path = os.path.join(self.template_dir, f"{digit}.png")
+      glyph = cv2.imread(path, cv2.IMREAD_GRAYSCALE) if os.path.exists(path) else None
+      if glyph is not None:
+        self._add(digit, glyph)
+    if self.digits:
+      print(f"[DIGITS] Loaded {self.template_dir} templates for: {''.join(self.digits)}")
+
+  @property
+  def digits(self):
+    return self._templates[0]
+
+  @property
+  def ready(self):
+    """True once every digit has a template. Until then classify() always defers to EasyOCR"""
+    return len(self.digits) == 10
+
+  def _add(self, digit, glyph):
+    digits, matrix = self._templates
+    self._templates = (digits + (digit,), np.vstack([matrix, _normalize(glyph)]))
+
+  def classify(self, gray):
+    """
+    Read the number in a grayscale crop. Returns (value, score), or None if any glyph
+    is not a confident match (noise, a non-digit) or not all ten templates are learned yet.
+    """
+    digits, matrix = self._templates
+    glyphs = segment(gray) if len(digits) == 10 else None
+    if not glyphs:
+      self.misses += 1
+      return None
+
+    # (glyphs x templates) correlation matrix in one product
+    scores = np.stack([_normalize(glyph) for glyph in glyphs]) @ matrix.T
+    order = np.argsort(-scores, axis=1)
+    rows = np.arange(len(glyphs))
+    best = scores[rows, order[:, 0]]
+    runner_up = scores[rows, order[:, 1]]
+    if best.min() < MIN_SCORE or (best - runner_up).min() < MIN_MARGIN:
+      self.misses += 1
+      return None
+
+    self.hits += 1
+    return int("".join(digits[i] for i in order[:, 0])), float(best.min())
+
+  def learn(self, gray, text):
+    """
+    Collect samples for digits not learned yet, given a trusted read of `gray`. A digit is
+    saved once LEARN_SAMPLES of its samples agree. Returns the count of digits added
+    """
+    glyphs = segment(gray)
+    if not text.isdigit() or len(glyphs) != len(text):
+      return 0
+
+    added = 0
+    with self._lock:
+      for digit, glyph in zip(text, glyphs):
+        if digit in self.digits:
+          continue
+        vector = _normalize(glyph)
+        if self._looks_like_other(digit, vector):
+          continue
+        candidates = self._candidates.setdefault(digit, [])
+        candidates.append((glyph, vector))
+        del candidates[:-MAX_CANDIDATES]
+
+        agreeing = [sample for sample, other in candidates if float(vector @ other) >= AGREE_SCORE]
+        if len(agreeing) < LEARN_SAMPLES:
+          continue
+        try:
+          os.makedirs(self.template_dir, exist_ok=True)
+          cv2.imwrite(os.path.join(self.template_dir, f"{digit}.png"), glyph)
+        except Exception as e:
+          print(f"[DIGITS] Could not save template for {digit}: {e}")
+        self._add(digit, glyph)
+        del self._candidates[digit]
+        added += 1
+    if added:
+      print(f"[DIGITS] Learned digits for {self.template_dir}, templates now: {''.join(sorted(self.digits))}")
+    return added
+
+  def _looks_like_other(self, digit, vector):
+    """True if the sample matches another digit's template, i.e. the label is likely wrong"""
+    digits, matrix = self._templates
+    if not digits:
+      return False
+    scores = matrix @ vector
+    best = int(np.argmax(scores))
+    return digits[best] != digit and scores[best] >= MIN_SCORE
+
+  def stats(self):
+    reads = self.hits + self.misses
+    return {
+      "digits": "".join(sorted(self.digits)),
+      "hits": self.hits,
+      "misses": self.misses,
+      "hit_rate": self.hits / reads if reads else 0.0
+    }
+
+# Fields use different fonts and sizes (stats, skill points), so each learns its own templates
+_classifiers = {}
+_classifiers_lock = threading.Lock()
+
+def get_classifier(field):
+  """The classifier for one numeric field, loading its saved templates on first use"""
+  classifier = _classifiers.get(field)
+  if classifier is None:
+    with _classifiers_lock:
+      classifier = _classifiers.get(field)
+      if classifier is None:
+        classifier = _classifiers[field] = DigitClassifier(os.path.join(DIGIT_TEMPLATE_DIR, field))
+  return classifier
@@ -0,0 +1,145 @@
+import json
+import os
+
+import numpy as np
+
+from core.asset_index import asset_index
+
+# English events of the configured deck in one uncompressed .npz: a string table (`offsets`
+# into `blob`, one compact JSON record per event followed by a comma) and `meta` with the deck
+# and source file stamps. Build ahead of time with `python -m core.event_bundle`;
+# reload_config also saves one after loading from JSON.
+BUNDLE_PATH = "assets/event_bundle.npz"
+BUNDLE_VERSION = 2
+
+# A file added, removed or renamed in these directories changes their mtime and makes the bundle
+# stale; edits are caught by stamping the deck's own files
+SOURCE_DIRS = ("assets/character/nested", "assets/support/nested", "assets/scenario")
+
+def _deck(config):
+  """The parts of config that decide which events are loaded"""
+  def pick(entry):
+    return {"id": entry.get("id"), "name": entry.get("name")} if entry else None
+  return {
+    "character": pick(config.get("character")),
+    "support_cards": [pick(card) for card in config.get("support_cards") or []],
+    "scenario": pick(config.get("scenario"))
+  }
+
+def _deck_files(deck):
+  """Event files the deck can be loaded from, as _load_deck_events looks them up"""
+  paths = []
+  if deck["character"]:
+    paths += asset_index.find_files("character", deck["character"]["id"])
+  for card in deck["support_cards"]:
+    if card:
+      paths += asset_index.find_files("support", card["id"], card["name"])
+  if deck["scenario"]:
+    paths.append(f"assets/scenario/{deck['scenario']['id']}.json")
+  return paths
+
+def _source_stamps(deck):
+  stamps = {}
+  for path in list(SOURCE_DIRS) + _deck_files(deck):
+    try:
+      stat = os.stat(path)
+      stamps[path] = [stat.st_mtime_ns, stat.st_size]
+    except OSError:
+      stamps[path] = None
+  return stamps
+
+def _encode(record):
+  return json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def save(config, deck, path=BUNDLE_PATH):
+  """
+  Write (character_data, support_cards_data, scenario_data) as loaded by reload_config.
+  Incomplete decks (a slot that could not be loaded) are not bundled. Returns True if written.
+  """
+  character_data, support_cards_data, scenario_data = deck
+  wanted = _deck(config)
+  if ((wanted["character"] and character_data is None) or (wanted["scenario"] and scenario_data is None)
+      or any(card and data is None for card, data in zip(wanted["support_cards"], support_cards_data))):
+    print("[CONFIG] Deck is incomplete, event bundle not saved")
+    return False
+
+  records = []
+
+  def add(events):
+    start = len(records)
+    for event in events:
+      records.append(_encode(event) + b",")
+    return [start, len(records)]
+
+  groups = {"character": None, "support_cards": [], "scenario": None}
+  if character_data is not None:
+    groups["character"] = {"id": character_data["id"], "name": character_data["name"], "events": add(character_data["events"])}
+  for card in support_cards_data:
+    groups["support_cards"].append(
+      None if card is None else {"id": card["id"], "name": card["name"], "events": add(card["events"])})
+  if scenario_data is not None:
+    # The scenario file is kept whole, as reload_config stores it
+    groups["scenario"] = {"id": scenario_data["id"], "name": scenario_data["name"], "events": add([scenario_data["events"]])}
+
+  offsets = np.zeros(len(records) + 1, dtype=np.int64)
+  offsets[1:] = np.cumsum([len(record) for record in records])
+  meta = {"version": BUNDLE_VERSION, "deck": wanted, "sources": _source_stamps(wanted), "groups": groups}
+
+  tmp_path = path + ".tmp"
+  try:
+    with open(tmp_path, "wb") as f:
+      np.savez(f,
+               meta=np.frombuffer(_encode(meta), dtype=np.uint8),
+               offsets=offsets,
+               blob=np.frombuffer(b"".join(records), dtype=np.uint8))
+    os.replace(tmp_path, path)
+  except Exception as e:
+    print(f"[CONFIG] Could not save event bundle: {e}")
+    if os.path.exists(tmp_path):
+      os.remove(tmp_path)
+    return False
+  print(f"[CONFIG] Saved event bundle with {len(records)} records to {path}")
+  return True
+
+def load(config, path=BUNDLE_PATH):
+  """
+  (character_data, support_cards_data, scenario_data) for config's deck, or None if the bundle
+  is missing, built for another deck or older than the JSON sources (the caller then reads those)
+  """
+  if not os.path.exists(path):
+    return None
+  try:
+    with np.load(path, allow_pickle=False) as bundle:
+      meta = json.loads(bundle["meta"].tobytes().decode("utf-8"))
+      deck = _deck(config)
+      if meta.get("version") != BUNDLE_VERSION or meta.get("deck") != deck:
+        return None
+      if meta.get("sources") != _source_stamps(deck):
+        print("[CONFIG] Event bundle is out of date, loading JSON sources")
+        return None
+      offsets = bundle["offsets"]
+      blob = bundle["blob"].tobytes()
+  except Exception as e:
+    print(f"[CONFIG] Could not read event bundle, loading JSON sources: {e}")
+    return None
+
+  def events(span):
+    # A group's records are contiguous, so they decode as one JSON array
+    start, end = span
+    if start == end:
+      return []
+    return json.loads(b"[" + blob[offsets[start]:offsets[end] - 1] + b"]")
+
+  def group(entry):
+    return None if entry is None else {"id": entry["id"], "name": entry["name"], "events": events(entry["events"])}
+
+  groups = meta["groups"]
+  scenario = group(groups["scenario"])
+  if scenario is not None:
+    scenario["events"] = scenario["events"][0]
+  return group(groups["character"]), [group(card) for card in groups["support_cards"]], scenario
+
+if __name__ == "__main__":
+  import core.state as state
+  config = state.load_config()
+  save(config, state._load_deck_events(config))
@@ -0,0 +1,165 @@
+from collections import defaultdict
+
+try:
+  from rapidfuzz import fuzz, process
+  from rapidfuzz.utils import default_process
+except ImportError:  # pinned in requirements.txt; without it only the token matcher is used
+  process = None
+  print("[EVENT] rapidfuzz is not installed, fuzzy event matching is disabled")
+
+# Scores at or below this go through the translation matcher too (same rule as calculate_text_similarity)
+DIRECT_SCORE_TRUST = 0.3
+
+# rapidfuzz matches below this fall back to the token matcher (see benchmarks/event_matching.py)
+FUZZY_MATCH_THRESHOLD = 0.8
+
+def tokenize(text):
+  """Lowercased whitespace tokens, as compared by calculate_text_similarity"""
+  return frozenset(text.lower().split())
+
+def _is_ascii(text):
+  return all(ord(ch) < 128 for ch in text)
+
+class EventEntry:
+  __slots__ = ("id", "source", "slot", "event", "name", "lower", "tokens", "ascii")
+
+  def __init__(self, id, source, slot, event):
+    self.id = id
+    self.source = source
+    self.slot = slot
+    self.event = event
+    self.name = event["name"]
+    self.lower = self.name.lower()
+    self.tokens = tokenize(self.name)
+    self.ascii = _is_ascii(self.name)
+
+class EventIndex:
+  """
+  In-memory index over the loaded character, support card and scenario events.
+  Entry ids follow the order find_best_event_match used to scan the data, so ties
+  still go to the event that came first. Lookups only score events sharing a token
+  with the query, plus non-ASCII names, which can only match through translation.
+  """
+  def __init__(self, translate=None):
+    self.entries = []
+    self.by_token = defaultdict(list)
+    self.by_source = defaultdict(list)
+    self.non_ascii = []
+    self.translate = translate
+    # Normalized names for rapidfuzz, built on first fuzzy lookup
+    self._choices = None
+
+  def add(self, source, event, slot=None):
+    if not isinstance(event, dict) or not isinstance(event.get("name"), str):
+      return
+    entry = EventEntry(len(self.entries), source, slot, event)
+    self.entries.append(entry)
+    self.by_source[source].append(entry.id)
+    for token in entry.tokens:
+      self.by_token[token].append(entry.id)
+    if not entry.ascii:
+      self.non_ascii.append(entry.id)
+    self._choices = None
+
+  def __len__(self):
+    return len(self.entries)
+
+  def scores(self, text, sources=None):
+    """
+    {entry id: similarity} for every event that can score above zero, using the same
+    Jaccard + translation rule as calculate_text_similarity.
+    """
+    query = tokenize(text)
+    if not query:
+      return {}
+
+    overlap = defaultdict(int)
+    for token in query:
+      for entry_id in self.by_token.get(token, ()):
+        overlap[entry_id] += 1
+
+    # Translation can only score when one side has Japanese text
+    if _is_ascii(text):
+      translatable = self.non_ascii
+    else:
+      translatable = range(len(self.entries))
+
+    lower = text.lower()
+    result = {}
+    for entry_id in sorted(set(overlap).union(translatable)):
+      entry = self.entries[entry_id]
+      if not entry.tokens or (sources and entry.source not in sources):
+        continue
+      inter = overlap.get(entry_id, 0)
+      score = inter / (len(query) + len(entry.tokens) - inter)
+      if score <= DIRECT_SCORE_TRUST and self.translate:
+        score = max(score, self.translate(lower, entry.lower))
+      if score > 0:
+        result[entry_id] = score
+    return result
+
+  def fuzzy(self, text, limit=5, score_cutoff=0.0):
+    """
+    Top `limit` events by rapidfuzz token_ratio (tolerant to OCR typos, word order and extra
+    words such as a leading "Support Card Event"), as [(entry, score 0-1)] best first.
+    Empty if rapidfuzz is unavailable.
+    """
+    if process is None or not self.entries:
+      return []
+    if self._choices is None:
+      self._choices = [default_process(entry.name) for entry in self.entries]
+
+    query = default_process(text)
+    if not query:
+      return []
+    matches = process.extract(query, self._choices, scorer=fuzz.token_ratio, processor=None,
+                              limit=limit, score_cutoff=score_cutoff * 100)
+    return [(self.entries[entry_id], score / 100) for _, score, entry_id in matches]
+
+  def lookup(self, text):
+    """
+    (entry, score) used by find_best_event_match: the rapidfuzz match when it is confident,
+    otherwise the token/translation matcher (Japanese names, heavily garbled text).
+    """
+    matches = self.fuzzy(text, limit=1, score_cutoff=FUZZY_MATCH_THRESHOLD)
+    if matches:
+      return matches[0]
+    return self.best(text)
+
+  def best(self, text, sources=None):
+    """(entry, score) for the best matching event, first entry winning ties, or (None, 0)"""
+    best_entry, best_score = None, 0
+    for entry_id, score in self.scores(text, sources).items():
+      if score > best_score:
+        best_entry, best_score = self.entries[entry_id], score
+    return best_entry, best_score
+
+def build_event_index(character_data, support_cards_data, scenario_data, translate=None):
+  """Index the events of the loaded character, support cards and scenario, in scan order"""
+  index = EventIndex(translate)
+
+  if character_data and "events" in character_data:
+    char_events = character_data["events"]
+    if isinstance(char_events, dict):
+      char_events = char_events.get("english_events", [])
+    for event in char_events or []:
+      index.add("character", event)
+
+  for slot, card_data in enumerate(support_cards_data or []):
+    if not card_data or not isinstance(card_data.get("events"), list):
+      continue
+    for event in card_data["events"]:
+      # reload_config flattens categories, but nested category lists are indexed too
+      if isinstance(event, dict) and "name" not in event and isinstance(event.get("events"), list):
+        for nested in event["events"]:
+          index.add("support", nested, slot)
+      else:
+        index.add("support", event, slot)
+
+  if scenario_data and isinstance(scenario_data.get("events"), dict):
+    scenario_events = scenario_data["events"]
+    for key in ("events_with_choices", "events_without_choices"):
+      for event in scenario_events.get(key, []):
+        index.add("scenario", event)
+
+  return index
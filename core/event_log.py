@@ -0,0 +1,179 @@
+import json
+import os
+import tempfile
+import threading
+from datetime import datetime
+
+# Snapshot in the original event_data.json layout, rewritten only on compaction
+SNAPSHOT_FILE = "event_data.json"
+
+# One JSON record per line, appended as events are logged
+JOURNAL_FILE = "event_log.jsonl"
+
+# Journal records folded into the snapshot at a time
+COMPACT_EVERY = 200
+
+def _fsync_dir(path):
+  """Make a rename in `path` durable (not supported on Windows, where rename is already durable enough)"""
+  if os.name == "nt":
+    return
+  fd = os.open(path or ".", os.O_RDONLY)
+  try:
+    os.fsync(fd)
+  finally:
+    os.close(fd)
+
+class EventLog:
+  """
+  Append-only event journal with a compacted snapshot.
+  Logging an event or an outcome appends one fsync'ed line to the journal, so the cost
+  does not depend on history length and a crash can at most lose a torn last line.
+  Every COMPACT_EVERY records the journal is folded into the snapshot, written to a
+  temp file and swapped in with os.replace. Journal records carry a sequence number and
+  the snapshot records the last one it contains, so a crash between the swap and the
+  journal truncation does not replay records twice.
+  """
+  def __init__(self, snapshot_path=SNAPSHOT_FILE, journal_path=JOURNAL_FILE, compact_every=COMPACT_EVERY):
+    self.snapshot_path = snapshot_path
+    self.journal_path = journal_path
+    self.compact_every = compact_every
+    self._lock = threading.Lock()
+    # Next sequence number and journal length, found on first append
+    self._seq = None
+    self._pending = 0
+
+  def _read_snapshot(self):
+    if not os.path.exists(self.snapshot_path):
+      return {"metadata": {"created": datetime.now().isoformat(), "total_events": 0, "version": "1.0"}, "events": []}
+    with open(self.snapshot_path, "r", encoding="utf-8") as f:
+      return json.load(f)
+
+  def _journal(self, after_seq=0):
+    """Stream journal records with a sequence number above `after_seq`, skipping a torn last line"""
+    if not os.path.exists(self.journal_path):
+      return
+    with open(self.journal_path, "r", encoding="utf-8") as f:
+      for line in f:
+        line = line.strip()
+        if not line:
+          continue
+        try:
+          record = json.loads(line)
+        except json.JSONDecodeError:
+          print(f"[EVENT] Skipping unreadable line in {self.journal_path}")
+          continue
+        if record.get("seq", 0) > after_seq:
+          yield record
+
+  def _open(self):
+    """Pick up the sequence number and journal length left by earlier runs"""
+    compacted = self._read_snapshot().get("metadata", {}).get("compacted_seq", 0)
+    last, pending = compacted, 0
+    for record in self._journal(compacted):
+      last = max(last, record.get("seq", 0))
+      pending += 1
+    self._seq = last + 1
+    self._pending = pending
+    # A torn last line must not swallow the next record
+    if os.path.exists(self.journal_path) and os.path.getsize(self.journal_path):
+      with open(self.journal_path, "rb+") as f:
+        f.seek(-1, os.SEEK_END)
+        if f.read(1) != b"\n":
+          f.write(b"\n")
+
+  def _append(self, record):
+    with self._lock:
+      if self._seq is None:
+        self._open()
+      record = {"seq": self._seq, **record}
+      line = json.dumps(record, ensure_ascii=False) + "\n"
+      with open(self.journal_path, "a", encoding="utf-8") as f:
+        f.write(line)
+        f.flush()
+        os.fsync(f.fileno())
+      self._seq += 1
+      self._pending += 1
+      if self._pending >= self.compact_every:
+        self._compact()
+
+  def append(self, event):
+    """Log one event (a dict, normally with a session_id). Returns True once it is on disk"""
+    try:
+      self._append({"type": "event", "event": event})
+      return True
+    except Exception as e:
+      print(f"[ERROR] Failed to append event to {self.journal_path}: {e}")
+      return False
+
+  def update_outcome(self, session_id, outcome):
+    """Attach an outcome to the logged event with this session_id"""
+    try:
+      self._append({"type": "outcome", "session_id": session_id, "outcome": outcome})
+      return True
+    except Exception as e:
+      print(f"[ERROR] Failed to append outcome to {self.journal_path}: {e}")
+      return False
+
+  def _replay(self, snapshot):
+    """Snapshot events followed by journal events, with journaled outcomes applied"""
+    after = snapshot.get("metadata", {}).get("compacted_seq", 0)
+    # Outcomes first, the journal is at most compact_every records long
+    outcomes = {}
+    for record in self._journal(after):
+      if record.get("type") == "outcome":
+        outcomes[record.get("session_id")] = record.get("outcome", {})
+
+    def with_outcome(event):
+      session_id = event.get("session_id")
+      if session_id in outcomes:
+        return {**event, "outcome": outcomes[session_id]}
+      return event
+
+    for event in snapshot.get("events", []):
+      yield with_outcome(event)
+    for record in self._journal(after):
+      if record.get("type") == "event":
+        yield with_outcome(record.get("event", {}))
+
+  def events(self):
+    """Iterate over every logged event, oldest first"""
+    return self._replay(self._read_snapshot())
+
+  def _compact(self):
+    snapshot = self._read_snapshot()
+    events = list(self._replay(snapshot))
+    metadata = dict(snapshot.get("metadata", {}))
+    metadata.update({
+      "total_events": len(events),
+      "last_updated": datetime.now().isoformat(),
+      "compacted_seq": self._seq - 1
+    })
+
+    directory = os.path.dirname(os.path.abspath(self.snapshot_path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".event_data.", suffix=".tmp")
+    try:
+      with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump({"metadata": metadata, "events": events}, f, indent=2, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+      os.replace(tmp_path, self.snapshot_path)
+      _fsync_dir(directory)
+    except Exception:
+      if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+      raise
+
+    # Everything up to compacted_seq is in the snapshot now
+    open(self.journal_path, "w", encoding="utf-8").close()
+    self._pending = 0
+    print(f"[EVENT] Compacted event log into {self.snapshot_path} ({len(events)} events)")
+
+  def compact(self):
+    """Fold the journal into the snapshot now"""
+    with self._lock:
+      if self._seq is None:
+        self._open()
+      if self._pending:
+        self._compact()
+
+event_log = EventLog()
@@ -1,15 +1,16 @@
 import pyautogui
 import time
+from concurrent.futures import ThreadPoolExecutor
 from PIL import ImageGrab
 
 pyautogui.useImageNotFoundException(False)
 
 import core.state as state
-from core.state import check_support_card, check_failure, check_turn, check_mood, check_current_year, check_criteria, check_skill_pts, check_energy, get_current_energy_level
+from core.state import check_support_card, submit_failure_check, check_turn, check_current_year, check_skill_pts, get_turn_snapshot, invalidate_turn_snapshot
 from core.logic import do_something
-from core.ocr import extract_text
+from core.ocr import extract_text, extract_many
 from utils.constants import MOOD_LIST, SCREEN_BOTTOM_REGION, CHOICE_AREA_REGION
-from utils.screenshot import enhanced_screenshot
+from utils.screenshot import enhanced_screenshot, capture_region, grab_frame, wait_for_settle
 
 def is_valid_mouse_position(pos):
   """Check if mouse position is valid and won't trigger PyAutoGUI fail-safe"""
@@ -127,7 +128,7 @@ def test_choice_4_coordinate():
     # Look for each choice template
     for i, template in enumerate(choice_templates, 1):
       try:
-        location = pyautogui.locateCenterOnScreen(template, confidence=0.8, minSearchTime=0.5)
+        location = locate(template, threshold=0.8, timeout=0.5)
         if location:
           # Validate it's in the choice area (right side of screen, reasonable Y position)
           if location.x > 200 and 300 <= location.y <= 900:
@@ -158,75 +159,107 @@ def test_choice_4_coordinate():
     print(f"[ERROR] Failed to detect number of choices: {e}")
     return None, None
 
-def detect_number_of_choices():
+# Choice icons, matched in one pass over the frame (search area in TEMPLATE_REGIONS)
+CHOICE_TEMPLATES = {i: f"assets/icons/event_choice_{i}.png" for i in range(1, 6)}
+CHOICE_MATCH_THRESHOLD = 0.6
+
+def detect_number_of_choices(frame=None):
   """
   Detect how many event choices are currently visible on screen
-  Returns the number of choices (1-5) or None if unable to detect
+  Returns (number of choices, {choice number: (x, y)}) or (None, None) if unable to detect
   """
   try:
-    # First, try to find any event choice icons using a more general approach
-    # Look for common choice icon patterns rather than specific numbered templates
-    general_choice_patterns = [
-      "assets/icons/event_choice_1.png",
-      "assets/icons/event_choice_2.png",
-      "assets/icons/event_choice_3.png",
-      "assets/icons/event_choice_4.png",
-      "assets/icons/event_choice_5.png"
-    ]
+    if frame is None:
+      frame = grab_frame()
+    matches = multi_match_templates(CHOICE_TEMPLATES, screen=frame, threshold=CHOICE_MATCH_THRESHOLD)
 
+    # Best match of each template
     found_positions = []
-
-    # Look for each choice template with lower confidence to catch variations
-    for i, template in enumerate(general_choice_patterns, 1):
-      try:
-        # Try multiple confidence levels
-        for confidence in [0.9, 0.8, 0.7, 0.6]:
-          location = pyautogui.locateCenterOnScreen(template, confidence=confidence, minSearchTime=0.3)
-          if location:
-            # Validate it's in the choice area (right side of screen, reasonable Y position)
-            if location.x > 150 and 250 <= location.y <= 900:
-              found_positions.append((i, location, confidence))
-              print(f"[DEBUG] Found choice template {i} at {location} (confidence: {confidence})")
-              break  # Found it, move to next template
-      except Exception as e:
-        continue
+    for template_num, boxes in matches.items():
+      if boxes:
+        x, y, w, h = boxes[0]
+        found_positions.append((template_num, (x + w // 2, y + h // 2)))
+        print(f"[DEBUG] Found choice template {template_num} at {found_positions[-1][1]}")
 
     if not found_positions:
       print("[DEBUG] No choice templates found")
       return None, None
 
-    # Remove duplicates (same position found by multiple templates)
+    # Remove duplicates (same position found by multiple templates, within 20 pixels)
     unique_positions = []
-    for template_num, pos, confidence in found_positions:
-      # Check if this position is already found (within 20 pixels)
-      is_duplicate = False
-      for _, existing_pos, _ in unique_positions:
-        if abs(pos.x - existing_pos.x) < 20 and abs(pos.y - existing_pos.y) < 20:
-          is_duplicate = True
-          break
-      if not is_duplicate:
-        unique_positions.append((template_num, pos, confidence))
-
-    print(f"[DEBUG] Found {len(unique_positions)} unique choice positions")
+    for template_num, pos in found_positions:
+      if all(abs(pos[0] - other[0]) >= 20 or abs(pos[1] - other[1]) >= 20 for _, other in unique_positions):
+        unique_positions.append((template_num, pos))
 
     # Sort by Y position to determine the actual choice order
-    unique_positions.sort(key=lambda x: x[1].y)
-
+    unique_positions.sort(key=lambda item: item[1][1])
     num_choices = len(unique_positions)
     print(f"[DEBUG] Detected {num_choices} choices on screen")
 
     # Map the found positions to choice numbers based on their vertical order
-    position_mapping = {}
-    for choice_num, (template_num, pos, confidence) in enumerate(unique_positions, 1):
-      position_mapping[choice_num] = (pos.x, pos.y)
-      print(f"[DEBUG] Choice {choice_num} mapped to position {pos} (from template {template_num}, conf: {confidence})")
-
+    position_mapping = {choice_num: pos for choice_num, (_, pos) in enumerate(unique_positions, 1)}
     return num_choices, position_mapping
 
   except Exception as e:
     print(f"[ERROR] Failed to detect number of choices: {e}")
     return None, None
 
+# Event screen text lines (x, y, width, height): type ("Trainee Event", "Support Card Event", ...) and title
+EVENT_TYPE_REGION = (150, 157, 634 - 150, 190 - 157)
+EVENT_TITLE_REGION = (150, 190, 634 - 150, 241 - 190)
+
+def resolve_event(frame):
+  """
+  Everything needed to answer the event on screen, from one frame: both text lines in one
+  OCR batch, one event match, the learned/database lookups once and the choice icons in one
+  matching pass. Auto-choice events skip the lookups.
+  Returns a dict, or None if no title could be read.
+  """
+  type_text, title = (text.strip() for text in extract_many([
+    capture_region(EVENT_TYPE_REGION, frame), capture_region(EVENT_TITLE_REGION, frame)]))
+  print(f"[EVENT] Event type: '{type_text}'")
+  print(f"[EVENT] Event title: '{title}'")
+  if not title:
+    return None
+
+  event_type = "character"
+  if "support" in type_text.lower():
+    event_type = "support"
+  elif "scenario" in type_text.lower():
+    event_type = "scenario"
+
+  # Remove trailing dots/ellipsis and normalize basic characters
+  text = title.replace("'$", "'s").replace("' ", "'").strip().rstrip('.').strip()
+  match = state.find_best_event_match(text)
+  event_data = match[1]
+  num_choices, positions = detect_number_of_choices(frame)
+
+  event = {
+    "type_text": type_text,
+    "title": title,
+    "text": text,
+    "event_type": event_type,
+    "match": match,
+    "event_data": event_data,
+    "confidence": match[2],
+    "auto_choice": event_data.get("auto_choice") if isinstance(event_data, dict) else None,
+    "choices": [],
+    "learned_choice": None,
+    "choice": 1,
+    "from_database": False,
+    "num_choices": num_choices,
+    "positions": positions
+  }
+  if event["auto_choice"]:
+    event["choice"] = event["auto_choice"]
+    return event
+
+  event["choices"] = state.get_event_choices_from_database(text, event_type, match=match)
+  if len(event["choices"]) > 1:
+    event["learned_choice"] = state.get_learned_choice_for_event(text)
+    event["choice"], event["from_database"] = state.get_optimal_event_choice_from_database(text, event_type)
+  return event
+
 def get_choice_position_by_coordinate(choice_number, num_choices=None, position_mapping=None):
   """
   Get choice position based on measured screen coordinates
@@ -316,7 +349,7 @@ def test_choice_2_with_2_choices():
     found_choices = []
     for i, template in enumerate(choice_templates, 1):
       try:
-        location = pyautogui.locateCenterOnScreen(template, confidence=0.8, minSearchTime=0.5)
+        location = locate(template, threshold=0.8, timeout=0.5)
         if location and location.x > 200 and 300 <= location.y <= 900:
           found_choices.append((i, location))
           print(f"[TEST] Found choice {i} at {location}")
@@ -405,7 +438,7 @@ def test_choice_4_with_cursor():
     found_choices = []
     for i, template in enumerate(choice_templates, 1):
       try:
-        location = pyautogui.locateCenterOnScreen(template, confidence=0.8, minSearchTime=0.5)
+        location = locate(template, threshold=0.8, timeout=0.5)
         if location and location.x > 200 and 300 <= location.y <= 900:
           found_choices.append((i, location))
           print(f"[TEST] Found choice {i} at {location}")
@@ -467,32 +500,6 @@ def test_choice_4_with_cursor():
     print(f"[TEST] Error during choice 4 test: {e}")
     return None
 
-def multi_match_templates(templates, screen=None):
-  """
-  Perform multi-template matching on the screen
-  Returns a dictionary of template names to list of (x, y, w, h) boxes
-  """
-  matches = {}
-  
-  for name, template_path in templates.items():
-    try:
-      # Use pyautogui to find all instances of the template
-      locations = list(pyautogui.locateAllOnScreen(template_path, confidence=0.8, grayscale=True))
-      if locations:
-        # Convert Location objects to (x, y, w, h) tuples
-        boxes = []
-        for loc in locations:
-          boxes.append((loc.left, loc.top, loc.width, loc.height))
-        matches[name] = boxes
-        print(f"[DEBUG] Found {len(boxes)} instances of {name}")
-      else:
-        matches[name] = []
-    except Exception as e:
-      print(f"[DEBUG] Error matching template {name}: {e}")
-      matches[name] = []
-      
-  return matches
-
 def test_choice_4_coordinate():
   """
   Detect how many event choices are currently visible on screen
@@ -512,7 +519,7 @@ def test_choice_4_coordinate():
     # Look for each choice template
     for i, template in enumerate(choice_templates, 1):
       try:
-        location = pyautogui.locateCenterOnScreen(template, confidence=0.8, minSearchTime=0.5)
+        location = locate(template, threshold=0.8, timeout=0.5)
         if location:
           # Validate it's in the choice area (right side of screen, reasonable Y position)
           if location.x > 200 and 300 <= location.y <= 900:
@@ -634,7 +641,7 @@ def test_choice_4_coordinate():
     # Look for each choice template
     for i, template in enumerate(choice_templates, 1):
       try:
-        location = pyautogui.locateCenterOnScreen(template, confidence=0.8, minSearchTime=0.5)
+        location = locate(template, threshold=0.8, timeout=0.5)
         if location:
           # Validate it's in the choice area (right side of screen, reasonable Y position)
           if location.x > 200 and 300 <= location.y <= 900:
@@ -858,7 +865,7 @@ def is_post_race_navigation_screen():
     print(f"[ERROR] Failed to check post-race screen: {e}")
 
   return False
-from core.recognizer import is_btn_active, match_template, multi_match_templates
+from core.recognizer import is_btn_active, match_template, multi_match_templates, locate
 from utils.scenario import ura
 from core.skill import buy_skill
 
@@ -873,7 +880,9 @@ templates = {
   "retry": "assets/buttons/retry_btn.png"
 }
 
-def click(img: str = None, confidence: float = 0.8, minSearch:float = 2, click: int = 1, text: str = "", boxes = None):
+def click(img: str = None, confidence: float = 0.8, minSearch:float = 2, click: int = 1, text: str = "", boxes = None,
+          settle: float = None):
+  # With `settle`, wait (at most that long) for the screen to react to the click and settle
   if not state.is_bot_running:
     return False
 
@@ -881,6 +890,7 @@ def click(img: str = None, confidence: float = 0.8, minSearch:float = 2, click:
     if isinstance(boxes, list):
       if len(boxes) == 0:
         return False
+      # Matchers return the best-scoring box first
       box = boxes[0]
     else :
       box = boxes
@@ -911,6 +921,7 @@ def click(img: str = None, confidence: float = 0.8, minSearch:float = 2, click:
       print(f"[DEBUG] Error checking button appearance: {e}")
     
     # Try multiple click attempts with slight variations
+    before = grab_frame()
     for attempt in range(3):
       try:
         if attempt == 0:
@@ -930,18 +941,23 @@ def click(img: str = None, confidence: float = 0.8, minSearch:float = 2, click:
       except Exception as e:
         print(f"[DEBUG] Click attempt {attempt + 1} failed: {e}")
     
+    if settle:
+      wait_for_settle(timeout=settle, since=before)
     return True
 
   if img is None:
     return False
 
   print(f"[DEBUG] Looking for image: {img}")
-  btn = pyautogui.locateCenterOnScreen(img, confidence=confidence, minSearchTime=minSearch)
+  btn = locate(img, threshold=confidence, timeout=minSearch)
   if btn and is_valid_mouse_position(btn):
     if text:
       print(text)
     pyautogui.moveTo(btn, duration=0.175)
+    before = grab_frame()
     pyautogui.click(clicks=click)
+    if settle:
+      wait_for_settle(timeout=settle, since=before)
     return True
   else:
     if btn:
@@ -951,13 +967,18 @@ def click(img: str = None, confidence: float = 0.8, minSearch:float = 2, click:
   
   return False
 
-def go_to_training():
+def go_to_training(settle=None):
   print("[DEBUG] Looking for training button...")
-  result = click("assets/buttons/training_btn.png", text="[INFO] Training button found and clicked.")
+  result = click("assets/buttons/training_btn.png", text="[INFO] Training button found and clicked.", settle=settle)
   if not result:
     print("[DEBUG] Training button not found on screen")
   return result
 
+# Threads matching support icons on the hover captures while the mouse moves on
+TRAINING_ANALYSIS_WORKERS = 5
+# Longest wait for a training button to redraw as pressed before its hover is captured
+TRAINING_HOVER_TIMEOUT = 0.3
+
 def check_training():
   training_types = {
     "spd": "assets/icons/train_spd.png",
@@ -967,22 +988,51 @@ def check_training():
     "wit": "assets/icons/train_wit.png"
   }
   results = {}
-  
-  fail_check_states="train","no_train","check_all"
-
-  failcheck="check_all"
-  margin=5
+  pool = ThreadPoolExecutor(max_workers=TRAINING_ANALYSIS_WORKERS, thread_name_prefix="training")
+  # Failure reads are queued on one thread: inline OCR runs them one at a time there, and
+  # with the OCR service each one only hands its crop to a worker process
+  ocr_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="training-ocr")
+  support_futures = {}
+  failure_futures = {}
+
+  # Hover every training back to back; each capture is handed to the pool right away
+  # and is also where the next training button is looked up
+  frame = grab_frame()
   for key, icon_path in training_types.items():
-    pos = pyautogui.locateCenterOnScreen(icon_path, confidence=0.8, region=SCREEN_BOTTOM_REGION)
+    pos = locate(icon_path, region=SCREEN_BOTTOM_REGION, frame=frame)
     if pos and is_valid_mouse_position(pos):
       pyautogui.moveTo(pos, duration=0.1)
+      before = grab_frame()
       pyautogui.mouseDown()
-      support_counts = check_support_card()
+      frame = wait_for_settle(timeout=TRAINING_HOVER_TIMEOUT, since=before)
+      support_futures[key] = pool.submit(check_support_card, frame=frame)
+      failure_futures[key] = ocr_pool.submit(submit_failure_check, frame)
+    else:
+      print(f"[DEBUG] Could not find valid position for {key} training icon")
+
+  pyautogui.mouseUp()
+  click(img="assets/buttons/back_btn.png")
+
+  fail_check_states="train","no_train","check_all"
+
+  failcheck="check_all"
+  margin=5
+  try:
+    for key in training_types:
+      if key not in support_futures:
+        results[key] = {
+          "support": {},
+          "total_support": 0,
+          "failure": 0
+        }
+        continue
+
+      support_counts = support_futures[key].result()
       total_support = sum(support_counts.values())
       print(f"failcheck: {failcheck}")
       if key != "wit":
         if failcheck == "check_all":
-          failure_chance = check_failure()
+          failure_chance = failure_futures[key].result().result()
           if failure_chance > (state.MAX_FAILURE + margin):
             print("Failure rate too high skip to check wit")
             failcheck="no_train"
@@ -999,36 +1049,33 @@ def check_training():
         if failcheck == "train":
           failure_chance = 0
         else:
-          failure_chance = check_failure()
+          failure_chance = failure_futures[key].result().result()
       results[key] = {
         "support": support_counts,
         "total_support": total_support,
         "failure": failure_chance
       }
       print(f"[{key.upper()}] → {support_counts}, Fail: {failure_chance}%")
-      time.sleep(0.1)
-    else:
-      print(f"[DEBUG] Could not find valid position for {key} training icon")
-      results[key] = {
-        "support": {},
-        "total_support": 0,
-        "failure": 0
-      }
-  
-  pyautogui.mouseUp()
-  click(img="assets/buttons/back_btn.png")
+  finally:
+    # Failure reads the checks above did not need are dropped if they have not started
+    pool.shutdown(wait=False, cancel_futures=True)
+    ocr_pool.shutdown(wait=False, cancel_futures=True)
+
   return results
 
 def do_train(train):
-  train_btn = pyautogui.locateCenterOnScreen(f"assets/icons/train_{train}.png", confidence=0.8, region=SCREEN_BOTTOM_REGION)
+  invalidate_turn_snapshot()
+  train_btn = locate(f"assets/icons/train_{train}.png", region=SCREEN_BOTTOM_REGION)
   if train_btn and is_valid_mouse_position(train_btn):
     pyautogui.tripleClick(train_btn, interval=0.1, duration=0.2)
   else:
     print(f"[DEBUG] Could not find valid position for {train} training button")
 
 def do_rest():
-  rest_btn = pyautogui.locateCenterOnScreen("assets/buttons/rest_btn.png", confidence=0.8, region=SCREEN_BOTTOM_REGION)
-  rest_summber_btn = pyautogui.locateCenterOnScreen("assets/buttons/rest_summer_btn.png", confidence=0.8, region=SCREEN_BOTTOM_REGION)
+  invalidate_turn_snapshot()
+  frame = grab_frame()
+  rest_btn = locate("assets/buttons/rest_btn.png", region=SCREEN_BOTTOM_REGION, frame=frame)
+  rest_summber_btn = locate("assets/buttons/rest_summer_btn.png", region=SCREEN_BOTTOM_REGION, frame=frame)
 
   if rest_btn and is_valid_mouse_position(rest_btn):
     pyautogui.moveTo(rest_btn, duration=0.15)
@@ -1040,8 +1087,10 @@ def do_rest():
     print("[DEBUG] Could not find valid position for rest button")
 
 def do_recreation():
-  recreation_btn = pyautogui.locateCenterOnScreen("assets/buttons/recreation_btn.png", confidence=0.8, region=SCREEN_BOTTOM_REGION)
-  recreation_summer_btn = pyautogui.locateCenterOnScreen("assets/buttons/rest_summer_btn.png", confidence=0.8, region=SCREEN_BOTTOM_REGION)
+  invalidate_turn_snapshot()
+  frame = grab_frame()
+  recreation_btn = locate("assets/buttons/recreation_btn.png", region=SCREEN_BOTTOM_REGION, frame=frame)
+  recreation_summer_btn = locate("assets/buttons/rest_summer_btn.png", region=SCREEN_BOTTOM_REGION, frame=frame)
 
   if recreation_btn and is_valid_mouse_position(recreation_btn):
     pyautogui.moveTo(recreation_btn, duration=0.15)
@@ -1053,38 +1102,36 @@ def do_recreation():
     print("[DEBUG] Could not find valid position for recreation button")
 
 def do_race(prioritize_g1 = False):
-  click(img="assets/buttons/races_btn.png", minSearch=10)  
+  click(img="assets/buttons/races_btn.png", minSearch=10, settle=0.7)
 
-  consecutive_cancel_btn = pyautogui.locateCenterOnScreen("assets/buttons/cancel_btn.png", minSearchTime=0.7, confidence=0.8)
+  consecutive_cancel_btn = locate("assets/buttons/cancel_btn.png", timeout=0.7)
   if state.CANCEL_CONSECUTIVE_RACE and consecutive_cancel_btn:
     click(img="assets/buttons/cancel_btn.png", text="[INFO] Already raced 3+ times consecutively. Cancelling race and doing training.")
     return False
   elif not state.CANCEL_CONSECUTIVE_RACE and consecutive_cancel_btn:
-    click(img="assets/buttons/ok_btn.png", minSearch=0.7)
+    # Race list slides in
+    click(img="assets/buttons/ok_btn.png", minSearch=0.7, settle=0.7)
 
-  time.sleep(0.7)
   found = race_select(prioritize_g1=prioritize_g1)
   if not found:
     print("[INFO] No race found.")
     return False
 
   race_prep()
-  time.sleep(0.3)
+  wait_for_settle(timeout=0.6, min_wait=0.3)
   after_race()
   return True
 
 def race_day():
   click(img="assets/buttons/race_day_btn.png", minSearch=10)
   
-  click(img="assets/buttons/ok_btn.png")
-  time.sleep(0.5)
+  click(img="assets/buttons/ok_btn.png", settle=0.5)
 
   for i in range(2):
-    click(img="assets/buttons/race_btn.png", minSearch=2)
-    time.sleep(0.5)
+    click(img="assets/buttons/race_btn.png", minSearch=2, settle=0.5)
 
   race_prep()
-  time.sleep(0.3)
+  wait_for_settle(timeout=0.6, min_wait=0.3)
   after_race()
 
 def race_select(prioritize_g1 = False):
@@ -1095,26 +1142,29 @@ def race_select(prioritize_g1 = False):
   else:
     print("[DEBUG] Safe position (560, 680) is invalid, skipping initial move")
 
-  time.sleep(0.2)
+  wait_for_settle(timeout=0.4, min_wait=0.2)
 
   if prioritize_g1:
     print("[INFO] Looking for G1 race.")
+    before = None
     for i in range(2):
-      race_card = match_template("assets/ui/g1_race.png", threshold=0.9)
+      # Cards and their aptitude marks are read from the same frame, once the list stops scrolling
+      frame = wait_for_settle(timeout=0.7, since=before)
+      race_card = match_template("assets/ui/g1_race.png", threshold=0.9, frame=frame)
 
       if race_card:
         for x, y, w, h in race_card:
           region = (x, y, 310, 90)
-          match_aptitude = pyautogui.locateCenterOnScreen("assets/ui/match_track.png", confidence=0.8, minSearchTime=0.7, region=region)
+          match_aptitude = locate("assets/ui/match_track.png", region=region, frame=frame)
           if match_aptitude and is_valid_mouse_position(match_aptitude):
             print("[INFO] G1 race found.")
             pyautogui.moveTo(match_aptitude, duration=0.2)
             pyautogui.click()
             for i in range(2):
-              click(img="assets/buttons/race_btn.png")
-              time.sleep(0.5)
+              click(img="assets/buttons/race_btn.png", settle=0.5)
             return True
       
+      before = grab_frame()
       for i in range(4):
         pyautogui.scroll(-300)
     
@@ -1122,15 +1172,14 @@ def race_select(prioritize_g1 = False):
   else:
     print("[INFO] Looking for race.")
     for i in range(4):
-      match_aptitude = pyautogui.locateCenterOnScreen("assets/ui/match_track.png", confidence=0.8, minSearchTime=0.7)
+      match_aptitude = locate("assets/ui/match_track.png", timeout=0.7)
       if match_aptitude and is_valid_mouse_position(match_aptitude):
         print("[INFO] Race found.")
         pyautogui.moveTo(match_aptitude, duration=0.2)
         pyautogui.click(match_aptitude)
 
         for i in range(2):
-          click(img="assets/buttons/race_btn.png")
-          time.sleep(0.5)
+          click(img="assets/buttons/race_btn.png", settle=0.5)
         return True
       
       for i in range(4):
@@ -1139,17 +1188,20 @@ def race_select(prioritize_g1 = False):
     return False
 
 def race_prep():
-  view_result_btn = pyautogui.locateCenterOnScreen("assets/buttons/view_results.png", confidence=0.8, minSearchTime=10)
+  # Every race (normal, race day, URA finale) ends up here
+  invalidate_turn_snapshot()
+  view_result_btn = locate("assets/buttons/view_results.png", timeout=10)
   if view_result_btn:
+    before = grab_frame()
     pyautogui.click(view_result_btn)
-    time.sleep(0.5)
+    wait_for_settle(timeout=0.5, since=before)
     for i in range(3):
+      before = grab_frame()
       pyautogui.tripleClick(interval=0.2)
-      time.sleep(0.5)
+      wait_for_settle(timeout=0.5, since=before)
 
 def after_race():
-  click(img="assets/buttons/next_btn.png", minSearch=5)
-  time.sleep(0.3)
+  click(img="assets/buttons/next_btn.png", minSearch=5, settle=0.3)
   pyautogui.click()
   click(img="assets/buttons/next2_btn.png", minSearch=5)
 
@@ -1157,27 +1209,26 @@ def auto_buy_skill():
   if check_skill_pts() < state.SKILL_PTS_CHECK:
     return
 
-  click(img="assets/buttons/skills_btn.png")
+  click(img="assets/buttons/skills_btn.png", settle=0.5)
   print("[INFO] Buying skills")
-  time.sleep(0.5)
 
   if buy_skill():
     click(img="assets/buttons/confirm_btn.png", minSearch=0.5)
-    click(img="assets/buttons/learn_btn.png", minSearch=0.5)
-    time.sleep(0.5)
-    click(img="assets/buttons/close_btn.png", minSearch=2)
-    time.sleep(0.5)
+    click(img="assets/buttons/learn_btn.png", minSearch=0.5, settle=0.5)
+    click(img="assets/buttons/close_btn.png", minSearch=2, settle=0.5)
     click(img="assets/buttons/back_btn.png")
   else:
     print("[INFO] No matching skills found. Going back.")
     click(img="assets/buttons/back_btn.png")
 
-def select_event_choice(choice_index, event_text=None, event_type=None):
+def select_event_choice(choice_index, event_text=None, event_type=None, event=None):
   """
   Select event choice using DATABASE-FIRST approach with user wait fallback
   Priority: Database → User Wait (20s) → Template Detection → Default Choice 1
+  `event` is a resolve_event() result; its lookups and choice positions are reused
   Returns True if successful, False otherwise
   """
+  invalidate_turn_snapshot()
   if not state.is_bot_running:
     return False
 
@@ -1186,22 +1237,29 @@ def select_event_choice(choice_index, event_text=None, event_type=None):
   num_choices = None
   position_mapping = None
   
+  # Auto-choice events are already resolved: click the known choice, no lookups or user wait
+  if event and event["auto_choice"]:
+    choice_index = event["auto_choice"]
+    num_choices = max(event["num_choices"] or 0, choice_index)
+    position_mapping = event["positions"]
+    print(f"[EVENT] ⚡ AUTO-CHOICE EVENT: Using choice {choice_index} directly")
   # STEP 1: Try database first (TOP PRIORITY)
-  if event_text and event_type:
+  elif event_text and event_type:
     print(f"[EVENT] 🔍 Checking database for event choices...")
-    db_choices = state.get_event_choices_from_database(event_text, event_type)
+    db_choices = event["choices"] if event else state.get_event_choices_from_database(event_text, event_type)
     if db_choices and len(db_choices) > 1:
       num_choices = len(db_choices)
       print(f"[EVENT] ✅ DATABASE SUCCESS: Found {num_choices} choices - using database count")
       
       # Check if this is a learned event with a previous choice
-      learned_choice = state.get_learned_choice_for_event(event_text)
+      learned_choice = event["learned_choice"] if event else state.get_learned_choice_for_event(event_text)
       if learned_choice:
         print(f"[EVENT] 🎓 LEARNED EVENT: Using previous choice {learned_choice} directly")
         choice_index = learned_choice  # Override with learned choice
         # Skip learning mode and go directly to clicking
         num_choices = len(db_choices)  # We have the choice count
-        position_mapping = None  # Will be set later
+        # Icons found on the event screen, if they agree with the database count
+        position_mapping = event["positions"] if event and event["num_choices"] == num_choices else None
       else:
         print(f"[EVENT] 📊 Database event without learned choice - need user decision")
     else:
@@ -1269,8 +1327,10 @@ def select_event_choice(choice_index, event_text=None, event_type=None):
   # STEP 3: Template detection fallback (if database failed and user didn't intervene)
   if not num_choices:
     print(f"[EVENT] 🔍 Attempting template matching as fallback...")
-    from core.execute import detect_number_of_choices
-    num_choices, position_mapping = detect_number_of_choices()
+    if event and event["num_choices"]:
+      num_choices, position_mapping = event["num_choices"], event["positions"]
+    else:
+      num_choices, position_mapping = detect_number_of_choices()
     
     if num_choices and num_choices > 1:
       print(f"[EVENT] ✅ TEMPLATE SUCCESS: Detected {num_choices} choices")
@@ -1287,9 +1347,10 @@ def select_event_choice(choice_index, event_text=None, event_type=None):
   if choice_location and is_valid_mouse_position(choice_location):
     print(f"[EVENT] 🎯 Clicking choice {choice_index} at {choice_location} (based on {num_choices} total choices)")
     pyautogui.moveTo(choice_location, duration=0.2)
+    before = grab_frame()
     pyautogui.click()
     print(f"[EVENT] ✅ Successfully selected choice {choice_index}")
-    time.sleep(0.5)
+    wait_for_settle(timeout=0.5, since=before)
     return True
   else:
     print(f"[EVENT] ❌ Failed to get valid position for choice {choice_index}")
@@ -1311,26 +1372,24 @@ def select_event_choice(choice_index, event_text=None, event_type=None):
 
   icon_path = icon_map[choice_index]
 
-  # Try template matching with validation
-  for attempt in range(2):
-    try:
-      location = pyautogui.locateCenterOnScreen(icon_path, confidence=0.8, minSearchTime=1)
-      if location and is_valid_mouse_position(location):
-        # Validate position makes sense
-        x, y = location
-        if 200 <= x <= 1000 and 300 <= y <= 900:  # Reasonable choice area
-          print(f"[EVENT] ✅ Template fallback: found choice {choice_index} at {location}")
-          pyautogui.moveTo(location, duration=0.2)
-          pyautogui.click()
-          print(f"[EVENT] ✅ Successfully selected choice {choice_index} using template fallback")
-          time.sleep(0.5)
-          return True
-        else:
-          print(f"[WARNING] Template match at {location} is outside expected choice area")
-    except:
-      pass
-
-    time.sleep(0.2)
+  # Try template matching with validation (polls for up to 2 seconds)
+  try:
+    location = locate(icon_path, timeout=2)
+    if location:
+      x, y = location
+      # Validate position makes sense
+      if is_valid_mouse_position(location) and 200 <= x <= 1000 and 300 <= y <= 900:  # Reasonable choice area
+        print(f"[EVENT] ✅ Template fallback: found choice {choice_index} at {location}")
+        pyautogui.moveTo(location, duration=0.2)
+        before = grab_frame()
+        pyautogui.click()
+        print(f"[EVENT] ✅ Successfully selected choice {choice_index} using template fallback")
+        wait_for_settle(timeout=0.5, since=before)
+        return True
+      else:
+        print(f"[WARNING] Template match at {location} is outside expected choice area")
+  except:
+    pass
 
 
   """
@@ -1464,9 +1523,10 @@ def predict_choice_effect_from_pattern(learned_data, choice_num):
   except:
     return {}
 
-def display_event_choice_details(event_text, event_type):
+def display_event_choice_details(event_text, event_type, event=None):
   """
   Display detailed information about event choices including stat effects
+  `event` is a resolve_event() result; its choices and match are reused
   """
   try:
     print(f"\n{'='*70}")
@@ -1495,7 +1555,7 @@ def display_event_choice_details(event_text, event_type):
         print(f"   📊 No stat data recorded for previous choice")
     
     # Try to get choices from database 
-    choices = state.get_event_choices_from_database(event_text, event_type)
+    choices = event["choices"] if event else state.get_event_choices_from_database(event_text, event_type)
     
     if choices and len(choices) > 0:
       if not learned_data:  # Only show this header if we didn't show learned data
@@ -1504,7 +1564,7 @@ def display_event_choice_details(event_text, event_type):
         print(f"\n📚 Available choices ({len(choices)} total):")
       
       # Get the full event data to extract effects
-      event_data = get_full_event_data(event_text, event_type)
+      event_data = get_full_event_data(event_text, event_type, event["match"] if event else None)
       
       # If we have learned data, predict stats for all choices based on the pattern
       if learned_data and event_data:
@@ -1547,14 +1607,14 @@ def display_event_choice_details(event_text, event_type):
   except Exception as e:
     print(f"[ERROR] Failed to display choice details: {e}")
 
-def get_full_event_data(event_text, event_type):
+def get_full_event_data(event_text, event_type, match=None):
   """Get full event data from database files"""
   try:
     # Import here to access database functions
     import core.state as state
     
     # Use the database lookup to get full event data
-    db_data = state.get_event_choices_from_database(event_text, event_type, return_full_data=True)
+    db_data = state.get_event_choices_from_database(event_text, event_type, return_full_data=True, match=match)
     return db_data
   except Exception as e:
     print(f"[DEBUG] get_full_event_data error: {e}")
@@ -1787,7 +1847,7 @@ def detect_event_on_screen():
     ]
     
     for next_btn in next_buttons:
-      result = pyautogui.locateCenterOnScreen(next_btn, confidence=0.6, minSearchTime=0.5)
+      result = locate(next_btn, threshold=0.6, timeout=0.5)
       if result:
         print(f"[EVENT] Next button detected ({next_btn}) - this is NOT an event")
         last_event_detection_time = current_time  # Apply cooldown
@@ -1832,9 +1892,11 @@ def detect_event_on_screen():
 
   found_icons = []
   print(f"[DEBUG] Starting event choice detection - looking for {len(event_icons)} icon types")
+  frame = grab_frame()
   for icon in event_icons:
     try:
-      btn = pyautogui.locateCenterOnScreen(icon, confidence=0.8, minSearchTime=0.5)
+      # Whole screen, the position check below decides
+      btn = locate(icon, region=(0, 0, frame.width, frame.height), frame=frame)
       if btn:
         # Validate position - event choices should be in the right side of screen
         if btn.x > 1500:  # Event choices are typically on the right side
@@ -1908,8 +1970,13 @@ def career_lobby():
   }
 
   while state.is_bot_running:
-    screen = ImageGrab.grab()
-    matches = multi_match_templates(templates, screen=screen)
+    # Settings saved from the web UI apply from the next tick (one stat() when unchanged)
+    state.reload_config_if_changed()
+
+    # One capture per tick; every reader below crops from it and the turn snapshot is keyed to it
+    invalidate_turn_snapshot()
+    frame = grab_frame()
+    matches = multi_match_templates(templates, screen=frame)
 
     print(f"[DEBUG] Template matches: {[k for k, v in matches.items() if v]}")
 
@@ -1923,110 +1990,49 @@ def career_lobby():
 
     # Handle events first - this is the priority
     if matches.get("event"):
-      print(f"[DEBUG] Event detected - extracting event text for intelligent choice")
+      print(f"[DEBUG] Event detected - resolving event from the current frame")
 
-      # Extract event text from specified coordinates - SPLIT INTO TWO REGIONS
       try:
-        # TOP region: Event type indicator (Trainee Event, Main Scenario Event, Support Card Event)
-        event_type_region = (150, 157, 634-150, 190-157)  # (x, y, width, height)
-        event_type_screenshot = pyautogui.screenshot(region=event_type_region)
-        event_type_text = extract_text(event_type_screenshot).strip()
-        
-        # BOTTOM region: Actual event title
-        event_title_region = (150, 190, 634-150, 241-190)  # (x, y, width, height)  
-        event_title_screenshot = pyautogui.screenshot(region=event_title_region)
-        event_title_text = extract_text(event_title_screenshot).strip()
-        
-        print(f"[EVENT] Event type: '{event_type_text}'")
-        print(f"[EVENT] Event title: '{event_title_text}'")
-
-        if event_title_text.strip():
-          # Use the clean event title directly (no more messy combined text!)
-          event_text = event_title_text
-          print(f"[EVENT] Using clean event title: '{event_text}'")
-
-          # Determine event type from the top region text
-          event_type = "character"  # default
-          if event_type_text:
-            if "trainee" in event_type_text.lower():
-              event_type = "character"
-            elif "support" in event_type_text.lower():
-              event_type = "support"  
-            elif "scenario" in event_type_text.lower():
-              event_type = "scenario"
-          
-          print(f"[EVENT] Detected event type: {event_type}")
-
-          # Clean up event text for better matching (minimal cleaning needed now)
-          cleaned_event_text = event_text.strip()
-          
-          # Remove trailing dots/ellipsis and normalize basic characters
-          cleaned_event_text = cleaned_event_text.replace("'$", "'s").replace("' ", "'").strip()
-          cleaned_event_text = cleaned_event_text.rstrip('.').strip()
-
-          # Use DATABASE-FIRST approach with intelligent learning system
-          print(f"[EVENT] Using database-first intelligent choice system...")
-          
-          # Check for auto-choice events first (e.g., Victory events)
-          event_type_found, event_data, confidence = state.find_best_event_match(cleaned_event_text)
-          if event_data and isinstance(event_data, dict) and event_data.get("auto_choice"):
-            auto_choice = event_data.get("auto_choice")
-            print(f"[EVENT] 🎯 AUTO-CHOICE EVENT: '{cleaned_event_text}' -> using choice {auto_choice}")
-            success = select_event_choice(auto_choice, cleaned_event_text, event_type)
-            if success:
-              print(f"[INFO] Event handled successfully using auto-choice.")
-              time.sleep(0.5)
-              continue
-          
-          # Display choice details before making decision
-          display_event_choice_details(cleaned_event_text, event_type)
-          
-          # Let select_event_choice handle everything: database → learning → template → fallback
-          # But first determine the optimal choice if database has info
-          db_choices = state.get_event_choices_from_database(cleaned_event_text, event_type)
-          if db_choices and len(db_choices) > 1:
-            # Database has choices, get optimal choice
-            optimal_choice_tuple = state.get_optimal_event_choice_from_database(cleaned_event_text, event_type)
-            optimal_choice, from_database = optimal_choice_tuple
-            print(f"[EVENT] Database suggests choice {optimal_choice} for '{cleaned_event_text[:50]}...'")
+        event = resolve_event(frame)
+        if event:
+          print(f"[EVENT] Detected event type: {event['event_type']}")
+          if event["auto_choice"]:
+            print(f"[EVENT] 🎯 AUTO-CHOICE EVENT: '{event['text']}' -> using choice {event['choice']}")
           else:
-            # No database info, let learning system decide
-            optimal_choice = 1  # Default, but learning system will handle this
-            print(f"[EVENT] No database info for '{cleaned_event_text[:50]}...', using learning system")
-          
-          success = select_event_choice(optimal_choice, cleaned_event_text, event_type)
-          
-          if success:
-            print(f"[INFO] Event handled successfully using database-first approach.")
-            time.sleep(0.5)
+            # Display choice details before making decision
+            display_event_choice_details(event["text"], event["event_type"], event)
+            if len(event["choices"]) > 1:
+              print(f"[EVENT] Database suggests choice {event['choice']} for '{event['text'][:50]}...'")
+            else:
+              print(f"[EVENT] No database info for '{event['text'][:50]}...', using learning system")
+
+          # select_event_choice still handles learning → template → fallback
+          if select_event_choice(event["choice"], event["text"], event["event_type"], event):
+            print(f"[INFO] Event handled successfully.")
+            continue
+          print(f"[EVENT] Event resolution failed, using emergency fallback...")
+          # Emergency fallback - just click the first detected choice
+          if click(boxes=matches["event"], text="[INFO] Event found, selecting choice 1 (emergency fallback).", settle=0.5):
             continue
-          else:
-            print(f"[EVENT] Database-first approach failed, using emergency fallback...")
-            # Emergency fallback - just click the first detected choice
-            if click(boxes=matches["event"], text="[INFO] Event found, selecting choice 1 (emergency fallback)."):
-              time.sleep(0.5)
-              continue
         else:
           print("[EVENT] No text extracted from event region, using emergency fallback")
-          if click(boxes=matches["event"], text="[INFO] Event found, selecting choice 1."):
-            time.sleep(0.5)
+          if click(boxes=matches["event"], text="[INFO] Event found, selecting choice 1.", settle=0.5):
             continue
 
       except Exception as e:
         print(f"[EVENT] Error during intelligent event processing: {e}")
         # Fall back to choice 1
-        if click(boxes=matches["event"], text="[INFO] Event found, selecting choice 1 (fallback)."):
-          time.sleep(0.5)
+        if click(boxes=matches["event"], text="[INFO] Event found, selecting choice 1 (fallback).", settle=0.5):
           continue
 
     # Handle inspiration
     if click(boxes=matches["inspiration"], text="[INFO] Inspiration found."):
+      invalidate_turn_snapshot()
       continue
 
     # Handle next buttons
-    if click(boxes=matches["next"]):
+    if click(boxes=matches["next"], settle=0.3):
       print("[INFO] Next button clicked")
-      time.sleep(0.3)
       continue
 
     # Handle other buttons
@@ -2037,6 +2043,7 @@ def career_lobby():
 
     # Check if we're in career lobby
     if not matches.get("tazuna"):
+      invalidate_turn_snapshot()
       print("[DEBUG] Tazuna not found - not in career lobby")
       print(".", end="")
       continue
@@ -2046,31 +2053,35 @@ def career_lobby():
 
     # Career lobby logic starts here
     if matches.get("infirmary"):
-      if is_btn_active(matches["infirmary"][0]):
+      if is_btn_active(matches["infirmary"][0], frame=frame):
         # Energy-aware infirmary decision
         if state.ENERGY_DETECTION_ENABLED and state.SKIP_INFIRMARY_UNLESS_MISSING_ENERGY:
-          energy_level = get_current_energy_level()
+          energy_level = get_turn_snapshot(frame)["energy"]
           if energy_level > state.SKIP_TRAINING_ENERGY:
             print(f"[INFO] Character debuffed, but energy is sufficient ({energy_level}% > {state.SKIP_TRAINING_ENERGY}%). Skipping infirmary.")
           else:
             click(boxes=matches["infirmary"][0], text="[INFO] Character debuffed and energy low, going to infirmary.")
+            invalidate_turn_snapshot()
             continue
         else:
           click(boxes=matches["infirmary"][0], text="[INFO] Character debuffed, going to infirmary.")
+          invalidate_turn_snapshot()
           continue
 
-    mood = check_mood()
+    # Read once per turn; dropped again by the action taken below
+    snapshot = get_turn_snapshot(frame)
+    mood = snapshot["mood"]
     mood_index = MOOD_LIST.index(mood)
     minimum_mood = MOOD_LIST.index(state.MINIMUM_MOOD)
-    turn = check_turn()
-    year = check_current_year()
-    criteria = check_criteria()
+    turn = snapshot["turn"]
+    year = snapshot["year"]
+    criteria = snapshot["criteria"]
     year_parts = year.split(" ")
     
     # Check energy level if detection is enabled
     energy_info = ""
     if state.ENERGY_DETECTION_ENABLED:
-      energy_level, energy_numeric = check_energy()
+      energy_level, energy_numeric = snapshot["energy_level"], snapshot["energy"]
       energy_info = f"Energy: {energy_level} ({energy_numeric}%)"
 
     print("\n=======================================================================================\n")
@@ -2087,11 +2098,10 @@ def career_lobby():
         auto_buy_skill()
       ura()
       for i in range(2):
-        if click(img="assets/buttons/race_btn.png", minSearch=2):
-          time.sleep(0.5)
+        click(img="assets/buttons/race_btn.png", minSearch=2, settle=0.5)
 
       race_prep()
-      time.sleep(1)
+      wait_for_settle(timeout=2, min_wait=1)
       after_race()
       continue
 
@@ -2119,8 +2129,7 @@ def career_lobby():
         continue
       else:
         # If there is no race matching to aptitude, go back and do training instead
-        click(img="assets/buttons/back_btn.png", minSearch=1, text="[INFO] Race not found. Proceeding to training.")
-        time.sleep(0.5)
+        click(img="assets/buttons/back_btn.png", minSearch=1, text="[INFO] Race not found. Proceeding to training.", settle=0.5)
 
     # If Prioritize G1 Race is true, check G1 race every turn
     if state.PRIORITIZE_G1_RACE and year_parts[0] != "Junior" and len(year_parts) > 3 and year_parts[3] not in ["Jul", "Aug"]:
@@ -2129,23 +2138,22 @@ def career_lobby():
         continue
       else:
         # If there is no G1 race, go back and do training
-        click(img="assets/buttons/back_btn.png", minSearch=1, text="[INFO] G1 race not found. Proceeding to training.")
-        time.sleep(0.5)
+        click(img="assets/buttons/back_btn.png", minSearch=1, text="[INFO] G1 race not found. Proceeding to training.", settle=0.5)
 
     # Check training button
-    if not go_to_training():
+    if not go_to_training(settle=0.5):
       print("[INFO] Training button is not found.")
       continue
 
     # Last, do training
-    time.sleep(0.5)
     results_training = check_training()
 
-    best_training = do_something(results_training)
+    best_training = do_something(results_training, snapshot)
     if best_training:
-      go_to_training()
-      time.sleep(0.5)
+      go_to_training(settle=0.5)
+      before = grab_frame()
       do_train(best_training)
     else:
+      before = grab_frame()
       do_rest()
-    time.sleep(1)
+    wait_for_settle(timeout=1, since=before)
@@ -0,0 +1,238 @@
+import json
+import re
+import sqlite3
+import threading
+from datetime import datetime
+
+LEARNED_DB_FILE = "learned_events.db"
+
+# Words that do not help tell events apart (same list _events_are_similar drops)
+STOP_WORDS = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'event', 'trainee'}
+
+# Full-text candidates fetched per lookup, before the caller's similarity check
+CANDIDATE_LIMIT = 50
+
+# Rows from the event log take precedence over rows built from the asset database
+SOURCE_LOG = "log"
+SOURCE_ASSET = "asset"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+  id INTEGER PRIMARY KEY,
+  key TEXT NOT NULL,
+  source TEXT NOT NULL,
+  text TEXT NOT NULL,
+  choice_made INTEGER,
+  choices TEXT NOT NULL DEFAULT '[]',
+  updated TEXT,
+  UNIQUE (key, source)
+);
+CREATE TABLE IF NOT EXISTS sessions (
+  session_id TEXT PRIMARY KEY,
+  event_id INTEGER NOT NULL REFERENCES events (id) ON DELETE CASCADE,
+  choice INTEGER
+);
+CREATE TABLE IF NOT EXISTS choice_stats (
+  event_id INTEGER NOT NULL REFERENCES events (id) ON DELETE CASCADE,
+  choice INTEGER NOT NULL,
+  samples INTEGER NOT NULL,
+  total_score REAL NOT NULL,
+  PRIMARY KEY (event_id, choice)
+);
+CREATE TABLE IF NOT EXISTS meta (
+  name TEXT PRIMARY KEY,
+  value TEXT
+);
+"""
+
+def event_key(text):
+  """Normalized form events are stored under: lowercase words without punctuation or stop words"""
+  cleaned = re.sub(r'[^\w\s]', '', (text or '').lower())
+  words = [word for word in cleaned.split() if word not in STOP_WORDS and len(word) > 2]
+  return " ".join(words) if words else " ".join(cleaned.split())
+
+def _priority_weight(stat, priority_stats):
+  """Higher priority = higher weight, 1 for stats outside the priority list"""
+  if stat in priority_stats:
+    return len(priority_stats) - priority_stats.index(stat)
+  return 1
+
+def choice_scores(stat_gains, priority_stats, choice_made=None):
+  """
+  {choice number: priority-weighted stat gain} from an outcome's stat_gains.
+  Keys like "choice_2_spd" are credited to that choice; plain stat keys are credited to `choice_made`.
+  """
+  scores = {}
+  for key, gain in (stat_gains or {}).items():
+    if not isinstance(gain, (int, float)):
+      continue
+    parts = key.split("_")
+    if key.startswith("choice_") and len(parts) > 1 and parts[1].isdigit():
+      choice, stat = int(parts[1]), parts[2] if len(parts) > 2 else ""
+    elif choice_made:
+      choice, stat = int(choice_made), key
+    else:
+      continue
+    scores[choice] = scores.get(choice, 0) + gain * _priority_weight(stat, priority_stats)
+  return scores
+
+class LearnedStore:
+  """
+  SQLite store of learned event choices and per-choice outcome aggregates.
+  Events are keyed by event_key(); an FTS5 index over the event text narrows lookups to
+  events sharing a word with the query, and choice_stats keeps (samples, total score) per
+  choice, updated as outcomes arrive, so a recommendation is a lookup instead of a scan.
+  """
+  def __init__(self, path=LEARNED_DB_FILE):
+    self.path = path
+    self._lock = threading.Lock()
+    self._conn = None
+    self.fts = False
+
+  def _db(self):
+    """Open the database on first use (OCR worker processes import this module too)"""
+    if self._conn is None:
+      conn = sqlite3.connect(self.path, check_same_thread=False)
+      conn.row_factory = sqlite3.Row
+      conn.execute("PRAGMA foreign_keys = ON")
+      conn.execute("PRAGMA journal_mode = WAL")
+      conn.executescript(SCHEMA)
+      try:
+        conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS events_fts USING fts5(text)")
+        self.fts = True
+      except sqlite3.OperationalError:
+        print("[EVENT] SQLite has no FTS5, learned event lookups will scan the table")
+      conn.commit()
+      self._conn = conn
+    return self._conn
+
+  def _upsert_event(self, db, key, source, text, choice_made, choices):
+    row = db.execute("SELECT id FROM events WHERE key = ? AND source = ?", (key, source)).fetchone()
+    now = datetime.now().isoformat()
+    if row:
+      db.execute("UPDATE events SET text = ?, choice_made = COALESCE(?, choice_made), "
+                 "choices = CASE WHEN ? != '[]' THEN ? ELSE choices END, updated = ? WHERE id = ?",
+                 (text, choice_made, choices, choices, now, row["id"]))
+      return row["id"]
+    event_id = db.execute("INSERT INTO events (key, source, text, choice_made, choices, updated) VALUES (?, ?, ?, ?, ?, ?)",
+                          (key, source, text, choice_made, choices, now)).lastrowid
+    if self.fts:
+      db.execute("INSERT INTO events_fts (rowid, text) VALUES (?, ?)", (event_id, key))
+    return event_id
+
+  def _add_scores(self, db, event_id, scores):
+    db.executemany("INSERT INTO choice_stats (event_id, choice, samples, total_score) VALUES (?, ?, 1, ?) "
+                   "ON CONFLICT (event_id, choice) DO UPDATE SET "
+                   "samples = samples + 1, total_score = total_score + excluded.total_score",
+                   [(event_id, choice, score) for choice, score in scores.items()])
+
+  def _delete_source(self, db, source):
+    if self.fts:
+      db.execute("DELETE FROM events_fts WHERE rowid IN (SELECT id FROM events WHERE source = ?)", (source,))
+    db.execute("DELETE FROM events WHERE source = ?", (source,))
+
+  def sync_assets(self, events, priority_stats):
+    """Replace the asset rows with `events` (the _load_event_data_from_json format)"""
+    with self._lock:
+      db = self._db()
+      with db:
+        self._delete_source(db, SOURCE_ASSET)
+        for event in events:
+          text = event.get("event_text")
+          if not text:
+            continue
+          event_id = self._upsert_event(db, event_key(text), SOURCE_ASSET, text, event.get("choice_made"),
+                                        json.dumps(event.get("detected_choices", []), ensure_ascii=False))
+          stat_gains = event.get("outcome", {}).get("stat_gains", {})
+          self._add_scores(db, event_id, choice_scores(stat_gains, priority_stats))
+
+  def _record_event(self, db, event, priority_stats):
+    text = event.get("event_text")
+    if not text:
+      return False
+    choice_made = event.get("choice_made")
+    try:
+      choice_made = int(choice_made) if choice_made else None
+    except (TypeError, ValueError):
+      choice_made = None
+
+    event_id = self._upsert_event(db, event_key(text), SOURCE_LOG, text, choice_made,
+                                  json.dumps(event.get("detected_choices", []), ensure_ascii=False))
+    if event.get("session_id"):
+      db.execute("INSERT OR REPLACE INTO sessions (session_id, event_id, choice) VALUES (?, ?, ?)",
+                 (event["session_id"], event_id, choice_made))
+    stat_gains = (event.get("outcome") or {}).get("stat_gains", {})
+    self._add_scores(db, event_id, choice_scores(stat_gains, priority_stats, choice_made))
+    return True
+
+  def record_event(self, event, priority_stats=()):
+    """Learn from one logged event (the event log format). Its outcome, if any, is counted too"""
+    with self._lock:
+      db = self._db()
+      with db:
+        self._record_event(db, event, priority_stats)
+
+  def record_outcome(self, session_id, outcome, priority_stats=()):
+    """Add an outcome to the choice aggregates of the event logged under `session_id`"""
+    with self._lock:
+      db = self._db()
+      row = db.execute("SELECT event_id, choice FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+      if row is None:
+        return False
+      with db:
+        self._add_scores(db, row["event_id"], choice_scores((outcome or {}).get("stat_gains", {}), priority_stats, row["choice"]))
+      return True
+
+  def import_log(self, load_events, priority_stats):
+    """
+    One-time import of events logged before the store existed. `load_events` is called for the
+    events only if they were never imported; check, import and marker are one transaction
+    """
+    with self._lock:
+      db = self._db()
+      with db:
+        if db.execute("SELECT 1 FROM meta WHERE name = 'log_imported'").fetchone():
+          return 0
+        count = sum(self._record_event(db, event, priority_stats) for event in load_events())
+        db.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('log_imported', ?)", (datetime.now().isoformat(),))
+    if count:
+      print(f"[EVENT] Imported {count} logged events into {self.path}")
+    return count
+
+  def candidates(self, text, limit=CANDIDATE_LIMIT):
+    """
+    Events that may match `text`, as dicts, event log rows first: same key first,
+    then events sharing a word with it, best full-text rank first.
+    """
+    key = event_key(text)
+    if not key:
+      return []
+    with self._lock:
+      db = self._db()
+      if self.fts:
+        query = " OR ".join('"' + word.replace('"', '""') + '"*' for word in key.split())
+        rows = db.execute(
+          "SELECT e.*, (e.key = ?) AS exact FROM events_fts JOIN events e ON e.id = events_fts.rowid "
+          "WHERE events_fts MATCH ? ORDER BY exact DESC, e.source = ? DESC, bm25(events_fts) LIMIT ?",
+          (key, query, SOURCE_LOG, limit)).fetchall()
+      else:
+        rows = db.execute("SELECT e.*, (e.key = ?) AS exact FROM events e ORDER BY exact DESC, e.source = ? DESC, e.id",
+                          (key, SOURCE_LOG)).fetchall()
+
+    results = [dict(row, choices=json.loads(row["choices"] or "[]")) for row in rows]
+    # Event log rows win over asset rows, keeping the rank order within each
+    results.sort(key=lambda row: row["source"] != SOURCE_LOG)
+    return results
+
+  def choice_stats(self, event_ids):
+    """{choice: {"samples", "avg_score"}} summed over the given events"""
+    if not event_ids:
+      return {}
+    placeholders = ",".join("?" * len(event_ids))
+    with self._lock:
+      rows = self._db().execute(
+        f"SELECT choice, SUM(samples) AS samples, SUM(total_score) AS total FROM choice_stats "
+        f"WHERE event_id IN ({placeholders}) GROUP BY choice", list(event_ids)).fetchall()
+    return {row["choice"]: {"samples": row["samples"], "avg_score": row["total"] / row["samples"]} for row in rows}
+
+learned_store = LearnedStore()
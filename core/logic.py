@@ -1,24 +1,25 @@
 import core.state as state
-from core.state import check_current_year, stat_state, get_current_energy_level
+from core.state import get_turn_snapshot
 
 # Get priority stat from config
 def get_stat_priority(stat_key: str) -> int:
   return state.PRIORITY_STAT.index(stat_key) if stat_key in state.PRIORITY_STAT else 999
 
 # Get weighted priority for training decisions
-def get_weighted_stat_priority(stat_key: str) -> float:
+def get_weighted_stat_priority(stat_key: str, current_stats: dict = None) -> float:
   """
   Get weighted priority for training decisions using priority weight system.
   Returns a multiplier based on stat priority and weight configuration.
   Higher values indicate higher priority.
   If stat is below min cap, boost weight.
+  `current_stats` defaults to the turn snapshot's stats.
   """
   # Get current stats for min cap logic
-  try:
-    from core.state import stat_state
-    current_stats = stat_state()
-  except Exception:
-    current_stats = {}
+  if current_stats is None:
+    try:
+      current_stats = get_turn_snapshot()["stats"]
+    except Exception:
+      current_stats = {}
   
   stat_caps = state.STAT_CAPS.get(stat_key, {})
   min_cap = 0
@@ -48,12 +49,12 @@ def get_weighted_stat_priority(stat_key: str) -> float:
   return base_weight * (1.0 + balance_factor)
 
 # Calculate training score with priority weights
-def calculate_training_score(stat_key: str, stat_gain: int, support_count: int = 0) -> float:
+def calculate_training_score(stat_key: str, stat_gain: int, support_count: int = 0, current_stats: dict = None) -> float:
   """
   Calculate training score using priority weights.
   Combines stat gain with priority multiplier and support card bonus.
   """
-  weight = get_weighted_stat_priority(stat_key)
+  weight = get_weighted_stat_priority(stat_key, current_stats)
   base_score = stat_gain * weight
   
   # Add bonus for support cards (each support card adds 10% bonus)
@@ -63,9 +64,9 @@ def calculate_training_score(stat_key: str, stat_gain: int, support_count: int =
 
 # Will do train with the most support card
 # Used in the first year (aim for rainbow)
-def most_support_card(results):
+def most_support_card(results, snapshot=None):
   # Get current energy level for decision making
-  energy_level = get_current_energy_level()
+  energy_level = (snapshot or get_turn_snapshot())["energy"]
   
   # Seperate wit
   wit_data = results.get("wit")
@@ -168,12 +169,13 @@ def filter_by_stat_caps(results, current_stats):
   # ...existing code...
 
 # Enhanced weighted training decision using priority weights
-def weighted_training_decision(results):
+def weighted_training_decision(results, snapshot=None):
   """
   Make training decisions using the priority weight system.
   Calculates weighted scores for each training option.
   """
-  energy_level = get_current_energy_level()
+  snapshot = snapshot or get_turn_snapshot()
+  current_stats = snapshot["stats"]
   # Filter out unsafe trainings
   safe_trainings = {
     k: v for k, v in results.items() 
@@ -189,13 +191,14 @@ def weighted_training_decision(results):
     stat_gain = training_data.get("stat_gain", 10)  # Default estimate
     support_count = training_data.get("total_support", 0)
     # Calculate weighted score
-    score = calculate_training_score(stat_key, stat_gain, support_count)
+    score = calculate_training_score(stat_key, stat_gain, support_count, current_stats)
+    weight = get_weighted_stat_priority(stat_key, current_stats)
     training_scores[stat_key] = {
       "score": score,
       "data": training_data,
-      "priority_weight": get_weighted_stat_priority(stat_key)
+      "priority_weight": weight
     }
-    print(f"[WEIGHT] {stat_key.upper()}: Score={score:.2f} (Weight={get_weighted_stat_priority(stat_key):.2f}, Supports={support_count}, Failure={training_data['failure']}%)")
+    print(f"[WEIGHT] {stat_key.upper()}: Score={score:.2f} (Weight={weight:.2f}, Supports={support_count}, Failure={training_data['failure']}%)")
   # Special handling for WIT training (needs at least 2 supports)
   if "wit" in training_scores:
     wit_data = training_scores["wit"]["data"]
@@ -250,10 +253,12 @@ def weighted_training_decision(results):
   return best_key
   
 # Decide training
-def do_something(results):
-  year = check_current_year()
-  current_stats = stat_state()
-  energy_level = get_current_energy_level()
+def do_something(results, snapshot=None):
+  # Readings taken once per turn, shared with the decision helpers below
+  snapshot = snapshot or get_turn_snapshot()
+  year = snapshot["year"]
+  current_stats = snapshot["stats"]
+  energy_level = snapshot["energy"]
   
   print(f"Current stats: {current_stats}")
   if state.ENERGY_DETECTION_ENABLED:
@@ -279,14 +284,14 @@ def do_something(results):
   # Use priority weight system if enabled (regardless of year)
   if state.PRIORITY_WEIGHT != "DISABLED":
     print(f"\n[INFO] Using priority weight system (Level: {state.PRIORITY_WEIGHT})")
-    return weighted_training_decision(filtered)
+    return weighted_training_decision(filtered, snapshot)
 
   # Original logic for when priority weights are disabled  
   if "Junior Year" in year:
-    return most_support_card(filtered)
+    return most_support_card(filtered, snapshot)
   else:
     result = rainbow_training(filtered)
     if result is None:
       print("[INFO] Falling back to most_support_card because rainbow not available.")
-      return most_support_card(filtered)
+      return most_support_card(filtered, snapshot)
   return result
@@ -1,25 +1,288 @@
-import easyocr
 from PIL import Image
 import numpy as np
+import hashlib
 import re
+import threading
+import time
+from collections import OrderedDict
 
-reader = easyocr.Reader(["en"], gpu=False)
+from core.digits import get_classifier
+
+# EasyOCR (and torch) are imported and the model loaded on first use, not at import time
+_reader = None
+_reader_lock = threading.Lock()
+reader_ready = threading.Event()
+# Exception from the last failed load (e.g. the model download failing offline), None otherwise
+reader_error = None
+
+def get_reader():
+  """The shared EasyOCR reader, created on first call (every caller gets the same one)"""
+  global _reader, reader_error
+  if _reader is None:
+    with _reader_lock:
+      if _reader is None:
+        start = time.perf_counter()
+        try:
+          import easyocr
+          _reader = easyocr.Reader(["en"], gpu=False)
+        except Exception as e:
+          reader_error = e
+          print(f"[OCR] Could not load the OCR reader: {e}")
+          raise
+        reader_error = None
+        reader_ready.set()
+        print(f"[OCR] Reader ready in {time.perf_counter() - start:.1f} s")
+  return _reader
+
+def _warm_up():
+  try:
+    get_reader()
+  except Exception:
+    pass  # Recorded in reader_error; wait_until_ready retries and raises it
+
+def warm_up_reader():
+  """Create the reader on a background thread. Returns immediately"""
+  if reader_ready.is_set():
+    return
+  threading.Thread(target=_warm_up, name="ocr-warmup", daemon=True).start()
+
+def wait_until_ready(timeout=None) -> bool:
+  """
+  Block until the reader is loaded. A load in progress (the warm-up) is waited for; otherwise,
+  or if it failed, the reader is loaded here and a loading error is raised. False on timeout
+  """
+  if reader_ready.is_set():
+    return True
+  print("[OCR] Waiting for the OCR reader to finish loading...")
+  if not _reader_lock.acquire(timeout=-1 if timeout is None else timeout):
+    return False
+  _reader_lock.release()
+  get_reader()
+  return True
+
+# Blank rows/columns put around each crop when several crops are packed into one image
+PACK_MARGIN = 16
+
+# EasyOCR confidence needed before a numeric read is used to teach the digit classifier
+DIGIT_LEARN_CONFIDENCE = 0.9
+
+# Number of OCR results kept by the crop cache
+OCR_CACHE_SIZE = 256
+
+class OCRCache:
+  """
+  LRU cache of OCR results keyed by an exact hash of the crop pixels.
+  Regions that did not change since the last read skip EasyOCR entirely.
+  """
+  def __init__(self, max_entries=OCR_CACHE_SIZE):
+    self.max_entries = max_entries
+    self._entries = OrderedDict()
+    self._lock = threading.Lock()
+    self.hits = 0
+    self.misses = 0
+    self.evictions = 0
+
+  @staticmethod
+  def key(img_np: np.ndarray, *params):
+    """`params` (reader kind, allowlist...) are part of the key, so each reader has its own entries"""
+    img_np = np.ascontiguousarray(img_np)
+    digest = hashlib.blake2b(img_np.data, digest_size=16)
+    digest.update(str((img_np.shape, img_np.dtype.str)).encode())
+    return params + (digest.digest(),)
+
+  def get(self, key):
+    with self._lock:
+      if key in self._entries:
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return self._entries[key]
+      self.misses += 1
+      return None
+
+  def put(self, key, value):
+    with self._lock:
+      self._entries[key] = value
+      self._entries.move_to_end(key)
+      while len(self._entries) > self.max_entries:
+        self._entries.popitem(last=False)
+        self.evictions += 1
+
+  def clear(self):
+    with self._lock:
+      self._entries.clear()
+
+  def stats(self):
+    with self._lock:
+      lookups = self.hits + self.misses
+      return {
+        "entries": len(self._entries),
+        "hits": self.hits,
+        "misses": self.misses,
+        "hit_rate": self.hits / lookups if lookups else 0.0,
+        "evictions": self.evictions
+      }
+
+cache = OCRCache()
+
+def ocr_cache_stats():
+  return cache.stats()
 
 def extract_text(pil_img: Image.Image) -> str:
   img_np = np.array(pil_img)
-  result = reader.readtext(img_np)
-  texts = [text[1] for text in result]
-  return " ".join(texts)
+  key = cache.key(img_np, "text")
+  cached = cache.get(key)
+  if cached is not None:
+    return cached
 
-def extract_number(pil_img: Image.Image) -> int:
-  img_np = np.array(pil_img)
-  result = reader.readtext(img_np, allowlist="0123456789")
+  result = get_reader().readtext(img_np)
   texts = [text[1] for text in result]
-  joined_text = "".join(texts)
+  text = " ".join(texts)
+  cache.put(key, text)
+  return text
 
-  digits = re.sub(r"[^\d]", "", joined_text)
+def _parse_number(text: str) -> int:
+  digits = re.sub(r"[^\d]", "", text)
 
   if digits:
     return int(digits)
   
   return -1
+
+def extract_number(pil_img: Image.Image) -> int:
+  img_np = np.array(pil_img)
+  key = cache.key(img_np, "number")
+  cached = cache.get(key)
+  if cached is not None:
+    return cached
+
+  result = get_reader().readtext(img_np, allowlist="0123456789")
+  texts = [text[1] for text in result]
+  joined_text = "".join(texts)
+
+  number = _parse_number(joined_text)
+  cache.put(key, number)
+  return number
+
+def _pack(images):
+  """
+  Stack grayscale crops vertically on one canvas. Each crop sits in its own band,
+  padded with its border color so the padding adds no edges for the detector.
+  Returns (canvas, band bottoms).
+  """
+  crops = [np.asarray(img.convert("L")) for img in images]
+  width = max(crop.shape[1] for crop in crops) + 2 * PACK_MARGIN
+
+  bands = []
+  bottoms = []
+  height = 0
+  for crop in crops:
+    ring = np.concatenate([crop[0], crop[-1], crop[:, 0], crop[:, -1]])
+    band = np.full((crop.shape[0] + 2 * PACK_MARGIN, width), np.median(ring), dtype=np.uint8)
+    band[PACK_MARGIN:PACK_MARGIN + crop.shape[0], PACK_MARGIN:PACK_MARGIN + crop.shape[1]] = crop
+    bands.append(band)
+    height += band.shape[0]
+    bottoms.append(height)
+  return np.vstack(bands), np.array(bottoms)
+
+def extract_many(images, allowlist: str = None, separator: str = " ") -> list:
+  """
+  OCR several crops with a single readtext call (one detector pass instead of one per crop).
+  Returns one string per image, in order. Text found in a crop is joined with `separator`.
+  """
+  if not images:
+    return []
+
+  # Only crops that changed since they were last read go into the packed image
+  keys = [cache.key(np.asarray(img), "many", allowlist, separator) for img in images]
+  results = [cache.get(key) for key in keys]
+  pending = [i for i, text in enumerate(results) if text is None]
+  if not pending:
+    return results
+
+  canvas, bottoms = _pack([images[i] for i in pending])
+  kwargs = {"allowlist": allowlist} if allowlist else {}
+  result = get_reader().readtext(canvas, **kwargs)
+
+  texts = [[] for _ in pending]
+  for box, text, _ in result:
+    center_y = sum(point[1] for point in box) / len(box)
+    band = min(int(np.searchsorted(bottoms, center_y, side="right")), len(pending) - 1)
+    texts[band].append(text)
+
+  for band, i in enumerate(pending):
+    results[i] = separator.join(texts[band])
+    cache.put(keys[i], results[i])
+  return results
+
+def extract_numbers(images) -> list:
+  """Batched extract_number: one int per image, -1 when no digits were read"""
+  return [_parse_number(text) for text in extract_many(images, allowlist="0123456789", separator="")]
+
+def recognize_text(pil_img: Image.Image, allowlist: str = None) -> str:
+  """
+  extract_text for a crop that holds one line of text at a fixed position.
+  Skips EasyOCR's text detector and runs the recognizer on the whole crop.
+  """
+  gray = np.asarray(pil_img.convert("L"))
+  key = cache.key(gray, "recognize", allowlist)
+  cached = cache.get(key)
+  if cached is not None:
+    return cached
+
+  h, w = gray.shape
+  kwargs = {"allowlist": allowlist} if allowlist else {}
+  result = get_reader().recognize(gray, horizontal_list=[[0, w, 0, h]], free_list=[], **kwargs)
+  text = " ".join(text for _, text, _ in result)
+  cache.put(key, text)
+  return text
+
+def recognize_numbers(images, field="stats") -> list:
+  """
+  Batched number reader for fixed-layout numeric fields (stats, skill points).
+  `field`'s digit classifier answers when it is confident; the rest go through EasyOCR's
+  recognizer in one batch, without text detection. -1 when no digits were read.
+  """
+  if not images:
+    return []
+  digit_classifier = get_classifier(field)
+
+  grays = [np.asarray(img.convert("L")) for img in images]
+  keys = [cache.key(gray, "recognize_number") for gray in grays]
+  values = [cache.get(key) for key in keys]
+  pending = []
+  for i, gray in enumerate(grays):
+    if values[i] is not None:
+      continue
+    read = digit_classifier.classify(gray)
+    if read is None:
+      pending.append(i)
+    else:
+      values[i] = read[0]
+      cache.put(keys[i], values[i])
+
+  if pending:
+    canvas, bottoms = _pack([images[i] for i in pending])
+    width = canvas.shape[1]
+    tops = np.concatenate([[0], bottoms[:-1]])
+    boxes = [[0, width, int(top), int(bottom)] for top, bottom in zip(tops, bottoms)]
+    result = get_reader().recognize(canvas, horizontal_list=boxes, free_list=[], allowlist="0123456789",
+                              batch_size=len(boxes))
+
+    texts = [[] for _ in pending]
+    confidences = [[] for _ in pending]
+    for box, text, confidence in result:
+      center_y = sum(point[1] for point in box) / len(box)
+      band = min(int(np.searchsorted(bottoms, center_y, side="right")), len(pending) - 1)
+      texts[band].append(text)
+      confidences[band].append(confidence)
+
+    for band, i in enumerate(pending):
+      digits = re.sub(r"[^\d]", "", "".join(texts[band]))
+      values[i] = int(digits) if digits else -1
+      cache.put(keys[i], values[i])
+      if digits and min(confidences[band]) >= DIGIT_LEARN_CONFIDENCE and not digit_classifier.ready:
+        digit_classifier.learn(grays[i], digits)
+  return values
+
+def recognize_number(pil_img: Image.Image, field="stats") -> int:
+  return recognize_numbers([pil_img], field)[0]
@@ -0,0 +1,143 @@
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+from PIL import Image
+
+import core.ocr as ocr
+
+# What a job can ask a worker to do, by name (all take PIL images)
+_READERS = {
+  "text": ocr.extract_text,
+  "number": ocr.extract_number,
+  "recognize_text": ocr.recognize_text,
+  "recognize_number": ocr.recognize_number,
+  "recognize_numbers": ocr.recognize_numbers,
+  "many": ocr.extract_many
+}
+
+def _init_worker():
+  # Load the model once per worker, before the first job arrives
+  ocr.get_reader()
+
+# Readers that take a list of images; the others take a single image
+_BATCH_READERS = ("recognize_numbers", "many")
+
+def _read(kind, images, kwargs):
+  reader = _READERS[kind]
+  return reader(images, **kwargs) if kind in _BATCH_READERS else reader(images[0], **kwargs)
+
+def _run(kind, crops, kwargs):
+  """Worker side: rebuild the crops from shared memory and run the reader"""
+  images = []
+  for name, shape in crops:
+    block = shared_memory.SharedMemory(name=name)
+    try:
+      pixels = np.ndarray(shape, dtype=np.uint8, buffer=block.buf)
+      images.append(Image.fromarray(pixels.copy()))
+    finally:
+      block.close()
+  return _read(kind, images, kwargs)
+
+def _share(pil_img):
+  """Copy one crop into a new shared memory block. Returns (block, descriptor for _run)"""
+  pixels = np.asarray(pil_img)
+  block = shared_memory.SharedMemory(create=True, size=max(1, pixels.nbytes))
+  np.ndarray(pixels.shape, dtype=np.uint8, buffer=block.buf)[...] = pixels
+  return block, (block.name, pixels.shape)
+
+def _then(future, parse):
+  """Future for parse(result of `future`). Cancelling either one cancels the other"""
+  parsed = Future()
+
+  def done(source):
+    if source.cancelled():
+      parsed.cancel()
+      return
+    # False if the caller already cancelled `parsed`
+    if not parsed.set_running_or_notify_cancel():
+      return
+    try:
+      parsed.set_result(parse(source.result()))
+    except Exception as e:
+      parsed.set_exception(e)
+
+  def forward_cancel(result):
+    if result.cancelled():
+      future.cancel()
+
+  parsed.add_done_callback(forward_cancel)
+  future.add_done_callback(done)
+  return parsed
+
+class OCRService:
+  """
+  Pool of worker processes with preloaded EasyOCR models.
+  Crops are passed over shared memory; submit() returns a concurrent.futures.Future,
+  so callers can keep working (moving the mouse, matching templates) while OCR runs.
+  """
+  def __init__(self, workers):
+    self.workers = workers
+    self._pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+    print(f"[OCR] Started OCR service with {workers} worker process(es)")
+
+  def submit(self, kind, batch, **kwargs) -> Future:
+    shared = [_share(img) for img in batch]
+    blocks = [block for block, _ in shared]
+
+    def release(_):
+      for block in blocks:
+        block.close()
+        block.unlink()
+
+    try:
+      future = self._pool.submit(_run, kind, [crop for _, crop in shared], kwargs)
+    except Exception:
+      release(None)
+      raise
+    future.add_done_callback(release)
+    return future
+
+  def shutdown(self):
+    self._pool.shutdown(wait=False, cancel_futures=True)
+
+_service = None
+_service_lock = threading.Lock()
+# Inline jobs share the one EasyOCR reader of this process, which is not safe to call concurrently
+_inline_lock = threading.Lock()
+
+def configure(workers):
+  """Start, resize or stop the pool to match the `ocr.workers` config value (0 = OCR inline)"""
+  global _service
+  with _service_lock:
+    if _service is not None and _service.workers == workers:
+      return
+    if _service is not None:
+      _service.shutdown()
+      _service = None
+    if workers and workers > 0:
+      try:
+        _service = OCRService(workers)
+      except Exception as e:
+        print(f"[OCR] Could not start OCR service, running OCR inline: {e}")
+
+def submit(kind, images, parse=None, **kwargs) -> Future:
+  """
+  Queue an OCR job: reader `kind` on one image, or on a list for "recognize_numbers" / "many".
+  `parse`, if given, is applied to the reader's result. Without a service the job runs
+  right here and an already completed future is returned, so callers are written the
+  same way either way.
+  """
+  batch = list(images) if isinstance(images, (list, tuple)) else [images]
+  service = _service
+  if service is not None:
+    future = service.submit(kind, batch, **kwargs)
+  else:
+    future = Future()
+    try:
+      with _inline_lock:
+        future.set_result(_read(kind, batch, kwargs))
+    except Exception as e:
+      future.set_exception(e)
+  return _then(future, parse) if parse else future
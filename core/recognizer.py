@@ -1,51 +1,323 @@
+import os
+import time
+from collections import namedtuple
 import cv2
 import numpy as np
 from PIL import ImageGrab, ImageStat
 
-from utils.screenshot import capture_region
+from utils.screenshot import Frame, capture_region, grab_frame, sample_frames, thumbnail, POLL_INTERVAL
+from utils.constants import TEMPLATE_REGIONS
+from core.templates import get_template
 
-def match_template(template_path, region=None, threshold=0.85):
+def _screen_bgr(screen=None, region=None):
+  """
+  BGR pixels to match against. `screen` may be a Frame (cropped without copying),
+  a PIL image, or None for a fresh grab. `region` is (left, top, right, bottom).
+  """
+  if isinstance(screen, Frame):
+    if region:
+      left, top, right, bottom = region
+      return screen.crop((left, top, right - left, bottom - top), channels="bgr")
+    return screen.bgr
+
+  if screen is None:
+    if region:
+      screen = ImageGrab.grab(bbox=region)  # (left, top, right, bottom)
+    else:
+      screen = ImageGrab.grab()
+  return cv2.cvtColor(np.array(screen), cv2.COLOR_RGB2BGR)
+
+def _screen_gray(screen=None, region=None):
+  """Grayscale version of _screen_bgr. A Frame converts once and caches the result"""
+  if isinstance(screen, Frame):
+    if region:
+      left, top, right, bottom = region
+      return screen.crop((left, top, right - left, bottom - top), channels="gray")
+    return screen.gray
+  return cv2.cvtColor(_screen_bgr(screen, region), cv2.COLOR_BGR2GRAY)
+
+def _downscaled(image, scale):
+  return cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+def match_template(template_path, region=None, threshold=0.85, frame=None):
   # Get screenshot
-  if region:
-    screen = np.array(ImageGrab.grab(bbox=region))  # (left, top, right, bottom)
+  screen = _screen_bgr(frame, region)
+
+  # Shared decoded template
+  template = get_template(template_path)
+  if template is None:
+    return []
+  result = cv2.matchTemplate(screen, template.bgr, cv2.TM_CCOEFF_NORMED)
+
+  # Best-scoring box first
+  boxes, _ = correlation_peaks(result, threshold, template.width, template.height)
+  return boxes
+
+def classify_templates(templates, region=None, threshold=0.85, frame=None, coarse_margin=0.15, pad=2):
+  """
+  Every spot in one region where any of `templates` ({label: path}) matches, labelled with
+  the template that matches it best. Slots are found once: the grayscale correlation maps of
+  all templates are stacked and reduced with max, so peak extraction and NMS run a single time.
+  Each slot is then scored in color against every template in a small window and keeps the
+  best label if it reaches `threshold` (the test match_template applies), so a spot counts once.
+  `region` is (left, top, right, bottom) and boxes are relative to it, as in match_template.
+  Returns [(label, (x, y, w, h), score)], best first.
+  """
+  screen_bgr = _screen_bgr(frame, region)
+  loaded = [(label, get_template(path)) for label, path in templates.items()]
+  loaded = [(label, template) for label, template in loaded
+            if template is not None and template.height <= screen_bgr.shape[0] and template.width <= screen_bgr.shape[1]]
+  if not loaded:
+    return []
+
+  # Slots: grayscale maps, cropped to the positions every map covers (sizes differ by a pixel or two)
+  screen_gray = cv2.cvtColor(screen_bgr, cv2.COLOR_BGR2GRAY)
+  maps = [cv2.matchTemplate(screen_gray, template.gray, cv2.TM_CCOEFF_NORMED) for _, template in loaded]
+  rows = min(result.shape[0] for result in maps)
+  cols = min(result.shape[1] for result in maps)
+  best = np.stack([result[:rows, :cols] for result in maps]).max(axis=0)
+  width = max(template.width for _, template in loaded)
+  height = max(template.height for _, template in loaded)
+  slots, _ = correlation_peaks(best, threshold - coarse_margin, width, height)
+
+  # Labels: every template against each slot window, in color
+  boxes, scores, labels = [], [], []
+  for x, y, _, _ in slots:
+    x0, y0 = max(0, x - pad), max(0, y - pad)
+    window = screen_bgr[y0:y + height + pad, x0:x + width + pad]
+    candidates = []
+    for label, template in loaded:
+      if window.shape[0] < template.height or window.shape[1] < template.width:
+        continue
+      _, score, _, (fx, fy) = cv2.minMaxLoc(cv2.matchTemplate(window, template.bgr, cv2.TM_CCOEFF_NORMED))
+      candidates.append((score, label, (x0 + fx, y0 + fy, template.width, template.height)))
+    if candidates:
+      score, label, box = max(candidates, key=lambda candidate: candidate[0])
+      if score >= threshold:
+        boxes.append(box)
+        scores.append(score)
+        labels.append(label)
+
+  if not boxes:
+    return []
+  keep = non_max_suppression(np.array(boxes), np.array(scores))
+  return [(labels[i], boxes[i], scores[i]) for i in keep]
+
+# Templates smaller than this (in pixels, after downscaling) are matched at full resolution only
+PYRAMID_MIN_TEMPLATE_SIZE = 8
+
+def match_template_pyramid(template_path, region=None, threshold=0.85, frame=None, scale=0.5,
+                           coarse_margin=0.15, max_candidates=10):
+  """
+  Coarse-to-fine version of match_template.
+  Correlates downscaled grayscale images first (scale 0.5 or 0.25), then re-checks only a
+  small window around each coarse peak in full-resolution color, so accepted boxes pass the
+  same test as match_template. `coarse_margin` lowers the threshold for coarse peaks.
+  """
+  template = get_template(template_path)
+  if template is None:
+    return []
+
+  screen_bgr = _screen_bgr(frame, region)
+  screen = _screen_gray(frame, region)
+  h, w = template.height, template.width
+  if screen.shape[0] < h or screen.shape[1] < w:
+    return []
+
+  small_h, small_w = int(h * scale), int(w * scale)
+  if min(small_h, small_w) < PYRAMID_MIN_TEMPLATE_SIZE:
+    result = cv2.matchTemplate(screen_bgr, template.bgr, cv2.TM_CCOEFF_NORMED)
+    boxes, _ = correlation_peaks(result, threshold, w, h)
+    return boxes
+
+  # Coarse pass (the downscaled full frame is shared by every template matched on it)
+  if isinstance(frame, Frame) and not region:
+    small_screen = frame.cache.get(("gray", scale))
+    if small_screen is None:
+      small_screen = _downscaled(screen, scale)
+      frame.cache[("gray", scale)] = small_screen
   else:
-    screen = np.array(ImageGrab.grab())
-  screen = cv2.cvtColor(screen, cv2.COLOR_RGB2BGR)
+    small_screen = _downscaled(screen, scale)
+  small_template = template.cache.get(("gray", scale))
+  if small_template is None:
+    small_template = _downscaled(template.gray, scale)
+    template.cache[("gray", scale)] = small_template
+  if small_screen.shape[0] < small_template.shape[0] or small_screen.shape[1] < small_template.shape[1]:
+    return []
 
-  # Load template
-  template = cv2.imread(template_path, cv2.IMREAD_COLOR)  # safe default
-  if template.shape[2] == 4:
-    template = cv2.cvtColor(template, cv2.COLOR_BGRA2BGR)
-  result = cv2.matchTemplate(screen, template, cv2.TM_CCOEFF_NORMED)
-  loc = np.where(result >= threshold)
+  coarse = cv2.matchTemplate(small_screen, small_template, cv2.TM_CCOEFF_NORMED)
 
-  h, w = template.shape[:2]
-  boxes = [(x, y, w, h) for (x, y) in zip(*loc[::-1])]
+  # Pick coarse peaks, blanking a template-sized area around each one
+  candidates = []
+  coarse_threshold = threshold - coarse_margin
+  for _ in range(max_candidates):
+    _, peak, _, (px, py) = cv2.minMaxLoc(coarse)
+    if peak < coarse_threshold:
+      break
+    candidates.append((px, py))
+    coarse[max(0, py - small_template.shape[0] // 2):py + small_template.shape[0] // 2 + 1,
+           max(0, px - small_template.shape[1] // 2):px + small_template.shape[1] // 2 + 1] = -1
 
-  return deduplicate_boxes(boxes)
+  # Fine pass: full resolution, only around the candidates
+  pad = int(np.ceil(1 / scale)) + 2
+  boxes = []
+  scores = []
+  for px, py in candidates:
+    x0 = max(0, int(px / scale) - pad)
+    y0 = max(0, int(py / scale) - pad)
+    x1 = min(screen.shape[1], int(px / scale) + w + pad)
+    y1 = min(screen.shape[0], int(py / scale) + h + pad)
+    window = screen_bgr[y0:y1, x0:x1]
+    if window.shape[0] < h or window.shape[1] < w:
+      continue
+    fine = cv2.matchTemplate(window, template.bgr, cv2.TM_CCOEFF_NORMED)
+    _, score, _, (fx, fy) = cv2.minMaxLoc(fine)
+    if score >= threshold:
+      boxes.append((x0 + fx, y0 + fy, w, h))
+      scores.append(score)
 
-def multi_match_templates(templates, screen=None, threshold=0.85):
-  if screen is None:
-    screen = ImageGrab.grab()
-  screen_bgr = cv2.cvtColor(np.array(screen), cv2.COLOR_RGB2BGR)
+  if not boxes:
+    return []
+  keep = non_max_suppression(np.array(boxes), np.array(scores))
+  return [boxes[i] for i in keep]
+
+_template_regions = {os.path.normpath(path): region for path, region in TEMPLATE_REGIONS.items()}
+
+def template_region(template_path):
+  """Search region (x, y, w, h) declared for a template in TEMPLATE_REGIONS, or None"""
+  return _template_regions.get(os.path.normpath(template_path))
+
+def _crop_to_region(screen_bgr, region, template):
+  """
+  Crop the screen to a search region. Returns (pixels, (offset_x, offset_y)).
+  Falls back to the full screen if the region is missing or too small for the template.
+  """
+  if region is None:
+    return screen_bgr, (0, 0)
+  x, y, w, h = region
+  screen_h, screen_w = screen_bgr.shape[:2]
+  left, top = max(0, x), max(0, y)
+  right, bottom = min(screen_w, x + w), min(screen_h, y + h)
+  if right - left < template.width or bottom - top < template.height:
+    return screen_bgr, (0, 0)
+  return screen_bgr[top:bottom, left:right], (left, top)
+
+def multi_match_templates(templates, screen=None, threshold=0.85, use_regions=True):
+  screen_bgr = _screen_bgr(screen)
 
   results = {}
   for name, path in templates.items():
-    template = cv2.imread(path, cv2.IMREAD_COLOR)
+    template = get_template(path)
     if template is None:
       results[name] = []
       continue
-    if template.shape[2] == 4:
-      template = cv2.cvtColor(template, cv2.COLOR_BGRA2BGR)
-
-    result = cv2.matchTemplate(screen_bgr, template, cv2.TM_CCOEFF_NORMED)
-    loc = np.where(result >= threshold)
-    h, w = template.shape[:2]
-    boxes = [(x, y, w, h) for (x, y) in zip(*loc[::-1])]
-    results[name] = boxes
+
+    region = template_region(path) if use_regions else None
+    search, (offset_x, offset_y) = _crop_to_region(screen_bgr, region, template)
+    result = cv2.matchTemplate(search, template.bgr, cv2.TM_CCOEFF_NORMED)
+    boxes, _ = correlation_peaks(result, threshold, template.width, template.height)
+    results[name] = [(x + offset_x, y + offset_y, w, h) for x, y, w, h in boxes]
   return results
 
+# Screen position returned by locate(), unpacks like pyautogui's Point
+Point = namedtuple("Point", "x y")
+
+def _locate_in(template, frame, region, threshold):
+  # Grayscale like pyscreeze's locateOnScreen, which the callers' thresholds were tuned against
+  origin_x, origin_y = frame.origin
+  if region is not None:
+    region = (region[0] - origin_x, region[1] - origin_y, region[2], region[3])
+  search, (offset_x, offset_y) = _crop_to_region(frame.gray, region, template)
+  result = cv2.matchTemplate(search, template.gray, cv2.TM_CCOEFF_NORMED)
+  boxes, _ = correlation_peaks(result, threshold, template.width, template.height)
+  return [(x + offset_x + origin_x, y + offset_y + origin_y, w, h) for x, y, w, h in boxes]
+
+def locate_all(template_path, threshold=0.8, region=None, frame=None, timeout=0, poll=POLL_INTERVAL):
+  """
+  Boxes (x, y, w, h) of every match of a template (in grayscale), best first, or [] if there is none.
+  `region` is (x, y, width, height) and defaults to the template's TEMPLATE_REGIONS entry
+  (the whole screen if it has none). A given `frame` is matched once. Otherwise the screen is
+  captured and, with a `timeout`, polled for up to that many seconds; a frame is only matched
+  again once the screen changed.
+  """
+  template = get_template(template_path)
+  if template is None:
+    return []
+  if region is None:
+    region = template_region(template_path)
+  if frame is not None or timeout <= 0:
+    return _locate_in(template, frame if frame is not None else grab_frame(), region, threshold)
+
+  deadline = time.monotonic() + timeout
+  last = None
+  for frame in sample_frames(poll=poll):
+    thumb = thumbnail(frame)
+    if last is None or not np.array_equal(thumb, last):
+      boxes = _locate_in(template, frame, region, threshold)
+      if boxes:
+        return boxes
+      last = thumb
+    if time.monotonic() >= deadline:
+      return []
+
+def locate(template_path, threshold=0.8, region=None, frame=None, timeout=0, poll=POLL_INTERVAL):
+  """Center of the best match as a Point, or None. Arguments as for locate_all"""
+  boxes = locate_all(template_path, threshold, region, frame, timeout, poll)
+  if not boxes:
+    return None
+  x, y, w, h = boxes[0]
+  return Point(x + w // 2, y + h // 2)
+
+# Boxes overlapping a better match by more than this IoU are suppressed
+NMS_IOU_THRESHOLD = 0.3
+
+def non_max_suppression(boxes, scores, iou_threshold=NMS_IOU_THRESHOLD):
+  """
+  Greedy NMS over (x, y, w, h) boxes. `boxes` is an (N, 4) array, `scores` an (N,) array.
+  Returns the indices of the kept boxes, best score first.
+  """
+  x1 = boxes[:, 0].astype(np.float32)
+  y1 = boxes[:, 1].astype(np.float32)
+  x2 = x1 + boxes[:, 2]
+  y2 = y1 + boxes[:, 3]
+  areas = (x2 - x1) * (y2 - y1)
+
+  order = np.argsort(-np.asarray(scores), kind="stable")
+  keep = []
+  while order.size:
+    best, rest = order[0], order[1:]
+    keep.append(int(best))
+    inter_w = np.clip(np.minimum(x2[best], x2[rest]) - np.maximum(x1[best], x1[rest]), 0, None)
+    inter_h = np.clip(np.minimum(y2[best], y2[rest]) - np.maximum(y1[best], y1[rest]), 0, None)
+    inter = inter_w * inter_h
+    iou = inter / (areas[best] + areas[rest] - inter)
+    order = rest[iou <= iou_threshold]
+  return keep
+
+def correlation_peaks(result, threshold, width, height, iou_threshold=NMS_IOU_THRESHOLD):
+  """
+  Boxes for the local maxima of a matchTemplate (TM_CCOEFF_NORMED) map that reach `threshold`.
+  Returns (boxes, scores) with the best-scoring box first.
+  """
+  ys, xs = np.nonzero(result >= threshold)
+  if xs.size == 0:
+    return [], []
+
+  # Keep only 3x3 local maxima (checked at the candidates only), so NMS sees a handful per match
+  scores = result[ys, xs]
+  rows, cols = result.shape
+  is_peak = np.ones(xs.size, dtype=bool)
+  for dy in (-1, 0, 1):
+    for dx in (-1, 0, 1):
+      if dy or dx:
+        is_peak &= scores >= result[np.clip(ys + dy, 0, rows - 1), np.clip(xs + dx, 0, cols - 1)]
+  ys, xs, scores = ys[is_peak], xs[is_peak], scores[is_peak]
+  boxes = np.column_stack([xs, ys, np.full_like(xs, width), np.full_like(xs, height)])
+  keep = non_max_suppression(boxes, scores, iou_threshold)
+  return [tuple(int(v) for v in boxes[i]) for i in keep], [float(scores[i]) for i in keep]
+
 def deduplicate_boxes(boxes, min_dist=5):
+  """Order-preserving center-distance dedupe for unscored boxes. Matchers use correlation_peaks"""
   filtered = []
   for x, y, w, h in boxes:
     cx, cy = x + w // 2, y + h // 2
@@ -54,8 +326,8 @@ def deduplicate_boxes(boxes, min_dist=5):
       filtered.append((x, y, w, h))
   return filtered
 
-def is_btn_active(region, treshold = 150):
-  screenshot = capture_region(region)
+def is_btn_active(region, treshold = 150, frame=None):
+  screenshot = capture_region(region, frame)
   grayscale = screenshot.convert("L")
   stat = ImageStat.Stat(grayscale)
   avg_brightness = stat.mean[0]
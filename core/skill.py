@@ -1,8 +1,7 @@
-import time
 import pyautogui
 import Levenshtein
 
-from utils.screenshot import enhanced_screenshot
+from utils.screenshot import enhanced_screenshot, grab_frame, wait_for_settle
 from core.ocr import extract_text
 from core.recognizer import match_template, is_btn_active
 import core.state as state
@@ -34,11 +33,12 @@ def buy_skill():
   else:
     print("[DEBUG] Safe position (560, 680) is invalid, skipping initial move")
   found = False
+  before = None
 
   for i in range(10):
     # Pause a bit at the bottom to wait until the scrolling animation ends
     if i > 8:
-      time.sleep(0.5)
+      wait_for_settle(timeout=0.5, since=before)
     buy_skill_icon = match_template("assets/icons/buy_skill.png", threshold=0.9)
 
     if buy_skill_icon:
@@ -55,6 +55,7 @@ def buy_skill():
           else:
             print(f"[INFO] {text} found but not enough skill points.")
 
+    before = grab_frame()
     for i in range(7):
       pyautogui.scroll(-300)
 
@@ -2,17 +2,24 @@ import re
 import json
 import glob
 import os
-import cv2
+import threading
 import numpy as np
 from datetime import datetime
+from types import MappingProxyType
 from typing import Dict, Any, Optional
 from PIL import Image
 
-from utils.screenshot import capture_region, enhanced_screenshot
-from core.ocr import extract_text, extract_number
-from core.recognizer import match_template
+from utils.screenshot import capture_region, enhanced_screenshot, grab_frame
+from core.ocr import extract_text, extract_many, recognize_number
+from core.recognizer import locate, classify_templates
+import core.ocr_service as ocr_service
+from core.event_index import build_event_index
+from core.event_log import event_log
+from core.learned_store import learned_store
+import core.event_bundle as event_bundle
+from core.asset_index import asset_index
 
-from utils.constants import SUPPORT_CARD_ICON_REGION, MOOD_REGION, TURN_REGION, FAILURE_REGION, YEAR_REGION, MOOD_LIST, CRITERIA_REGION, SKILL_PTS_REGION, ENERGY_REGION, ENERGY_LIST
+from utils.constants import SUPPORT_CARD_ICON_REGION, MOOD_REGION, TURN_REGION, FAILURE_REGION, YEAR_REGION, MOOD_LIST, CRITERIA_REGION, SKILL_PTS_REGION, ENERGY_REGION
 
 is_bot_running = False
 
@@ -33,6 +40,8 @@ SUPPORT_CARDS_DATA = None
 SCENARIO_DATA = None
 EVENT_DATA_COLLECTION = None
 USER_INTERVENTION_TIMEOUT = None
+OCR_WORKERS = None
+EVENT_INDEX = None
 
 # Energy Management Configuration
 NEVER_REST_ENERGY = None
@@ -40,91 +49,189 @@ SKIP_TRAINING_ENERGY = None
 SKIP_INFIRMARY_UNLESS_MISSING_ENERGY = None
 ENERGY_DETECTION_ENABLED = None
 
+# Read-only snapshot of config.json as of the last reload (nested dicts are read-only too, lists are tuples)
+CONFIG = MappingProxyType({})
+
+# (mtime, size) of config.json when CONFIG was loaded, and whether the web UI reported a change since
+_config_stamp = None
+_config_changed = False
+_config_lock = threading.Lock()
+
 def load_config():
   with open("config.json", "r", encoding="utf-8") as file:
     return json.load(file)
 
+def _config_file_stamp():
+  try:
+    stat = os.stat("config.json")
+    return stat.st_mtime_ns, stat.st_size
+  except OSError:
+    return None
+
+def _freeze(value):
+  if isinstance(value, dict):
+    return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+  if isinstance(value, list):
+    return tuple(_freeze(item) for item in value)
+  return value
+
+def notify_config_changed():
+  """Called when config.json was saved (POST /config); the next reload_config_if_changed() reloads"""
+  global _config_changed
+  _config_changed = True
+
+def reload_config_if_changed():
+  """
+  Reload only if config.json changed since the last load (or a change was notified).
+  One stat() call otherwise, so it is cheap enough for every event. Returns True if it reloaded.
+  A config that fails to load keeps the current settings and is retried on the next call.
+  """
+  if not _config_changed and _config_stamp is not None and _config_file_stamp() == _config_stamp:
+    return False
+  try:
+    reload_config()
+  except Exception as e:
+    print(f"[CONFIG] Could not reload config.json, keeping the current settings: {e}")
+    return False
+  return True
+
 def reload_config():
-  global PRIORITY_STAT, MINIMUM_MOOD, MAX_FAILURE, PRIORITIZE_G1_RACE, CANCEL_CONSECUTIVE_RACE, STAT_CAPS, IS_AUTO_BUY_SKILL, SKILL_PTS_CHECK, SKILL_LIST, CHARACTER_DATA, SUPPORT_CARDS_DATA, SCENARIO_DATA, EVENT_DATA_COLLECTION, USER_INTERVENTION_TIMEOUT, NEVER_REST_ENERGY, SKIP_TRAINING_ENERGY, SKIP_INFIRMARY_UNLESS_MISSING_ENERGY, ENERGY_DETECTION_ENABLED, PRIORITY_WEIGHT, PRIORITY_WEIGHTS, PRIORITY_EFFECTS_LIST
-  config = load_config()
-
-  PRIORITY_STAT = config["priority_stat"]
-  MINIMUM_MOOD = config["minimum_mood"]
-  MAX_FAILURE = config["maximum_failure"]
-  PRIORITIZE_G1_RACE = config["prioritize_g1_race"]
-  CANCEL_CONSECUTIVE_RACE = config["cancel_consecutive_race"]
-  STAT_CAPS = config["stat_caps"]
-  IS_AUTO_BUY_SKILL = config["skill"]["is_auto_buy_skill"]
-  SKILL_PTS_CHECK = config["skill"]["skill_pts_check"]
-  SKILL_LIST = config["skill"]["skill_list"]
-
-  # Load energy management settings
-  energy_config = config.get("energy_management", {})
-  ENERGY_DETECTION_ENABLED = energy_config.get("enabled", False)
-  NEVER_REST_ENERGY = energy_config.get("never_rest_energy", 70)
-  SKIP_TRAINING_ENERGY = energy_config.get("skip_training_energy", 30)
-  SKIP_INFIRMARY_UNLESS_MISSING_ENERGY = energy_config.get("skip_infirmary_unless_missing_energy", True)
-
-  # Load event data collection settings
-  EVENT_DATA_COLLECTION = config.get("event_data_collection", {
-    "enabled": True,
-    "event_types": {
-      "character_events": True,
-      "support_card_events": True,
-      "scenario_events": True,
-      "random_events": False,
-      "special_events": True
-    },
-    "data_to_collect": {
-      "stat_changes": True,
-      "mood_changes": True,
-      "skill_gains": True,
-      "training_efficiency": False
-    },
-    "context_tracking": {
-      "current_stats": True,
-      "support_cards": True,
-      "training_year": True
-    },
-    "learning_features": {
-      "personal_learning": True,
-      "smart_defaults": True,
-      "minimum_importance_threshold": 3
-    }
-  })
+  global _config_stamp, _config_changed
+  with _config_lock:
+    # Stamp taken before reading, so a save during the reload is picked up next time
+    stamp = _config_file_stamp()
+    _config_changed = False
+    try:
+      _reload_config()
+    except Exception:
+      _config_changed = True
+      raise
+    # Recorded only once the new settings are in place
+    _config_stamp = stamp
+
+# Used when config.json has no event_data_collection section
+DEFAULT_EVENT_DATA_COLLECTION = _freeze({
+  "enabled": True,
+  "event_types": {
+    "character_events": True,
+    "support_card_events": True,
+    "scenario_events": True,
+    "random_events": False,
+    "special_events": True
+  },
+  "data_to_collect": {
+    "stat_changes": True,
+    "mood_changes": True,
+    "skill_gains": True,
+    "training_efficiency": False
+  },
+  "context_tracking": {
+    "current_stats": True,
+    "support_cards": True,
+    "training_year": True
+  },
+  "learning_features": {
+    "personal_learning": True,
+    "smart_defaults": True,
+    "minimum_importance_threshold": 3
+  }
+})
 
-  # Load user intervention timeout (default 10 seconds)
-  event_data = config.get("event_data_collection", {})
-  USER_INTERVENTION_TIMEOUT = event_data.get("user_intervention_timeout", 10)
+def _reload_config():
+  """
+  Everything is read and derived from one frozen snapshot first and published in one step at
+  the end, so a config that fails part way (a missing key) leaves the previous settings whole
+  """
+  config = _freeze(load_config())
+  skill = config["skill"]
+  energy_config = config.get("energy_management", {})
 
-  # Load priority weight settings
-  PRIORITY_WEIGHT = config.get("priority_weight", "NONE")
-  PRIORITY_WEIGHTS = config.get("priority_weights", [1.0, 1.0, 1.0, 1.0, 1.0])
-  
   # Define priority effects list based on priority weight level
-  if PRIORITY_WEIGHT == "HEAVY":
-    PRIORITY_EFFECTS_LIST = [1.5, 1.2, 1.0, 0.7, 0.4]
-  elif PRIORITY_WEIGHT == "MEDIUM":
-    PRIORITY_EFFECTS_LIST = PRIORITY_WEIGHTS
-  elif PRIORITY_WEIGHT == "LIGHT":
-    PRIORITY_EFFECTS_LIST = [1.2, 1.1, 1.0, 0.9, 0.8]
+  priority_weight = config.get("priority_weight", "NONE")
+  priority_weights = config.get("priority_weights", (1.0, 1.0, 1.0, 1.0, 1.0))
+  if priority_weight == "HEAVY":
+    priority_effects_list = (1.5, 1.2, 1.0, 0.7, 0.4)
+  elif priority_weight == "MEDIUM":
+    priority_effects_list = priority_weights
+  elif priority_weight == "LIGHT":
+    priority_effects_list = (1.2, 1.1, 1.0, 0.9, 0.8)
   else:  # NONE
-    PRIORITY_EFFECTS_LIST = [1.0, 1.0, 1.0, 1.0, 1.0]
+    priority_effects_list = (1.0, 1.0, 1.0, 1.0, 1.0)
+
+  settings = {
+    "PRIORITY_STAT": config["priority_stat"],
+    "MINIMUM_MOOD": config["minimum_mood"],
+    "MAX_FAILURE": config["maximum_failure"],
+    "PRIORITIZE_G1_RACE": config["prioritize_g1_race"],
+    "CANCEL_CONSECUTIVE_RACE": config["cancel_consecutive_race"],
+    "STAT_CAPS": config["stat_caps"],
+    "IS_AUTO_BUY_SKILL": skill["is_auto_buy_skill"],
+    "SKILL_PTS_CHECK": skill["skill_pts_check"],
+    "SKILL_LIST": skill["skill_list"],
+
+    # Energy management settings
+    "ENERGY_DETECTION_ENABLED": energy_config.get("enabled", False),
+    "NEVER_REST_ENERGY": energy_config.get("never_rest_energy", 70),
+    "SKIP_TRAINING_ENERGY": energy_config.get("skip_training_energy", 30),
+    "SKIP_INFIRMARY_UNLESS_MISSING_ENERGY": energy_config.get("skip_infirmary_unless_missing_energy", True),
+
+    # Event data collection settings and user intervention timeout (default 10 seconds)
+    "EVENT_DATA_COLLECTION": config.get("event_data_collection", DEFAULT_EVENT_DATA_COLLECTION),
+    "USER_INTERVENTION_TIMEOUT": config.get("event_data_collection", {}).get("user_intervention_timeout", 10),
+
+    # OCR worker processes (0 = run OCR on the bot thread)
+    "OCR_WORKERS": config.get("ocr", {}).get("workers", 0),
+
+    "PRIORITY_WEIGHT": priority_weight,
+    "PRIORITY_WEIGHTS": priority_weights,
+    "PRIORITY_EFFECTS_LIST": priority_effects_list,
+    "CONFIG": config
+  }
+
+  # Deck events from the compiled bundle when it is up to date, else from the JSON sources
+  deck = event_bundle.load(config)
+  if deck is not None:
+    print(f"[CONFIG] Loaded deck events from {event_bundle.BUNDLE_PATH}")
+  else:
+    deck = _load_deck_events(config)
+    event_bundle.save(config, deck)
+  character_data, support_cards_data, scenario_data = deck
+  settings.update(CHARACTER_DATA=character_data, SUPPORT_CARDS_DATA=support_cards_data, SCENARIO_DATA=scenario_data)
+
+  # Event lookup index (token sets and token -> event postings), rebuilt with the data
+  settings["EVENT_INDEX"] = build_event_index(character_data, support_cards_data, scenario_data, calculate_translated_similarity)
+
+  # One dict update: readers on other threads never see old and new settings mixed
+  globals().update(settings)
+
+  ocr_service.configure(OCR_WORKERS)
 
+  print(f"[CONFIG] Loaded {len([c for c in SUPPORT_CARDS_DATA if c is not None])} support cards")
+  print(f"[CONFIG] Character data loaded: {CHARACTER_DATA is not None}")
+  print(f"[CONFIG] Support cards data loaded: {len([c for c in SUPPORT_CARDS_DATA if c is not None])} cards")
+  print(f"[CONFIG] Scenario data loaded: {SCENARIO_DATA is not None}")
+  print(f"[CONFIG] Total events available: {len(get_character_events()) + len(get_all_support_card_events()) + len(get_scenario_events_with_choices()) + len(get_scenario_events_without_choices())}")
+  print(f"[CONFIG] Indexed {len(EVENT_INDEX)} events ({len(EVENT_INDEX.by_token)} distinct words)")
+
+  # Learned store asset rows follow the deck; rebuilt only if config or a source file changed
+  _load_event_data_from_json()
+
+def _load_deck_events(config):
+  """English events of the configured character, support cards and scenario, from the nested JSON files (scraping what is missing)"""
   # Load character data
-  CHARACTER_DATA = None
+  character_data = None
   if config.get("character") and config["character"] is not None:
     char_id = config["character"]["id"]
     char_name = config["character"]["name"]
     # Look for both {char_id}.json and {char_id}-*.json patterns in nested directory
-    char_json_files = glob.glob(f"assets/character/nested/{char_id}.json") or glob.glob(f"assets/character/nested/{char_id}-*.json")
+    char_json_files = asset_index.find_files("character", char_id)
     if char_json_files:
       try:
         with open(char_json_files[0], 'r', encoding='utf-8') as f:
           nested_data = json.load(f)
           # Extract English events from nested structure (events with choices)
           events_data = nested_data.get("data", {}).get("english", {}).get("events", [])
-          CHARACTER_DATA = {
+          character_data = {
             "id": char_id,
             "name": char_name,
             "events": events_data
@@ -141,13 +248,13 @@ def reload_config():
         success = scrape_character_on_demand(char_id, "nested")
         if success:
           # Try to load again after scraping (check both patterns)
-          char_json_files = glob.glob(f"assets/character/nested/{char_id}.json") or glob.glob(f"assets/character/nested/{char_id}-*.json")
+          char_json_files = asset_index.find_files("character", char_id)
           if char_json_files:
             with open(char_json_files[0], 'r', encoding='utf-8') as f:
               nested_data = json.load(f)
               # Extract English events from nested structure (events with choices)
               events_data = nested_data.get("data", {}).get("english", {}).get("events", [])
-              CHARACTER_DATA = {
+              character_data = {
                 "id": char_id,
                 "name": char_name,
                 "events": events_data
@@ -161,14 +268,14 @@ def reload_config():
         print(f"[ERROR] On-demand scraping failed: {e}")
 
   # Load support cards data
-  SUPPORT_CARDS_DATA = []
+  support_cards_data = []
   if config.get("support_cards") and config["support_cards"] is not None:
     for i, card in enumerate(config["support_cards"]):
       if card is not None:
         card_id = card["id"]
         card_name = card["name"]
         # Look for both {card_id}.json and {card_id}-*.json patterns in nested directory
-        card_json_files = glob.glob(f"assets/support/nested/{card_id}.json") or glob.glob(f"assets/support/nested/{card_id}-*.json")
+        card_json_files = asset_index.find_files("support", card_id)
         if card_json_files:
           try:
             with open(card_json_files[0], 'r', encoding='utf-8') as f:
@@ -194,47 +301,46 @@ def reload_config():
                 "name": card_name,
                 "events": card_events
               }
-              SUPPORT_CARDS_DATA.append(card_data)
+              support_cards_data.append(card_data)
             print(f"[CONFIG] Loaded support card data for: {card_name} (Slot {i+1})")
           except Exception as e:
             print(f"[ERROR] Failed to load support card data for slot {i+1}: {e}")
-            SUPPORT_CARDS_DATA.append(None)
+            support_cards_data.append(None)
         else:
           # Try alternative ID formats (gametora IDs vs in-game IDs)
-          alt_card_json_files = glob.glob(f"assets/support/nested/*.json")
+          alt_card_json_files = asset_index.find_files("support", name=card_name)
           found_alt = False
           for alt_file in alt_card_json_files:
-            if card_name.lower().replace(" ", "-") in alt_file.lower():
-              try:
-                with open(alt_file, 'r', encoding='utf-8') as f:
-                  card_nested_data = json.load(f)
-                  # Extract the English events from the nested structure
-                  # Handle both old format (direct events array) and new format (categorized events)
-                  events_data = card_nested_data.get("data", {}).get("english", {}).get("events", [])
-                  
-                  card_events = []
-                  if events_data:
-                    # Check if this is the new format (categorized with events inside categories)
-                    if isinstance(events_data[0], dict) and "events" in events_data[0]:
-                      # New format: extract events from categories
-                      for category in events_data:
-                        if "events" in category:
-                          card_events.extend(category["events"])
-                    else:
-                      # Old format: events are directly in the array
-                      card_events = events_data
-                  
-                  card_data = {
-                    "id": card_id,
-                    "name": card_name,
-                    "events": card_events
-                  }
-                  SUPPORT_CARDS_DATA.append(card_data)
-                print(f"[CONFIG] Loaded support card data for: {card_name} (Slot {i+1}) via name match")
-                found_alt = True
-                break
-              except Exception as e:
-                print(f"[ERROR] Failed to load alternative support card data for slot {i+1}: {e}")
+            try:
+              with open(alt_file, 'r', encoding='utf-8') as f:
+                card_nested_data = json.load(f)
+                # Extract the English events from the nested structure
+                # Handle both old format (direct events array) and new format (categorized events)
+                events_data = card_nested_data.get("data", {}).get("english", {}).get("events", [])
+                
+                card_events = []
+                if events_data:
+                  # Check if this is the new format (categorized with events inside categories)
+                  if isinstance(events_data[0], dict) and "events" in events_data[0]:
+                    # New format: extract events from categories
+                    for category in events_data:
+                      if "events" in category:
+                        card_events.extend(category["events"])
+                  else:
+                    # Old format: events are directly in the array
+                    card_events = events_data
+                
+                card_data = {
+                  "id": card_id,
+                  "name": card_name,
+                  "events": card_events
+                }
+                support_cards_data.append(card_data)
+              print(f"[CONFIG] Loaded support card data for: {card_name} (Slot {i+1}) via name match")
+              found_alt = True
+              break
+            except Exception as e:
+              print(f"[ERROR] Failed to load alternative support card data for slot {i+1}: {e}")
           
           if not found_alt:
             # Try on-demand scraping as final fallback
@@ -245,7 +351,7 @@ def reload_config():
               success = scrape_support_card_on_demand(card_id, "nested")
               if success:
                 # Try to load again after scraping (check both patterns)
-                card_json_files = glob.glob(f"assets/support/nested/{card_id}.json") or glob.glob(f"assets/support/nested/{card_id}-*.json")
+                card_json_files = asset_index.find_files("support", card_id)
                 if card_json_files:
                   with open(card_json_files[0], 'r', encoding='utf-8') as f:
                     card_nested_data = json.load(f)
@@ -270,22 +376,22 @@ def reload_config():
                       "name": card_name,
                       "events": card_events
                     }
-                    SUPPORT_CARDS_DATA.append(card_data)
+                    support_cards_data.append(card_data)
                   print(f"[CONFIG] Successfully scraped and loaded support card data for: {card_name} (Slot {i+1})")
                 else:
                   print(f"[ERROR] Scraping completed but support card file not found for: {card_name}")
-                  SUPPORT_CARDS_DATA.append(None)
+                  support_cards_data.append(None)
               else:
                 print(f"[ERROR] Failed to scrape support card data for: {card_name}")
-                SUPPORT_CARDS_DATA.append(None)
+                support_cards_data.append(None)
             except Exception as e:
               print(f"[ERROR] On-demand scraping failed for support card: {e}")
-              SUPPORT_CARDS_DATA.append(None)
+              support_cards_data.append(None)
       else:
-        SUPPORT_CARDS_DATA.append(None)
+        support_cards_data.append(None)
 
   # Load scenario data
-  SCENARIO_DATA = None
+  scenario_data = None
   if config.get("scenario") and config["scenario"] is not None:
     scenario_id = config["scenario"]["id"]
     scenario_name = config["scenario"]["name"]
@@ -293,7 +399,7 @@ def reload_config():
     if scenario_json_files:
       try:
         with open(scenario_json_files[0], 'r', encoding='utf-8') as f:
-          SCENARIO_DATA = {
+          scenario_data = {
             "id": scenario_id,
             "name": scenario_name,
             "events": json.load(f)
@@ -302,52 +408,54 @@ def reload_config():
       except Exception as e:
         print(f"[ERROR] Failed to load scenario data: {e}")
 
-  print(f"[CONFIG] Loaded {len([c for c in SUPPORT_CARDS_DATA if c is not None])} support cards")
-  print(f"[CONFIG] Character data loaded: {CHARACTER_DATA is not None}")
-  print(f"[CONFIG] Support cards data loaded: {len([c for c in SUPPORT_CARDS_DATA if c is not None])} cards")
-  print(f"[CONFIG] Scenario data loaded: {SCENARIO_DATA is not None}")
-  print(f"[CONFIG] Total events available: {len(get_character_events()) + len(get_all_support_card_events()) + len(get_scenario_events_with_choices()) + len(get_scenario_events_without_choices())}")
+  return character_data, support_cards_data, scenario_data
 
 # Get Stat
-def stat_state():
-  stat_regions = {
-    "spd": (310, 723, 55, 20),
-    "sta": (405, 723, 55, 20),
-    "pwr": (500, 723, 55, 20),
-    "guts": (595, 723, 55, 20),
-    "wit": (690, 723, 55, 20)
-  }
-
-  result = {}
-  for stat, region in stat_regions.items():
-    img = enhanced_screenshot(region)
-    val = extract_number(img)
-    result[stat] = val
-  return result
+STAT_REGIONS = {
+  "spd": (310, 723, 55, 20),
+  "sta": (405, 723, 55, 20),
+  "pwr": (500, 723, 55, 20),
+  "guts": (595, 723, 55, 20),
+  "wit": (690, 723, 55, 20)
+}
+
+def stat_state(frame=None):
+  return submit_stat_state(frame).result()
+
+def submit_stat_state(frame=None):
+  """stat_state as a future, so the caller can do something else while OCR runs"""
+  # All five stats in one pass, no text detection (fixed layout)
+  images = [enhanced_screenshot(region, frame) for region in STAT_REGIONS.values()]
+  return ocr_service.submit("recognize_numbers", images, parse=lambda values: dict(zip(STAT_REGIONS, values)))
+
+SUPPORT_ICONS = {
+  "spd": "assets/icons/support_card_type_spd.png",
+  "sta": "assets/icons/support_card_type_sta.png",
+  "pwr": "assets/icons/support_card_type_pwr.png",
+  "guts": "assets/icons/support_card_type_guts.png",
+  "wit": "assets/icons/support_card_type_wit.png",
+  "friend": "assets/icons/support_card_type_friend.png"
+}
 
 # Check support card in each training
-def check_support_card(threshold=0.8):
-  SUPPORT_ICONS = {
-    "spd": "assets/icons/support_card_type_spd.png",
-    "sta": "assets/icons/support_card_type_sta.png",
-    "pwr": "assets/icons/support_card_type_pwr.png",
-    "guts": "assets/icons/support_card_type_guts.png",
-    "wit": "assets/icons/support_card_type_wit.png",
-    "friend": "assets/icons/support_card_type_friend.png"
-  }
-
-  count_result = {}
-
-  for key, icon_path in SUPPORT_ICONS.items():
-    matches = match_template(icon_path, SUPPORT_CARD_ICON_REGION, threshold)
-    count_result[key] = len(matches)
-
+def check_support_card(threshold=0.8, frame=None):
+  # One capture of the icon column, every card slot labelled with its best matching type
+  count_result = {key: 0 for key in SUPPORT_ICONS}
+  for key, _, _ in classify_templates(SUPPORT_ICONS, SUPPORT_CARD_ICON_REGION, threshold, frame=frame):
+    count_result[key] += 1
   return count_result
 
 # Get failure chance (idk how to get energy value)
-def check_failure():
-  failure = enhanced_screenshot(FAILURE_REGION)
-  failure_text = extract_text(failure).lower()
+def check_failure(frame=None):
+  return submit_failure_check(frame).result()
+
+def submit_failure_check(frame=None):
+  """check_failure as a future"""
+  failure = enhanced_screenshot(FAILURE_REGION, frame)
+  return ocr_service.submit("recognize_text", failure, parse=_parse_failure)
+
+def _parse_failure(text):
+  failure_text = text.lower()
 
   if not failure_text.startswith("failure"):
     return -1
@@ -372,9 +480,12 @@ def check_failure():
   return -1
 
 # Check mood
-def check_mood():
-  mood = capture_region(MOOD_REGION)
-  mood_text = extract_text(mood).upper()
+def check_mood(frame=None):
+  mood = capture_region(MOOD_REGION, frame)
+  return _parse_mood(extract_text(mood))
+
+def _parse_mood(text):
+  mood_text = text.upper()
 
   for known_mood in MOOD_LIST:
     if known_mood in mood_text:
@@ -383,218 +494,101 @@ def check_mood():
   print(f"[WARNING] Mood not recognized: {mood_text}")
   return "UNKNOWN"
 
-def detect_energy_by_color():
-  """
-  REVERSE ENERGY DETECTION: Count dark grey pixels and invert
-  When energy decreases, right side becomes dark grey
-  Energy = 100% - (grey_pixels / total_pixels)
-  This is more reliable than trying to detect varying energy colors
-  """
-  try:
-    # Capture the energy region
-    energy_img = capture_region(ENERGY_REGION)
-    
-    # Convert PIL Image to OpenCV format
-    energy_cv = cv2.cvtColor(np.array(energy_img), cv2.COLOR_RGB2BGR)
-    
-    # Convert to HSV for better color detection
-    energy_hsv = cv2.cvtColor(energy_cv, cv2.COLOR_BGR2HSV)
-    
-    total_pixels = energy_hsv.shape[0] * energy_hsv.shape[1]
-    
-    # Debug: Show average colors for troubleshooting
-    avg_color_rgb = np.mean(np.array(energy_img).reshape(-1, 3), axis=0)
-    avg_hsv = cv2.cvtColor(np.uint8([[avg_color_rgb[::-1]]]), cv2.COLOR_BGR2HSV)[0][0]
-    print(f"   Average RGB: ({avg_color_rgb[0]:.0f}, {avg_color_rgb[1]:.0f}, {avg_color_rgb[2]:.0f})")
-    print(f"   Average HSV: ({avg_hsv[0]}, {avg_hsv[1]}, {avg_hsv[2]})")
-    
-    # Define dark grey range for "empty" energy areas
-    # When energy decreases, these areas become dark grey
-    # Adjust range based on what dark grey looks like in your energy bar
-    grey_lower = np.array([0, 0, 30])      # Any hue, no saturation, dark
-    grey_upper = np.array([180, 60, 120])  # Any hue, low saturation, medium brightness
-    
-    # Count dark grey (empty) pixels
-    grey_mask = cv2.inRange(energy_hsv, grey_lower, grey_upper)
-    grey_pixels = np.sum(grey_mask > 0)
-    grey_percentage = (grey_pixels / total_pixels) * 100
-    
-    print(f"   Dark grey pixels: {grey_pixels}/{total_pixels} ({grey_percentage:.1f}%)")
-    
-    # REVERSE CALCULATION: Energy = 100% - percentage of dark grey
-    energy_percentage = max(0, min(100, 100 - grey_percentage))
-    
-    print(f"   Reverse calculated energy: {energy_percentage:.0f}%")
-    
-    # Convert percentage to energy level categories
-    if energy_percentage >= 90:
-      energy_level = "FULL"
-    elif energy_percentage >= 70:
-      energy_level = "HIGH"
-    elif energy_percentage >= 40:
-      energy_level = "NORMAL"
-    elif energy_percentage >= 20:
-      energy_level = "LOW"
-    else:
-      energy_level = "EMPTY"
-    
-    # Calculate confidence based on how well we can distinguish the pattern
-    if grey_percentage > 20:  # Significant grey = partial energy, high confidence
-      confidence = min(95, 70 + grey_percentage * 0.5)
-    elif grey_percentage < 5:  # Very little grey = likely full energy
-      confidence = 85  # Full energy, high confidence
-    else:  # Medium grey levels
-      confidence = 75  # Good confidence for edge cases
-    
-    print(f"[ENERGY] Reverse detection: {grey_percentage:.1f}% grey -> {energy_level} ({energy_percentage:.0f}%) - confidence: {confidence:.1f}%")
-    return energy_level, energy_percentage, confidence
-      
-  except Exception as e:
-    print(f"[ERROR] Color-based energy detection failed: {e}")
-    return None, None, 0
-
-def analyze_energy_bar_gradient():
-  """
-  Advanced energy detection by analyzing color gradient across the energy bar
-  This method analyzes the horizontal gradient to estimate fill level more precisely
-  """
-  try:
-    # Capture the energy region
-    energy_img = capture_region(ENERGY_REGION)
-    
-    # Convert to OpenCV format
-    energy_cv = cv2.cvtColor(np.array(energy_img), cv2.COLOR_RGB2BGR)
-    energy_hsv = cv2.cvtColor(energy_cv, cv2.COLOR_BGR2HSV)
-    
-    # Get image dimensions
-    height, width = energy_hsv.shape[:2]
-    
-    # Sample horizontal strips to analyze gradient
-    middle_strip = energy_hsv[height//3:2*height//3, :]  # Middle third of the bar
-    
-    # Analyze color progression from left to right
-    strip_width = width // 10  # Divide into 10 sections
-    energy_percentage = 0
-    
-    for i in range(10):
-      start_x = i * strip_width
-      end_x = min((i + 1) * strip_width, width)
-      section = middle_strip[:, start_x:end_x]
-      
-      # Check for "filled" vs "empty" colors in this section
-      # Filled colors: blue, aqua, green, yellow, orange
-      filled_lower = np.array([0, 50, 50])  # Broader range for any energy color
-      filled_upper = np.array([180, 255, 255])
-      
-      # Empty colors: gray, dark, very low saturation
-      empty_lower = np.array([0, 0, 0])
-      empty_upper = np.array([180, 50, 100])  # Low saturation = empty
-      
-      filled_mask = cv2.inRange(section, filled_lower, filled_upper)
-      empty_mask = cv2.inRange(section, empty_lower, empty_upper)
-      
-      filled_ratio = np.sum(filled_mask) / (255 * section.shape[0] * section.shape[1])
-      
-      # If this section is more than 30% filled, count it as active
-      if filled_ratio > 0.3:
-        energy_percentage = (i + 1) * 10  # Each section represents 10%
-    
-    # Classify energy level based on percentage
-    if energy_percentage >= 90:
-      energy_level = "FULL"
-    elif energy_percentage >= 70:
-      energy_level = "HIGH"
-    elif energy_percentage >= 50:
-      energy_level = "NORMAL"
-    elif energy_percentage >= 20:
-      energy_level = "LOW"
+# Energy bar: the filled part is saturated color, the empty part flat grey. A column of
+# ENERGY_REGION counts as filled when over ENERGY_FILL_ROWS of its pixels have HSV saturation
+# above ENERGY_FILL_SATURATION (0-255)
+ENERGY_FILL_SATURATION = 60
+ENERGY_FILL_ROWS = 0.5
+
+def read_energy(frame=None):
+  """Energy (0-100) from the filled share of the energy bar's columns, cached on the frame. None if the bar is off-frame"""
+  if frame is None:
+    frame = grab_frame(ENERGY_REGION)
+  if "energy" not in frame.cache:
+    bar = frame.crop(ENERGY_REGION, channels="bgr").astype(np.int32)
+    if bar.size == 0:
+      frame.cache["energy"] = None
     else:
-      energy_level = "EMPTY"
-    
-    print(f"[ENERGY] Gradient analysis: {energy_level} (~{energy_percentage}% filled)")
-    return energy_level, energy_percentage, 85  # High confidence for gradient method
-    
-  except Exception as e:
-    print(f"[ERROR] Gradient energy analysis failed: {e}")
-    return None, None, 0
-
-def check_energy():
+      high = bar.max(axis=2)
+      low = bar.min(axis=2)
+      # (max - min) / max > threshold / 255, without dividing
+      saturated = (high - low) * 255 > ENERGY_FILL_SATURATION * np.maximum(high, 1)
+      filled = saturated.mean(axis=0) > ENERGY_FILL_ROWS
+      frame.cache["energy"] = int(round(100 * filled.mean()))
+  return frame.cache["energy"]
+
+def _energy_level(energy):
+  if energy >= 90:
+    return "FULL"
+  if energy >= 70:
+    return "HIGH"
+  if energy >= 40:
+    return "NORMAL"
+  if energy >= 20:
+    return "LOW"
+  return "EMPTY"
+
+def check_energy(frame=None):
   """
-  Enhanced energy detection using multiple methods:
-  1. Color-based detection (primary)
-  2. Gradient analysis (secondary) 
-  3. OCR text detection (fallback)
-  4. Numeric extraction (fallback)
-  
-  Returns energy level as string and numeric value (0-100)
+  Energy level as string and numeric value (0-100), read from the fill of the energy bar
+  (no OCR, the bar has no number on it)
   """
   if not ENERGY_DETECTION_ENABLED:
     return "UNKNOWN", 50  # Default to middle value if detection disabled
-    
+
   try:
-    # Method 1: Color-based detection (most reliable for energy bars)
-    color_level, color_numeric, color_confidence = detect_energy_by_color()
-    if color_level and color_confidence > 25:  # Lowered threshold for gradient energy bars
-      return color_level, color_numeric
-    
-    # Method 2: Gradient analysis (good for partially filled bars)
-    gradient_level, gradient_numeric, gradient_confidence = analyze_energy_bar_gradient()
-    if gradient_level and gradient_confidence > 60:
-      return gradient_level, gradient_numeric
-    
-    # Method 3 & 4: Fall back to original OCR/numeric detection
-    energy_img = capture_region(ENERGY_REGION)
-    energy_text = extract_text(energy_img).upper()
-    
-    # Try to extract numeric energy value
-    energy_number = extract_number(energy_img)
-    if energy_number is not None and 0 <= energy_number <= 100:
-      # Classify energy level based on numeric value
-      if energy_number >= 80:
-        energy_level = "FULL"
-      elif energy_number >= 60:
-        energy_level = "HIGH" 
-      elif energy_number >= 40:
-        energy_level = "NORMAL"
-      elif energy_number >= 20:
-        energy_level = "LOW"
-      else:
-        energy_level = "EMPTY"
-      
-      print(f"[ENERGY] Detected energy (numeric): {energy_level} ({energy_number}%)")
-      return energy_level, energy_number
-    
-    # Fallback to text-based detection
-    for known_energy in ENERGY_LIST:
-      if known_energy in energy_text:
-        # Convert text to approximate numeric value
-        energy_numeric = {
-          "FULL": 90, "HIGH": 70, "NORMAL": 50, "LOW": 30, "EMPTY": 10, "UNKNOWN": 50
-        }.get(known_energy, 50)
-        
-        print(f"[ENERGY] Detected energy (text fallback): {known_energy} (~{energy_numeric}%)")
-        return known_energy, energy_numeric
-    
-    # If all methods failed, try to use color detection with lower confidence
-    if color_level and color_confidence > 30:  # Lower threshold as last resort
-      print(f"[ENERGY] Using color detection with low confidence: {color_level} ({color_numeric}%)")
-      return color_level, color_numeric
-    
-    print(f"[WARNING] All energy detection methods failed. Text found: '{energy_text}'")
-    return "UNKNOWN", 50
-    
+    energy = read_energy(frame)
   except Exception as e:
     print(f"[ERROR] Failed to check energy: {e}")
     return "UNKNOWN", 50
+  if energy is None:
+    print("[WARNING] Energy bar is outside the captured frame")
+    return "UNKNOWN", 50
+
+  energy_level = _energy_level(energy)
+  print(f"[ENERGY] Bar fill: {energy_level} ({energy}%)")
+  return energy_level, energy
 
-def get_current_energy_level():
+def get_current_energy_level(frame=None):
   """
   Get current energy level as numeric value (0-100)
   Convenience function for energy-based decisions
   """
-  _, energy_value = check_energy()
+  _, energy_value = check_energy(frame)
   return energy_value
 
+# Frame of the current lobby tick; its turn snapshot lives in frame.cache["turn_snapshot"]
+_turn_frame = None
+
+def get_turn_snapshot(frame=None):
+  """
+  Stats, energy, mood, turn, year and criteria for the current turn, all read from one frame.
+  Cached on that frame, so every tick's capture gets its own readings. Without a frame, reuses
+  the last tick's frame until invalidate_turn_snapshot() is called after an action.
+  """
+  global _turn_frame
+  if frame is None:
+    frame = _turn_frame or grab_frame()
+  _turn_frame = frame
+
+  snapshot = frame.cache.get("turn_snapshot")
+  if snapshot is None:
+    stats = submit_stat_state(frame)
+    status = check_lobby_status(frame)
+    energy_level, energy = check_energy(frame)
+    snapshot = frame.cache["turn_snapshot"] = {
+      "stats": stats.result(),
+      "energy": energy,
+      "energy_level": energy_level,
+      **status
+    }
+  return snapshot
+
+def invalidate_turn_snapshot():
+  """Call after anything that can change stats, energy or mood (training, rest, races, events)"""
+  global _turn_frame
+  _turn_frame = None
+
 # Character and Support Card Event Functions
 
 def get_character_events():
@@ -685,7 +679,7 @@ def find_event_choice(event_name, event_type="character"):
 
 # Event Detection and Handling Functions
 
-def detect_event_text():
+def detect_event_text(frame=None):
   """
   Use OCR to detect event text from the screen
   Returns the detected event text or None if no event detected
@@ -695,7 +689,7 @@ def detect_event_text():
 
   try:
     # Capture event text region
-    event_img = enhanced_screenshot(EVENT_TEXT_REGION)
+    event_img = enhanced_screenshot(EVENT_TEXT_REGION, frame)
     event_text = extract_text(event_img)
 
     if event_text and len(event_text.strip()) > 10:  # Minimum length to be considered valid event text
@@ -823,88 +817,14 @@ def find_best_event_match(event_text):
   if not event_text:
     return None, None, 0
 
-  best_match = None
-  best_score = 0
-  best_type = None
-
-  # Search character events
-  if CHARACTER_DATA and "events" in CHARACTER_DATA:
-    char_events_data = CHARACTER_DATA["events"]
-    # Handle both old format (with english_events) and new nested format (direct events list)
-    if isinstance(char_events_data, list):
-      # New nested format: events is directly a list
-      for event in char_events_data:
-        if isinstance(event, dict) and "name" in event:
-          score = calculate_text_similarity(event_text, event["name"])
-          if score > best_score:
-            best_score = score
-            best_match = event
-            best_type = "character"
-            print(f"[EVENT] Character event match: '{event['name']}' -> score: {score:.2f}")
-    elif isinstance(char_events_data, dict) and "english_events" in char_events_data:
-      # Old format: events contains english_events
-      for event in char_events_data["english_events"]:
-        if isinstance(event, dict) and "name" in event:
-          score = calculate_text_similarity(event_text, event["name"])
-          if score > best_score:
-            best_score = score
-            best_match = event
-            best_type = "character"
-            print(f"[EVENT] Character event match: '{event['name']}' -> score: {score:.2f}")
-
-  # Search support card events
-  if SUPPORT_CARDS_DATA:
-    for card_data in SUPPORT_CARDS_DATA:
-      if card_data and "events" in card_data:
-        # Handle nested support card structure with categories
-        if isinstance(card_data["events"], list):
-          # New nested format: events contains categories
-          for category in card_data["events"]:
-            if isinstance(category, dict) and "events" in category:
-              for event in category["events"]:
-                if isinstance(event, dict) and "name" in event:
-                  score = calculate_text_similarity(event_text, event["name"])
-                  if score > best_score:
-                    best_score = score
-                    best_match = event
-                    best_type = "support"
-                    print(f"[EVENT] Support event match: '{event['name']}' -> score: {score:.2f}")
-        else:
-          # Old format: events is directly a list or dict
-          for event in card_data["events"]:
-            if isinstance(event, dict) and "name" in event:
-              score = calculate_text_similarity(event_text, event["name"])
-              if score > best_score:
-                best_score = score
-                best_match = event
-                best_type = "support"
-                print(f"[EVENT] Support event match: '{event['name']}' -> score: {score:.2f}")
-
-  # Search scenario events
-  if SCENARIO_DATA and "events" in SCENARIO_DATA:
-    scenario_events_data = SCENARIO_DATA["events"]
-    
-    # Search events with choices
-    if "events_with_choices" in scenario_events_data:
-      for event in scenario_events_data["events_with_choices"]:
-        if isinstance(event, dict) and "name" in event:
-          score = calculate_text_similarity(event_text, event["name"])
-          if score > best_score:
-            best_score = score
-            best_match = event
-            best_type = "scenario"
-            print(f"[EVENT] Scenario event match: '{event['name']}' -> score: {score:.2f}")
-    
-    # Search events without choices
-    if "events_without_choices" in scenario_events_data:
-      for event in scenario_events_data["events_without_choices"]:
-        if isinstance(event, dict) and "name" in event:
-          score = calculate_text_similarity(event_text, event["name"])
-          if score > best_score:
-            best_score = score
-            best_match = event
-            best_type = "scenario"
-            print(f"[EVENT] Scenario event match: '{event['name']}' -> score: {score:.2f}")
+  # rapidfuzz over the indexed names, then the token/translation matcher as fallback
+  index = EVENT_INDEX if EVENT_INDEX is not None else build_event_index(
+    CHARACTER_DATA, SUPPORT_CARDS_DATA, SCENARIO_DATA, calculate_translated_similarity)
+  entry, best_score = index.lookup(event_text)
+  best_match = entry.event if entry else None
+  best_type = entry.source if entry else None
+  if entry:
+    print(f"[EVENT] {best_type.capitalize()} event match: '{entry.name}' -> score: {best_score:.2f}")
 
   print(f"[EVENT] Best match score: {best_score:.2f} for type: {best_type}")
 
@@ -1050,67 +970,67 @@ def calculate_text_similarity(text1, text2):
 
   return direct_similarity
 
+# Common Japanese to English translations for Uma Musume events (built once, used by calculate_translated_similarity)
+TRANSLATION_MAP = {
+  # Training and practice
+  'トレーニング': ['training', 'practice', 'lesson'],
+  '自主トレ': ['self training', 'personal training'],
+  '練習': ['practice', 'drill'],
+  'レッスン': ['lesson', 'class'],
+  'ダンス': ['dance', 'dancing'],
+  '料理': ['cooking', 'cook', 'meal'],
+  'ドライブ': ['drive', 'driving'],
+  'スーパーカー': ['supercar', 'sports car'],
+
+  # Social and friendship
+  '友達': ['friend', 'friends'],
+  '友情': ['friendship', 'bond'],
+  '一緒に': ['together', 'with'],
+  'お出かけ': ['outing', 'date'],
+  '遊び': ['play', 'fun', 'hang out'],
+  'カノジョ': ['girlfriend'],
+  'ヘイ': ['hey'],
+
+  # Food and meals
+  'ご飯': ['meal', 'food', 'dinner'],
+  '料理': ['cooking', 'cook'],
+  '食べ物': ['food', 'eat'],
+  'レストラン': ['restaurant'],
+  'フィーバー': ['fever', 'excited'],
+
+  # Competition and racing
+  'レース': ['race', 'racing'],
+  '競争': ['competition', 'contest'],
+  '勝つ': ['win', 'victory'],
+  '優勝': ['champion', 'first place'],
+
+  # Emotions and feelings
+  '楽しい': ['fun', 'enjoyable'],
+  '嬉しい': ['happy', 'glad'],
+  '悲しい': ['sad'],
+  '疲れた': ['tired'],
+  'ゾッコン': ['crazy about', 'obsessed'],
+
+  # Common event words
+  'イベント': ['event'],
+  'ミッション': ['mission'],
+  'クエスト': ['quest'],
+  'チャンス': ['chance'],
+  '機会': ['opportunity'],
+  '思い出': ['memories', 'memory'],
+  '味': ['taste', 'flavor']
+}
+
 def calculate_translated_similarity(text1, text2):
   """
   Calculate similarity using Japanese to English translation mappings
   Returns a similarity score between 0 and 1
   """
-  # Common Japanese to English translations for Uma Musume events
-  translation_map = {
-    # Training and practice
-    'トレーニング': ['training', 'practice', 'lesson'],
-    '自主トレ': ['self training', 'personal training'],
-    '練習': ['practice', 'drill'],
-    'レッスン': ['lesson', 'class'],
-    'ダンス': ['dance', 'dancing'],
-    '料理': ['cooking', 'cook', 'meal'],
-    'ドライブ': ['drive', 'driving'],
-    'スーパーカー': ['supercar', 'sports car'],
-
-    # Social and friendship
-    '友達': ['friend', 'friends'],
-    '友情': ['friendship', 'bond'],
-    '一緒に': ['together', 'with'],
-    'お出かけ': ['outing', 'date'],
-    '遊び': ['play', 'fun', 'hang out'],
-    'カノジョ': ['girlfriend'],
-    'ヘイ': ['hey'],
-
-    # Food and meals
-    'ご飯': ['meal', 'food', 'dinner'],
-    '料理': ['cooking', 'cook'],
-    '食べ物': ['food', 'eat'],
-    'レストラン': ['restaurant'],
-    'フィーバー': ['fever', 'excited'],
-
-    # Competition and racing
-    'レース': ['race', 'racing'],
-    '競争': ['competition', 'contest'],
-    '勝つ': ['win', 'victory'],
-    '優勝': ['champion', 'first place'],
-
-    # Emotions and feelings
-    '楽しい': ['fun', 'enjoyable'],
-    '嬉しい': ['happy', 'glad'],
-    '悲しい': ['sad'],
-    '疲れた': ['tired'],
-    'ゾッコン': ['crazy about', 'obsessed'],
-
-    # Common event words
-    'イベント': ['event'],
-    'ミッション': ['mission'],
-    'クエスト': ['quest'],
-    'チャンス': ['chance'],
-    '機会': ['opportunity'],
-    '思い出': ['memories', 'memory'],
-    '味': ['taste', 'flavor']
-  }
-
   # Check if text1 contains Japanese words that translate to text2
-  score1 = get_translation_score(text1, text2, translation_map)
+  score1 = get_translation_score(text1, text2, TRANSLATION_MAP)
 
   # Check if text2 contains Japanese words that translate to text1
-  score2 = get_translation_score(text2, text1, translation_map)
+  score2 = get_translation_score(text2, text1, TRANSLATION_MAP)
 
   return max(score1, score2)
 
@@ -1179,7 +1099,7 @@ def get_optimal_event_choice(event_data, event_type):
 
   return 1, False  # Default to first choice
 
-def get_event_choices_from_database(event_text, event_type, return_full_data=False):
+def get_event_choices_from_database(event_text, event_type, return_full_data=False, match=None):
   """
   Get event choices from JSON database OR learned events
   Returns list of choice texts or empty list if not found
@@ -1189,6 +1109,7 @@ def get_event_choices_from_database(event_text, event_type, return_full_data=Fal
     event_text: The event text to search for
     event_type: The type of event (character, support, scenario)
     return_full_data: If True, returns full event data instead of just choices
+    match: find_best_event_match(event_text) result, if the caller already has it
   """
   try:
     # STEP 1: Check learned events first (from event_data.json)
@@ -1209,7 +1130,7 @@ def get_event_choices_from_database(event_text, event_type, return_full_data=Fal
       return learned_choices
 
     # STEP 2: Check static database (assets/character/, assets/support/, etc.)
-    event_type_found, event_data, confidence = find_best_event_match(event_text)
+    event_type_found, event_data, confidence = match if match is not None else find_best_event_match(event_text)
 
     if event_data and confidence > 0.1:
       print(f"[EVENT] Found event in static database: '{event_data.get('name', 'Unknown')}' (confidence: {confidence:.2f})")
@@ -1279,42 +1200,31 @@ def get_event_choices_from_database(event_text, event_type, return_full_data=Fal
 
 def get_choices_from_learned_events(event_text):
   """
-  Check if this event was learned from user choices in event_data.json
+  Check if this event was learned from user choices (event log, then event database)
   Returns list of choice texts if found, empty list if not found
   """
   try:
-    data = _load_event_data_from_json()
-    events = data.get("events", [])
-    
-    if not events:
-      return []
-    
     # Look for events with similar text that have user choices
-    for event in events:
-      stored_event_text = event.get('event_text', '')
-      if stored_event_text and _events_are_similar(event_text, stored_event_text):
-        # Check if this event has detected choices (preferred)
-        detected_choices = event.get('detected_choices', [])
-        if detected_choices and len(detected_choices) > 1:
-          print(f"[EVENT] 🎓 Found learned event: '{stored_event_text}' with {len(detected_choices)} choices")
-          return detected_choices
-        
-        # Even if no detected_choices, we know the user made a choice
-        choice_made = event.get('choice_made')
-        if choice_made:
-          print(f"[EVENT] 🎓 Found learned event: '{stored_event_text}' (user previously chose {choice_made})")
-          # Return dummy choices based on the choice number (we know this choice exists)
-          try:
-            max_choice = int(choice_made) if isinstance(choice_made, (str, int)) else 2
-            # Ensure we have at least 2 choices if user made a choice
-            max_choice = max(max_choice, 2)
-            return [f"Choice {i+1}" for i in range(max_choice)]
-          except:
-            # Fallback: assume 2 choices if we can't parse choice_made
-            return ["Choice 1", "Choice 2"]
-    
+    for event in _get_learned_store().candidates(event_text):
+      stored_event_text = event['text']
+      if not _events_are_similar(event_text, stored_event_text):
+        continue
+      # Check if this event has detected choices (preferred)
+      detected_choices = event['choices']
+      if detected_choices and len(detected_choices) > 1:
+        print(f"[EVENT] 🎓 Found learned event: '{stored_event_text}' with {len(detected_choices)} choices")
+        return detected_choices
+
+      # Even if no detected_choices, we know the user made a choice
+      choice_made = event['choice_made']
+      if choice_made:
+        print(f"[EVENT] 🎓 Found learned event: '{stored_event_text}' (user previously chose {choice_made})")
+        # Return dummy choices based on the choice number (we know this choice exists)
+        max_choice = max(int(choice_made), 2)
+        return [f"Choice {i+1}" for i in range(max_choice)]
+
     return []
-    
+
   except Exception as e:
     print(f"[ERROR] Failed to check learned events: {e}")
     return []
@@ -1325,23 +1235,17 @@ def get_learned_choice_for_event(event_text):
   Returns the choice number (1-5) if found, None otherwise
   """
   try:
-    data = _load_event_data_from_json()
-    events = data.get("events", [])
-    
-    if not events:
-      return None
-    
     # Look for events with similar text that have user choices
-    for event in events:
-      stored_event_text = event.get('event_text', '')
+    for event in _get_learned_store().candidates(event_text):
+      stored_event_text = event['text']
       if calculate_text_similarity(event_text, stored_event_text) > 0.6:  # Lowered from 0.8
-        choice_made = event.get('choice_made')
+        choice_made = event['choice_made']
         if choice_made:
           print(f"[EVENT] 🎓 Found learned choice: '{stored_event_text}' -> choice {choice_made}")
           return int(choice_made)
-    
+
     return None
-    
+
   except Exception as e:
     print(f"[ERROR] Failed to get learned choice: {e}")
     return None
@@ -1609,48 +1513,31 @@ def _log_event_to_database(event_text, choice_made, character, support_cards,
     # Save to JSON file
     success = _save_event_to_json(event_data)
     if success:
-      print(f"[EVENT] Logged event to JSON (session: {session_id})")
+      print(f"[EVENT] Logged event (session: {session_id})")
       if detected_choices:
         print(f"[EVENT] Recorded {len(detected_choices)} choices from database for analysis")
     else:
-      print("[EVENT] Failed to log event to JSON")
+      print("[EVENT] Failed to log event")
 
   except Exception as e:
     print(f"[EVENT] Error logging to JSON: {e}")
 
 def _save_event_to_json(event_data):
-  """Save event data to JSON file"""
+  """Append one event to the event log (see core/event_log.py) and learn from it"""
+  # Import earlier events first, so this one is not imported and recorded both
   try:
-    json_file = "event_data.json"
-
-    # Load existing data or create new structure
-    if os.path.exists(json_file):
-      with open(json_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    else:
-      data = {
-        "metadata": {
-          "created": datetime.now().isoformat(),
-          "total_events": 0,
-          "version": "1.0"
-        },
-        "events": []
-      }
-
-    # Add new event
-    data["events"].append(event_data)
-    data["metadata"]["total_events"] = len(data["events"])
-    data["metadata"]["last_updated"] = datetime.now().isoformat()
-
-    # Save back to file
-    with open(json_file, 'w', encoding='utf-8') as f:
-      json.dump(data, f, indent=2, ensure_ascii=False)
-
-    return True
-
+    store = _get_learned_store()
   except Exception as e:
-    print(f"[ERROR] Failed to save event to JSON: {e}")
+    print(f"[ERROR] Failed to open the learned store: {e}")
+    store = None
+  if not event_log.append(event_data):
     return False
+  if store is not None:
+    try:
+      store.record_event(event_data, _priority_stats())
+    except Exception as e:
+      print(f"[ERROR] Failed to record event in the learned store: {e}")
+  return True
 
 def _parse_choice_effects(choices):
   """Parse choice effects into stat gains dictionary"""
@@ -1768,11 +1655,70 @@ def _parse_choice_effects_support(options):
 
   return stat_gains
 
+# (config.json bytes, {source path: mtime}, data) from the last _load_event_data_from_json build
+_event_data_cache = None
+
+def _mtime(path):
+  try:
+    return os.stat(path).st_mtime_ns
+  except OSError:
+    return None
+
 def _load_event_data_from_json():
-  """Load event data from combined character, support card, and scenario directories"""
+  """
+  Event data for the configured character, support cards and scenario.
+  Built once and reused until config.json or one of the files it was built from changes
+  (missing files are tracked too, so a newly scraped file is picked up).
+  The result is shared: treat it as read-only.
+  """
+  global _event_data_cache
+  try:
+    with open("config.json", "rb") as f:
+      config_bytes = f.read()
+  except Exception as e:
+    print(f"[ERROR] Failed to load event data from combined directories: {e}")
+    return {"events": [], "metadata": {"total_events": 0}}
+
+  cached = _event_data_cache
+  if cached is not None and cached[0] == config_bytes and all(_mtime(path) == mtime for path, mtime in cached[1].items()):
+    return cached[2]
+
+  sources = []
+  data = _build_event_data(config_bytes, sources)
+  if data is None:
+    return {"events": [], "metadata": {"total_events": 0}}
+  _event_data_cache = (config_bytes, {path: _mtime(path) for path in sources}, data)
+
+  # Rebuilt data replaces the asset rows of the learned store
   try:
-    # Load config to get character, support cards, and scenario
-    config = load_config()
+    priority_stats = json.loads(config_bytes.decode("utf-8")).get("priority_stat", DEFAULT_PRIORITY_STATS)
+    learned_store.sync_assets(data["events"], priority_stats)
+  except Exception as e:
+    print(f"[ERROR] Failed to sync event data into the learned store: {e}")
+  return data
+
+# Stat order used to weight outcomes when config has no priority_stat
+DEFAULT_PRIORITY_STATS = ["spd", "sta", "pwr", "wit", "guts"]
+
+def _priority_stats():
+  return PRIORITY_STAT or DEFAULT_PRIORITY_STATS
+
+# Set once the event log import has been checked in this process
+_log_imported = False
+
+def _get_learned_store():
+  """learned_store with earlier logged events imported (assets are synced on config reload)"""
+  global _log_imported
+  if not _log_imported:
+    learned_store.import_log(event_log.events, _priority_stats())
+    _log_imported = True
+  return learned_store
+
+def _build_event_data(config_bytes, sources):
+  """Load event data from combined character, support card, and scenario directories, listing every path read in `sources`"""
+  try:
+    # Config gives the character, support cards, and scenario
+    config = json.loads(config_bytes.decode("utf-8"))
     character_id = config["character"]["id"]
     character_name = config["character"]["name"]
     support_cards = config["support_cards"]
@@ -1783,6 +1729,7 @@ def _load_event_data_from_json():
     # Load character events - file name format: ID-slug.json
     character_slug = character_name.lower().replace(" ", "-")
     character_file = f"assets/character/combined/{character_id}-{character_slug}.json"
+    sources.append(character_file)
     if os.path.exists(character_file):
       with open(character_file, 'r', encoding='utf-8') as f:
         char_data = json.load(f)
@@ -1799,21 +1746,16 @@ def _load_event_data_from_json():
             all_events.append(event_entry)
 
     # Load support card events - find files by name matching
+    sources.append("assets/support/nested")
     for support_card in support_cards:
       support_name = support_card["name"]
       support_file = None
 
-      # Try to find the correct file by name in nested directory
-      if os.path.exists("assets/support/nested"):
-        for filename in os.listdir("assets/support/nested"):
-          if filename.endswith(".json"):
-            # Check if the support card name (with spaces replaced by hyphens) is in the filename
-            name_slug = support_name.lower().replace(" ", "-")
-            if name_slug in filename.lower():
-              support_file = f"assets/support/nested/{filename}"
-              break
+      # Find the file whose name contains the support card name (spaces replaced by hyphens)
+      support_file = asset_index.find_file("support", name=support_name)
 
       if support_file and os.path.exists(support_file):
+        sources.append(support_file)
         with open(support_file, 'r', encoding='utf-8') as f:
           support_nested_data = json.load(f)
           
@@ -1874,6 +1816,7 @@ def _load_event_data_from_json():
 
     # Load scenario events - file name format: scenario-id.json
     scenario_file = f"assets/scenario/{scenario_id}.json"
+    sources.append(scenario_file)
     if os.path.exists(scenario_file):
       with open(scenario_file, 'r', encoding='utf-8') as f:
         scenario_data = json.load(f)
@@ -1901,7 +1844,7 @@ def _load_event_data_from_json():
 
   except Exception as e:
     print(f"[ERROR] Failed to load event data from combined directories: {e}")
-    return {"events": [], "metadata": {"total_events": 0}}
+    return None
 
 def get_optimal_event_choice_from_database(event_text, event_type):
   """
@@ -1910,28 +1853,18 @@ def get_optimal_event_choice_from_database(event_text, event_type):
   Returns (choice_index, from_database) tuple
   """
   try:
-    # Load event data from JSON
-    data = _load_event_data_from_json()
-    events = data.get("events", [])
-
-    if not events:
-      print("[EVENT] No event data available, using fallback logic")
-      fallback_choice, _ = get_optimal_event_choice(None, event_type)
-      return fallback_choice, False
-
-    # Find similar events
-    similar_events = []
-    for event in events:
-      if _events_are_similar(event_text, event['event_text']):
-        similar_events.append(event)
+    # Find similar events among the indexed candidates
+    store = _get_learned_store()
+    similar_events = [event['id'] for event in store.candidates(event_text)
+                      if _events_are_similar(event_text, event['text'])]
 
     if not similar_events:
       print("[EVENT] No similar events found, using fallback logic")
       fallback_choice, _ = get_optimal_event_choice(None, event_type)
       return fallback_choice, False
 
-    # Analyze choice success rates
-    choice_stats = _analyze_choice_success_rates(similar_events)
+    # Per-choice outcome aggregates over the similar events
+    choice_stats = store.choice_stats(similar_events)
 
     if not choice_stats:
       print("[EVENT] Insufficient data for analysis, using fallback logic")
@@ -1945,10 +1878,10 @@ def get_optimal_event_choice_from_database(event_text, event_type):
     stats = best_choice[1]
 
     # Use average score as confidence metric
-    if stats['sample_size'] >= 1:  # Lower threshold since we have actual stat data
+    if stats['samples'] >= 1:  # Lower threshold since we have actual stat data
       print(f"[EVENT] Event data recommends choice {choice_num} "
             f"(avg score: {stats['avg_score']:.1f}, "
-            f"samples: {stats['sample_size']})")
+            f"samples: {stats['samples']})")
       return choice_num, True
 
     print("[EVENT] Insufficient event data, using fallback logic")
@@ -2001,83 +1934,17 @@ def _events_are_similar(event1, event2):
 
   return similarity > 0.2  # Lowered threshold to 20% for better matching
 
-def _analyze_choice_success_rates(events):
-  """Analyze success rates for different choices in similar events based on stat gains"""
-  choice_stats = {}
-
-  # Get priority stats from config
-  config = load_config()
-  priority_stats = config.get("priority_stat", ["spd", "sta", "pwr", "wit", "guts"])
-
-  for event in events:
-    stat_gains = event.get('outcome', {}).get('stat_gains', {})
-
-    # Score each choice based on stat gains and priority
-    choice_scores = {}
-    for key, gain in stat_gains.items():
-      if key.startswith("choice_"):
-        choice_num = key.split("_")[1]  # Extract choice number
-        stat = key.split("_")[2] if len(key.split("_")) > 2 else ""
-
-        if choice_num not in choice_scores:
-          choice_scores[choice_num] = 0
-
-        # Weight the gain by stat priority
-        if stat in priority_stats:
-          priority_weight = len(priority_stats) - priority_stats.index(stat)  # Higher priority = higher weight
-          choice_scores[choice_num] += gain * priority_weight
-        else:
-          choice_scores[choice_num] += gain  # Default weight for non-priority stats
-
-    # Track all choices and their scores
-    for choice_num, score in choice_scores.items():
-      if choice_num not in choice_stats:
-        choice_stats[choice_num] = {
-          'total_events': 0,
-          'successful_events': 0,
-          'success_rate': 0.0,
-          'avg_score': 0.0
-        }
-
-      choice_stats[choice_num]['total_events'] += 1
-      choice_stats[choice_num]['successful_events'] += 1  # All choices are "successful" in terms of being available
-      choice_stats[choice_num]['avg_score'] += score
-
-  # Calculate success rates and average scores
-  for choice, stats in choice_stats.items():
-    if stats['total_events'] > 0:
-      stats['success_rate'] = stats['successful_events'] / stats['total_events']
-      stats['avg_score'] = stats['avg_score'] / stats['total_events']
-      stats['sample_size'] = stats['total_events']
-
-  return choice_stats
-
 def update_event_outcome(session_id: str, post_stats: Dict[str, int] = None,
                         post_mood: str = None, skill_points_gained: float = 0,
                         training_efficiency: float = 1.0):
   """
-  Update the JSON file with post-event outcomes for learning
+  Record post-event outcomes for learning
   This should be called after an event completes
   """
   if not session_id:
     return
 
   try:
-    # Load current event data
-    data = _load_event_data_from_json()
-    events = data.get("events", [])
-
-    # Find the event by session_id
-    event_index = None
-    for i, event in enumerate(events):
-      if event.get('session_id') == session_id:
-        event_index = i
-        break
-
-    if event_index is None:
-      print(f"[EVENT] Event with session_id {session_id} not found")
-      return
-
     # Calculate stat gains (simplified - in reality we'd need pre-event stats)
     stat_gains = {}
     if post_stats:
@@ -2091,14 +1958,10 @@ def update_event_outcome(session_id: str, post_stats: Dict[str, int] = None,
       'timestamp': datetime.now().isoformat()
     }
 
-    # Update the event with outcome data
-    events[event_index]['outcome'] = outcome_data
-
-    # Save back to JSON
-    data["events"] = events
-    _save_event_to_json(data)
-
-    print(f"[EVENT] Updated outcome data for session {session_id}")
+    # Appended to the log, applied to the event when it is read back
+    if event_log.update_outcome(session_id, outcome_data):
+      print(f"[EVENT] Updated outcome data for session {session_id}")
+    _get_learned_store().record_outcome(session_id, outcome_data, _priority_stats())
 
   except Exception as e:
     print(f"[EVENT] Failed to update outcome: {e}")
@@ -2118,8 +1981,8 @@ def handle_event():
   """
   print("[EVENT] Starting intelligent event detection...")
 
-  # Reload config to pick up any changes made through web interface
-  reload_config()
+  # Pick up changes made through the web interface (no-op unless config.json changed)
+  reload_config_if_changed()
 
   # Detect event text
   event_text = detect_event_text()
@@ -2372,10 +2235,11 @@ def get_support_cards_info():
   return cards_info
 
 # Check turn
-def check_turn():
-    turn = enhanced_screenshot(TURN_REGION)
-    turn_text = extract_text(turn)
+def check_turn(frame=None):
+    turn = enhanced_screenshot(TURN_REGION, frame)
+    return _parse_turn(extract_text(turn))
 
+def _parse_turn(turn_text):
     if "Race Day" in turn_text:
         return "Race Day"
 
@@ -2396,33 +2260,46 @@ def check_turn():
     return -1
 
 # Check year
-def check_current_year():
-  year = enhanced_screenshot(YEAR_REGION)
+def check_current_year(frame=None):
+  year = enhanced_screenshot(YEAR_REGION, frame)
   text = extract_text(year)
   return text
 
 # Check criteria
-def check_criteria():
-  img = enhanced_screenshot(CRITERIA_REGION)
+def check_criteria(frame=None):
+  img = enhanced_screenshot(CRITERIA_REGION, frame)
   text = extract_text(img)
   return text
 
+# Mood, turn, year and criteria in one OCR pass (same results as the check_* functions)
+def check_lobby_status(frame=None):
+  images = [
+    capture_region(MOOD_REGION, frame),
+    enhanced_screenshot(TURN_REGION, frame),
+    enhanced_screenshot(YEAR_REGION, frame),
+    enhanced_screenshot(CRITERIA_REGION, frame)
+  ]
+  mood_text, turn_text, year_text, criteria_text = extract_many(images)
+  return {
+    "mood": _parse_mood(mood_text),
+    "turn": _parse_turn(turn_text),
+    "year": year_text,
+    "criteria": criteria_text
+  }
+
 def wait_for_user_intervention(timeout_seconds=None):
   """
   Wait for user to manually select an event choice within the timeout period.
   Returns the choice index (1-5) if user intervenes, None if timeout expires.
   """
   if timeout_seconds is None:
-    # Get timeout directly from config to avoid global variable issues
-    config = load_config()
-    timeout_seconds = config.get("event_data_collection", {}).get("user_intervention_timeout", 10)
+    reload_config_if_changed()
+    timeout_seconds = CONFIG.get("event_data_collection", {}).get("user_intervention_timeout", 10)
 
   print(f"[EVENT] Waiting {timeout_seconds} seconds for user intervention...")
   print("[EVENT] Click an event choice manually if you want to override the bot's decision")
 
   import time
-  import pyautogui
-  from core.recognizer import match_template
 
   start_time = time.time()
   last_check_time = 0
@@ -2443,10 +2320,10 @@ def wait_for_user_intervention(timeout_seconds=None):
       ]
 
       event_still_active = False
+      frame = grab_frame()
       for icon in event_icons:
         try:
-          btn = pyautogui.locateCenterOnScreen(icon, confidence=0.7, minSearchTime=0.1)
-          if btn:
+          if locate(icon, threshold=0.7, frame=frame):
             event_still_active = True
             break
         except:
@@ -2528,8 +2405,7 @@ def _log_user_choice_for_learning(event_text, user_choice, event_type, pre_stats
     session_id = str(uuid.uuid4())[:8]
 
     # Get current character info
-    config = load_config()
-    character = config.get("character", {}).get("name", "Unknown")
+    character = (CONFIG.get("character") or {}).get("name", "Unknown")
 
     # Event data structure for user learning
     event_data = {
@@ -2598,8 +2474,8 @@ def detect_event_choices():
     print(f"[EVENT] Error detecting choices: {e}")
     return []
 
-def check_skill_pts():
+def check_skill_pts(frame=None):
     """Return the current skill points by reading the skill points region using OCR."""
-    img = capture_region(SKILL_PTS_REGION)
-    pts = extract_number(img)
+    img = capture_region(SKILL_PTS_REGION, frame)
+    pts = recognize_number(img, field="skill_pts")
     return pts if pts is not None else 0
\ No newline at end of file
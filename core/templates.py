@@ -0,0 +1,151 @@
+import os
+import threading
+import time
+
+import cv2
+
+# Directories holding the needle images used by the matchers
+TEMPLATE_DIRS = ("assets/buttons", "assets/icons", "assets/ui", "assets/ura")
+TEMPLATE_EXTENSIONS = (".png",)
+
+# How often get() looks at file mtimes for hot reload (seconds)
+RELOAD_CHECK_INTERVAL = 2.0
+
+class Template:
+  """Decoded template: BGR and grayscale arrays are shared and read-only"""
+  def __init__(self, path, bgr, mtime):
+    self.path = path
+    self.bgr = bgr
+    self.gray = cv2.cvtColor(bgr, cv2.COLOR_BGR2GRAY)
+    self.mtime = mtime
+    self.height, self.width = bgr.shape[:2]
+    # Derived data (downscaled levels etc.), dropped on reload
+    self.cache = {}
+    self.bgr.setflags(write=False)
+    self.gray.setflags(write=False)
+
+class TemplateBank:
+  """
+  Process-wide registry of decoded templates.
+  Everything under TEMPLATE_DIRS is decoded once by preload(); other paths are
+  decoded on first use. Changed files are reloaded on the next get().
+  """
+  def __init__(self, dirs=TEMPLATE_DIRS, reload_interval=RELOAD_CHECK_INTERVAL):
+    self.dirs = dirs
+    self.reload_interval = reload_interval
+    self._templates = {}
+    self._lock = threading.RLock()
+    self._last_check = time.monotonic()
+    self.hits = 0
+    self.misses = 0
+    self.reloads = 0
+    self.failures = 0
+
+  @staticmethod
+  def _key(path):
+    return os.path.normpath(path)
+
+  def _decode(self, path):
+    try:
+      mtime = os.stat(path).st_mtime_ns
+    except OSError:
+      return None
+    image = cv2.imread(path, cv2.IMREAD_UNCHANGED)
+    if image is None:
+      return None
+    if image.ndim == 2:
+      image = cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+    elif image.shape[2] == 4:
+      image = cv2.cvtColor(image, cv2.COLOR_BGRA2BGR)
+    return Template(path, image, mtime)
+
+  def _load(self, key):
+    template = self._decode(key)
+    if template is None:
+      self.failures += 1
+      print(f"[TEMPLATES] Could not load template: {key}")
+      return None
+    self._templates[key] = template
+    return template
+
+  def preload(self):
+    """Decode every template under the template directories. Returns the count"""
+    start = time.perf_counter()
+    count = 0
+    with self._lock:
+      for directory in self.dirs:
+        if not os.path.isdir(directory):
+          continue
+        for root, _, files in os.walk(directory):
+          for name in files:
+            if not name.lower().endswith(TEMPLATE_EXTENSIONS):
+              continue
+            key = self._key(os.path.join(root, name))
+            if key not in self._templates and self._load(key):
+              count += 1
+      self._last_check = time.monotonic()
+    print(f"[TEMPLATES] Preloaded {count} templates in {(time.perf_counter() - start) * 1000:.1f} ms")
+    return count
+
+  def get(self, path):
+    """Return the Template for `path`, or None if it cannot be read"""
+    key = self._key(path)
+    with self._lock:
+      if self.reload_interval is not None and time.monotonic() - self._last_check >= self.reload_interval:
+        self.refresh()
+
+      template = self._templates.get(key)
+      if template is not None:
+        self.hits += 1
+        return template
+
+      self.misses += 1
+      return self._load(key)
+
+  def refresh(self):
+    """Reload templates whose file changed on disk, drop deleted ones. Returns the count reloaded"""
+    reloaded = 0
+    with self._lock:
+      for key, template in list(self._templates.items()):
+        try:
+          mtime = os.stat(key).st_mtime_ns
+        except OSError:
+          del self._templates[key]
+          continue
+        if mtime != template.mtime:
+          if self._load(key):
+            reloaded += 1
+            print(f"[TEMPLATES] Reloaded changed template: {key}")
+          else:
+            del self._templates[key]
+      self.reloads += reloaded
+      self._last_check = time.monotonic()
+    return reloaded
+
+  def clear(self):
+    with self._lock:
+      self._templates.clear()
+
+  def stats(self):
+    with self._lock:
+      lookups = self.hits + self.misses
+      return {
+        "templates": len(self._templates),
+        "hits": self.hits,
+        "misses": self.misses,
+        "hit_rate": self.hits / lookups if lookups else 0.0,
+        "reloads": self.reloads,
+        "failures": self.failures,
+        "bytes": sum(t.bgr.nbytes + t.gray.nbytes for t in self._templates.values())
+      }
+
+bank = TemplateBank()
+
+def get_template(path):
+  return bank.get(path)
+
+def preload_templates():
+  return bank.preload()
+
+def template_stats():
+  return bank.stats()
@@ -6,6 +6,8 @@ import keyboard
 import pyautogui
 
 from core.execute import career_lobby
+from core.templates import preload_templates
+from core.ocr import warm_up_reader, wait_until_ready
 import core.state as state
 from server.main import app
 
@@ -46,6 +48,13 @@ def main():
   if focus_umamusume():
     print("[DEBUG] Window focused successfully, reloading config...")
     state.reload_config()
+    preload_templates()
+    try:
+      wait_until_ready()
+    except Exception as e:
+      print(f"[ERROR] OCR reader could not be loaded, not starting: {e}")
+      state.is_bot_running = False
+      return
     print("[DEBUG] Setting bot to running state...")
     state.is_bot_running = True
     print("[DEBUG] Config reloaded, starting career_lobby...")
@@ -77,8 +86,17 @@ def start_server():
   print(f"[SERVER] Open http://{host}:{port} to configure the bot.")
   config = uvicorn.Config(app, host=host, port=port, workers=1, log_level="warning")
   server = uvicorn.Server(config)
+  threading.Thread(target=warm_up_when_listening, args=(server,), daemon=True).start()
   server.run()
 
+def warm_up_when_listening(server):
+  # Load the OCR model only once the config UI is reachable
+  while not server.started:
+    if server.should_exit:
+      return
+    time.sleep(0.1)
+  warm_up_reader()
+
 if __name__ == "__main__":
   threading.Thread(target=hotkey_listener, daemon=True).start()
   start_server()
@@ -16,10 +16,9 @@ def take_screenshot():
 
 def detect_text_coordinates(screenshot, text_to_find):
     """Use OCR to detect text and return coordinates of the bounding box."""
-    from core.ocr import extract_text  # Assuming extract_text uses easyocr
-    # For better accuracy, use easyocr directly
-    import easyocr
-    reader = easyocr.Reader(["en"], gpu=False)
+    # Use the shared easyocr reader directly to get boxes
+    from core.ocr import get_reader
+    reader = get_reader()
     img_np = np.array(screenshot)
     results = reader.readtext(img_np)
     
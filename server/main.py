@@ -33,13 +33,13 @@ def get_config():
 @app.post("/config")
 def update_config(new_config: dict):
   save_config(new_config)
-  # Trigger config reload in the bot if it's running
+  # The bot reloads on its next event (or turn), not on this request thread
   try:
     import core.state as state
-    state.reload_config()
-    print("[SERVER] Config reloaded after web update")
+    state.notify_config_changed()
+    print("[SERVER] Config saved, bot will reload it")
   except Exception as e:
-    print(f"[SERVER] Could not reload config: {e}")
+    print(f"[SERVER] Could not notify bot of config change: {e}")
   return {"status": "success", "data": new_config}
 
 @app.get("/support-cards")
@@ -216,13 +216,25 @@ def debug():
   import os
   cwd = os.getcwd()
   files = glob.glob("assets/character/combined/*.json")
+  try:
+    from core.templates import template_stats
+    templates = template_stats()
+  except Exception as e:
+    templates = {"error": str(e)}
+  try:
+    from core.ocr import ocr_cache_stats
+    ocr_cache = ocr_cache_stats()
+  except Exception as e:
+    ocr_cache = {"error": str(e)}
   return {
     "cwd": cwd,
     "files_found": len(files),
     "first_5_files": files[:5] if files else [],
     "assets_exists": os.path.exists("assets"),
     "character_exists": os.path.exists("assets/character"),
-    "combined_exists": os.path.exists("assets/character/combined")
+    "combined_exists": os.path.exists("assets/character/combined"),
+    "templates": templates,
+    "ocr_cache": ocr_cache
   }
 
 @app.get("/scenarios")
@@ -12,6 +12,8 @@ from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from bs4 import BeautifulSoup
 import re
 
+from core.asset_index import asset_index
+
 class OnDemandScraper:
     def __init__(self):
         self.base_url = "https://gametora.com/umamusume"
@@ -56,81 +58,13 @@ class OnDemandScraper:
 
     def character_exists(self, char_id, language="nested"):
         """Check if character data already exists in nested format"""
-        # Use nested directory for single-file format
-        char_dir = os.path.join(self.assets_dir, "character", "nested")
-
-        # Find the slug from character_urls.json
-        character_urls_file = os.path.join(self.assets_dir, "character", "character_urls.json")
-        slug = None
-
-        if os.path.exists(character_urls_file):
-            try:
-                with open(character_urls_file, 'r', encoding='utf-8') as f:
-                    character_data = json.load(f)
-
-                # Find the character by ID
-                for character in character_data:
-                    if character.get('slug', '').startswith(str(char_id)):
-                        slug = character.get('slug')
-                        break
-            except:
-                pass
-
-        if slug:
-            json_file = os.path.join(char_dir, f"{slug}.json")
-            return os.path.exists(json_file)
-
-        # Fallback: check if any file with the ID exists
-        if os.path.exists(char_dir):
-            for file in os.listdir(char_dir):
-                if file.startswith(f"{char_id}-") and file.endswith(".json"):
-                    return True
-        return False
+        # Same id -> file index reload_config resolves characters with
+        return asset_index.find_file("character", char_id) is not None
 
     def support_card_exists(self, card_id, language="nested"):
         """Check if support card data already exists in nested format"""
-        # Use nested directory for single-file format
-        card_dir = os.path.join(self.assets_dir, "support", "nested")
-
-        # Find the slug from support_urls.json or support_card_urls.txt
-        support_urls_file = os.path.join(self.assets_dir, "support", "support_urls.json")
-        slug = None
-
-        if os.path.exists(support_urls_file):
-            try:
-                with open(support_urls_file, 'r', encoding='utf-8') as f:
-                    support_data = json.load(f)
-
-                # Find the support card by ID
-                for support in support_data:
-                    if support.get('slug', '').startswith(str(card_id)):
-                        slug = support.get('slug')
-                        break
-            except:
-                pass
-
-        # If not found in JSON, check the text file
-        if not slug:
-            try:
-                with open("support_card_urls.txt", "r", encoding="utf-8") as f:
-                    for line in f:
-                        line = line.strip()
-                        if line and str(card_id) in line:
-                            slug = line.rstrip('/').split('/')[-1]
-                            break
-            except:
-                pass
-
-        if slug:
-            json_file = os.path.join(card_dir, f"{slug}.json")
-            return os.path.exists(json_file)
-
-        # Fallback: check if any file with the ID exists
-        if os.path.exists(card_dir):
-            for file in os.listdir(card_dir):
-                if file.startswith(f"{card_id}-") and file.endswith(".json"):
-                    return True
-        return False
+        # Same id -> file index reload_config resolves support cards with
+        return asset_index.find_file("support", card_id) is not None
 
     def scrape_character(self, char_id, language="nested"):
         """Scrape character data using the working scraper"""
@@ -142,19 +76,9 @@ class OnDemandScraper:
         try:
             from core.scrape_umamusume_character_events import scrape_character_complete
 
-            # Construct the URL from character_urls.json
-            character_urls_file = os.path.join(self.assets_dir, "character", "character_urls.json")
-            character_url = None
-
-            if os.path.exists(character_urls_file):
-                with open(character_urls_file, 'r', encoding='utf-8') as f:
-                    character_data = json.load(f)
-
-                # Find the character by ID
-                for character in character_data:
-                    if character.get('slug', '').startswith(str(char_id)):
-                        character_url = character.get('url')
-                        break
+            # Construct the URL from character_urls.json (indexed by ID)
+            entry = asset_index.lookup_url("character", char_id)
+            character_url = entry["url"] if entry else None
 
             if not character_url:
                 print(f"[SCRAPER] Could not find URL for character {char_id}")
@@ -165,6 +89,8 @@ class OnDemandScraper:
 
             if result:
                 print(f"[SCRAPER] Successfully scraped character {char_id} using working scraper")
+                # The scraper writes the file itself; rescan so the new file resolves
+                asset_index.refresh("character")
                 return True
             else:
                 print(f"[SCRAPER] Working scraper failed for character {char_id}")
@@ -188,19 +114,9 @@ class OnDemandScraper:
             # Import and use support scraper functions
             from core.scrape_umamusume_support_events import extract_support_events_with_tooltips, extract_japanese_support_events, combine_support_data
 
-            # Construct the URL from support_urls.json
-            support_urls_file = os.path.join(self.assets_dir, "support", "support_urls.json")
-            support_url = None
-
-            if os.path.exists(support_urls_file):
-                with open(support_urls_file, 'r', encoding='utf-8') as f:
-                    support_data = json.load(f)
-
-                # Find the support card by ID
-                for support in support_data:
-                    if support.get('slug', '').startswith(str(card_id)):
-                        support_url = support.get('url')
-                        break
+            # Construct the URL from support_urls.json (indexed by ID)
+            entry = asset_index.lookup_url("support", card_id)
+            support_url = entry["url"] if entry else None
 
             if not support_url:
                 print(f"[SCRAPER] Could not find URL for support card {card_id}")
@@ -262,6 +178,7 @@ class OnDemandScraper:
 
                 with open(filepath, 'w', encoding='utf-8') as f:
                     json.dump(nested_data, f, indent=2, ensure_ascii=False)
+                asset_index.add_file("support", filepath)
 
                 print(f"[SCRAPER] Successfully saved support card {card_id} using nested format")
                 print(f"[SCRAPER] File: {filepath}")
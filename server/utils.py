@@ -1,4 +1,5 @@
 import json
+import os
 from pathlib import Path
 
 CONFIG_PATH = Path(__file__).resolve().parent.parent / "config.json"
@@ -10,5 +11,8 @@ def load_config() -> dict:
   return {}
 
 def save_config(data: dict):
-  with open(CONFIG_PATH, "w") as f:
-    json.dump(data, f, indent=2)
\ No newline at end of file
+  # Written next to config.json and renamed over it, so the bot never reads a half-written file
+  tmp_path = CONFIG_PATH.with_suffix(".json.tmp")
+  with open(tmp_path, "w") as f:
+    json.dump(data, f, indent=2)
+  os.replace(tmp_path, CONFIG_PATH)
\ No newline at end of file
@@ -11,3 +11,21 @@ MOOD_LIST = ["AWFUL", "BAD", "NORMAL", "GOOD", "GREAT", "UNKNOWN"]
 ENERGY_LIST = ["EMPTY", "LOW", "NORMAL", "HIGH", "FULL", "UNKNOWN"]  # Energy level classifications
 SKILL_PTS_REGION=(760, 780, 825 - 760, 815 - 780)
 SCREEN_BOTTOM_REGION=(125, 800, 1000-125, 1080-800)
+GAME_WINDOW_REGION=(125, 0, 1000 - 125, 1080)  # Main game column, buttons and dialogs never leave it
+
+# Where each template can appear, (x, y, width, height). multi_match_templates crops to these
+# before correlating; templates without an entry are matched against the full screen
+TEMPLATE_REGIONS = {
+  "assets/ui/tazuna_hint.png": (780, 100, 1000 - 780, 300 - 100),
+  "assets/buttons/infirmary_btn.png": (250, 850, 550 - 250, 1030 - 850),
+  "assets/icons/event_choice_1.png": (150, 250, 500 - 150, 900 - 250),
+  "assets/icons/event_choice_2.png": (150, 250, 500 - 150, 900 - 250),
+  "assets/icons/event_choice_3.png": (150, 250, 500 - 150, 900 - 250),
+  "assets/icons/event_choice_4.png": (150, 250, 500 - 150, 900 - 250),
+  "assets/icons/event_choice_5.png": (150, 250, 500 - 150, 900 - 250),
+  "assets/buttons/inspiration_btn.png": GAME_WINDOW_REGION,
+  "assets/buttons/next_btn.png": GAME_WINDOW_REGION,
+  "assets/buttons/next2_btn.png": GAME_WINDOW_REGION,
+  "assets/buttons/cancel_btn.png": GAME_WINDOW_REGION,
+  "assets/buttons/retry_btn.png": GAME_WINDOW_REGION,
+}
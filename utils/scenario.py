@@ -1,6 +1,8 @@
 import pyautogui
 
+from core.recognizer import locate
+
 def ura():
-  race_btn = pyautogui.locateCenterOnScreen("assets/ura/ura_race_btn.png", confidence=0.8, minSearchTime=5)
+  race_btn = locate("assets/ura/ura_race_btn.png", timeout=5)
   if race_btn:
-    pyautogui.click(race_btn)
\ No newline at end of file
+    pyautogui.click(race_btn)
@@ -1,35 +1,169 @@
+import time
 from PIL import Image, ImageEnhance
+import cv2
 import mss
 import numpy as np
 
-def enhanced_screenshot(region=(0, 0, 1920, 1080)) -> Image.Image:
+# Screen-change waits compare thumbnails (every SAMPLE_STEP-th pixel of the green channel,
+# 240x135 for a 1080p screen) by mean absolute difference on the 0-255 scale
+SAMPLE_STEP = 8
+CHANGE_THRESHOLD = 1.0
+# How long the screen has to stay still to count as settled, and the sampling interval
+SETTLE_TIME = 0.12
+POLL_INTERVAL = 0.02
+
+class Frame:
+  """
+  A single screen capture shared by every reader in one bot tick.
+  Regions are (x, y, width, height) in screen coordinates and are cropped
+  as NumPy views, so reading several regions never copies the screen.
+  """
+  def __init__(self, bgra: np.ndarray, origin=(0, 0)):
+    self.bgra = bgra
+    self.origin = origin
+    self._bgr = None
+    self.cache = {}
+
+  @classmethod
+  def from_image(cls, image: Image.Image, origin=(0, 0)) -> "Frame":
+    """Wrap an existing image (e.g. a recorded screenshot) as a frame"""
+    rgb = np.asarray(image.convert("RGB"))
+    alpha = np.full(rgb.shape[:2] + (1,), 255, dtype=np.uint8)
+    return cls(np.concatenate([rgb[:, :, ::-1], alpha], axis=2), origin=origin)
+
+  @property
+  def bgr(self) -> np.ndarray:
+    # Packed once per frame so every crop after that is a plain view
+    if self._bgr is None:
+      self._bgr = np.ascontiguousarray(self.bgra[:, :, :3])
+    return self._bgr
+
+  @property
+  def rgb(self) -> np.ndarray:
+    return self.bgr[:, :, ::-1]
+
+  @property
+  def gray(self) -> np.ndarray:
+    # Converted once per frame, for grayscale matchers
+    gray = self.cache.get("gray")
+    if gray is None:
+      gray = self.cache["gray"] = cv2.cvtColor(self.bgr, cv2.COLOR_BGR2GRAY)
+    return gray
+
+  @property
+  def width(self) -> int:
+    return self.bgra.shape[1]
+
+  @property
+  def height(self) -> int:
+    return self.bgra.shape[0]
+
+  def _bounds(self, region):
+    x, y, w, h = region
+    left = max(0, x - self.origin[0])
+    top = max(0, y - self.origin[1])
+    right = min(self.width, x - self.origin[0] + w)
+    bottom = min(self.height, y - self.origin[1] + h)
+    return left, top, max(left, right), max(top, bottom)
+
+  def crop(self, region=None, channels="rgb") -> np.ndarray:
+    """Zero-copy view of a region, in "rgb", "bgr" or "bgra" channel order, or single-channel "gray"""
+    arr = getattr(self, channels)
+    if region is None:
+      return arr
+    left, top, right, bottom = self._bounds(region)
+    return arr[top:bottom, left:right]
+
+  def image(self, region=None) -> Image.Image:
+    """PIL image of a region (PIL copies the view)"""
+    return Image.fromarray(np.ascontiguousarray(self.crop(region)))
+
+def _monitor(region):
+  return {
+    "left": region[0],
+    "top": region[1],
+    "width": region[2],
+    "height": region[3]
+  }
+
+def grab_frame(region=(0, 0, 1920, 1080)) -> Frame:
+  with mss.mss() as sct:
+    img = sct.grab(_monitor(region))
+    return Frame(np.array(img), origin=(region[0], region[1]))
+
+def sample_frames(region=(0, 0, 1920, 1080), poll=POLL_INTERVAL):
+  """Frames grabbed one after another through a single mss handle, at most one per `poll` seconds"""
+  monitor = _monitor(region)
   with mss.mss() as sct:
-    monitor = {
-      "left": region[0],
-      "top": region[1],
-      "width": region[2],
-      "height": region[3]
-    }
-    img = sct.grab(monitor)
-    img_np = np.array(img)
-    img_rgb = img_np[:, :, :3][:, :, ::-1]
-    pil_img = Image.fromarray(img_rgb)
+    while True:
+      started = time.monotonic()
+      yield Frame(np.array(sct.grab(monitor)), origin=(region[0], region[1]))
+      remaining = poll - (time.monotonic() - started)
+      if remaining > 0:
+        time.sleep(remaining)
+
+def thumbnail(frame: Frame, step=SAMPLE_STEP) -> np.ndarray:
+  """Downsampled single-channel copy of a frame for change detection (cached on the frame)"""
+  thumb = frame.cache.get(("thumb", step))
+  if thumb is None:
+    thumb = frame.cache[("thumb", step)] = frame.bgra[::step, ::step, 1].astype(np.int16)
+  return thumb
+
+def frame_diff(a: np.ndarray, b: np.ndarray) -> float:
+  """Mean absolute difference of two thumbnails (0 for identical screens)"""
+  return float(np.abs(a - b).mean())
+
+def wait_for_change(reference: Frame = None, region=(0, 0, 1920, 1080), timeout=1.0,
+                    threshold=CHANGE_THRESHOLD, poll=POLL_INTERVAL):
+  """
+  Wait until the screen differs from `reference` (a frame of the same region, by default the
+  first one sampled). Returns the first changed frame, or None after `timeout` seconds.
+  """
+  deadline = time.monotonic() + timeout
+  base = thumbnail(reference) if reference is not None else None
+  for frame in sample_frames(region, poll):
+    thumb = thumbnail(frame)
+    if base is None:
+      base = thumb
+    elif frame_diff(thumb, base) > threshold:
+      return frame
+    if time.monotonic() >= deadline:
+      return None
 
+def wait_for_settle(timeout=1.0, since: Frame = None, min_wait=0.0, region=(0, 0, 1920, 1080),
+                    settle_time=SETTLE_TIME, threshold=CHANGE_THRESHOLD, poll=POLL_INTERVAL) -> Frame:
+  """
+  Wait until the screen has not changed for `settle_time` seconds, at most `timeout` seconds,
+  and return the last frame. With `since` (a frame taken before a click), first wait for the
+  screen to react so a still screen before the reaction does not count as settled. Without a
+  reference frame, pass `min_wait` so the game gets at least that long to start reacting.
+  """
+  start = time.monotonic()
+  earliest = start + min_wait
+  deadline = start + max(timeout, min_wait)
+  if since is not None:
+    wait_for_change(since, region, timeout, threshold, poll)
+
+  last, still_since = None, None
+  for frame in sample_frames(region, poll):
+    now = time.monotonic()
+    thumb = thumbnail(frame)
+    if last is None or frame_diff(thumb, last) > threshold:
+      still_since = now
+    last = thumb
+    if (now - still_since >= settle_time and now >= earliest) or now >= deadline:
+      return frame
+
+def _enhance(pil_img: Image.Image) -> Image.Image:
   pil_img = pil_img.resize((pil_img.width * 2, pil_img.height * 2), Image.BICUBIC)
   pil_img = pil_img.convert("L")
   pil_img = ImageEnhance.Contrast(pil_img).enhance(1.5)
-
   return pil_img
 
-def capture_region(region=(0, 0, 1920, 1080)) -> Image.Image:
-  with mss.mss() as sct:
-    monitor = {
-      "left": region[0],
-      "top": region[1],
-      "width": region[2],
-      "height": region[3]
-    }
-    img = sct.grab(monitor)
-    img_np = np.array(img)
-    img_rgb = img_np[:, :, :3][:, :, ::-1]
-    return Image.fromarray(img_rgb)
\ No newline at end of file
+def enhanced_screenshot(region=(0, 0, 1920, 1080), frame: Frame = None) -> Image.Image:
+  return _enhance(capture_region(region, frame))
+
+def capture_region(region=(0, 0, 1920, 1080), frame: Frame = None) -> Image.Image:
+  if frame is not None:
+    return frame.image(region)
+  return grab_frame(region).image()